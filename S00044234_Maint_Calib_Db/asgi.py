@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'S00044234_Maint_Calib_Db.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    # Event streams (myapp/events.py) watch the receive channel for the client going away
+    if scope['type'] == 'http':
+        scope = {**scope, 'myapp.receive': receive}
+    await django_application(scope, receive, send)
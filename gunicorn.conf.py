@@ -0,0 +1,26 @@
+# Gunicorn configuration - worker/thread counts are exported to the workers
+# so settings.py sizes the database connection pool to match.
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+wsgi_app = 'S00044234_Maint_Calib_Db.wsgi:application'
+if os.environ.get('GUNICORN_ASGI'):
+    # Event-loop workers for the async API views and the SSE stream (needs uvicorn)
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'S00044234_Maint_Calib_Db.asgi:application'
+raw_env = [
+    f"DJANGO_SETTINGS_MODULE={os.environ.get('DJANGO_SETTINGS_MODULE', 'settings')}",
+    f'WEB_CONCURRENCY={workers}',
+    f'GUNICORN_THREADS={threads}',
+]
+
+
+def child_exit(server, worker):
+    # Runs in the master - drop the worker's metrics snapshot so /metrics stops summing it
+    directory = os.environ.get('METRICS_DIR')
+    if directory:
+        from myapp.metrics import mark_process_dead
+        mark_process_dead(worker.pid, directory)
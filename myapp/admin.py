@@ -28,6 +28,9 @@ class CustomUserAdmin(UserAdmin):
     
     # Order by username
     ordering = ('username',)
+    
+    # get_role/get_role_badge read obj.profile for every row
+    list_select_related = ('profile',)
 
     def get_role(self, obj):
         """Display the user's role"""
@@ -66,6 +69,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'employee_id')
     list_editable = ('role',)  # Allows quick role editing from the list view
     ordering = ('-created_at',)
+    list_select_related = ('user',)  # get_full_name reads obj.user for every row
     
     def get_full_name(self, obj):
         return f"{obj.user.first_name} {obj.user.last_name}" if obj.user.first_name else obj.user.username
@@ -4,3 +4,27 @@ from django.apps import AppConfig
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from .events import record_equipment_deleted, record_equipment_saved
+        from .models import Equipment
+        from .utils.fragment_cache import equipment_data_changed
+        from .utils.sql_hooks import install_sql_hooks
+        from .utils.sqlite import configure_sqlite
+        from . import metrics, query_inspector, tracing  # noqa: F401 - register their SQL hooks
+
+        # WAL, busy timeout and cache pragmas for every new SQLite connection
+        connection_created.connect(configure_sqlite, dispatch_uid='myapp_configure_sqlite')
+        # Request instrumentation on every connection, in whichever thread opens it
+        # (after the pragmas, so they aren't counted against the request that opened it)
+        connection_created.connect(install_sql_hooks, dispatch_uid='myapp_install_sql_hooks')
+
+        # Outbox rows for the SSE stream (myapp/events.py)
+        post_save.connect(record_equipment_saved, sender=Equipment, dispatch_uid='myapp_equipment_saved_event')
+        post_delete.connect(record_equipment_deleted, sender=Equipment, dispatch_uid='myapp_equipment_deleted_event')
+
+        # New data version for the cached dashboard sections (myapp/utils/fragment_cache.py)
+        post_save.connect(equipment_data_changed, sender=Equipment, dispatch_uid='myapp_equipment_saved_fragments')
+        post_delete.connect(equipment_data_changed, sender=Equipment, dispatch_uid='myapp_equipment_deleted_fragments')
@@ -0,0 +1,40 @@
+"""
+Benchmarks for the dashboards, list views, API endpoints, search and charts.
+
+Run them with `python manage.py bench --size 10000 100000`. Each size is
+seeded into a throwaway test database, every scenario is timed after a
+warmup, and the results (timings, query counts, peak Python memory) are
+written as JSON that later runs can use as a --baseline.
+
+`python manage.py bench --sessions` also counts the database writes one
+completion + dashboard visit makes under each session/message storage
+(see sessions.py), `--compression` reports the bytes each route sends
+uncompressed, gzipped and brotli-compressed (see compression.py), and
+`--templates` times each dashboard template per 1,000 table rows with the
+Django engine and, when it is installed, Jinja2 (see templates.py).
+
+`python manage.py loadtest` drives many concurrent logged-in users against
+a locally started server instead (see load.py); `--server both --mix poll`
+compares API polling throughput under gunicorn (WSGI) and uvicorn (ASGI).
+"""
+from .compression import run_compression_benchmark
+from .dataset import create_bench_users, create_load_accounts, seed_equipment
+from .runner import compare, load_results, run_benchmarks, save_results
+from .scenarios import SCENARIOS, Scenario
+from .sessions import run_session_benchmark
+from .templates import run_template_benchmark
+
+__all__ = [
+    'SCENARIOS',
+    'Scenario',
+    'compare',
+    'create_bench_users',
+    'create_load_accounts',
+    'load_results',
+    'run_benchmarks',
+    'run_compression_benchmark',
+    'run_session_benchmark',
+    'run_template_benchmark',
+    'save_results',
+    'seed_equipment',
+]
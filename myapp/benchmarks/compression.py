@@ -0,0 +1,54 @@
+"""
+Bytes on the wire per route, with and without response compression.
+
+Each route is fetched by a logged-in client once per encoding - identity,
+gzip, and br when the brotli package is installed - through the full
+middleware stack, so the sizes are what CompressionMiddleware actually sends.
+"""
+from django.conf import settings
+from django.test import Client
+from django.test.utils import override_settings
+
+from ..compression import available_encodings
+from .dataset import create_bench_users
+from .runner import BenchmarkError
+
+# (role, url)
+ROUTES = [
+    ('administrator', '/admin-dashboard/'),
+    ('maintenance', '/maintenance-dashboard/'),
+    ('quality', '/quality-dashboard/'),
+    ('quality', '/api/equipment/list/'),
+    ('quality', '/api/equipment/list/?format=columnar'),
+    ('quality', '/api/equipment/stats/'),
+]
+
+
+def measure_route(client, url):
+    """Body bytes for each encoding, keyed by encoding"""
+    sizes = {}
+    for encoding in ('identity',) + available_encodings():
+        response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        if response.status_code != 200:
+            raise BenchmarkError(f'{url} returned {response.status_code}')
+        sent = response.get('Content-Encoding', 'identity')
+        if sent != encoding and len(response.content) >= getattr(settings, 'COMPRESSION_MIN_SIZE', 0):
+            raise BenchmarkError(f'{url} was sent as {sent}, not {encoding} - is CompressionMiddleware installed?')
+        sizes[encoding] = len(response.content)
+    return sizes
+
+
+def run_compression_benchmark(routes=None):
+    """Body bytes per encoding for every route, keyed by url"""
+    users = create_bench_users()
+    overrides = override_settings(
+        ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    results = {}
+    with overrides:
+        for role, url in routes or ROUTES:
+            client = Client()
+            client.force_login(users[role])
+            results[url] = measure_route(client, url)
+    return results
@@ -0,0 +1,70 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from ..models import MACHINE_TYPE_CHOICES, Equipment, UserProfile
+
+ROLES = ('administrator', 'maintenance', 'quality')
+NAMES = ('Pump', 'Press', 'Oven', 'Mixer', 'Scale', 'Caliper', 'Conveyor', 'Lathe')
+LOCATIONS = ('Building A', 'Building B', 'Clean Room', 'Warehouse', 'Lab 1', 'Lab 2')
+INTERVALS = (30, 90, 180, 365)
+
+
+def create_bench_users():
+    """One user per role, keyed by role"""
+    users = {}
+    for role in ROLES:
+        username = f'bench_{role}'
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            # bulk_create skips the post_save profile signals
+            User.objects.bulk_create([User(username=username)])
+            user = User.objects.get(username=username)
+        UserProfile.objects.update_or_create(user=user, defaults={'role': role})
+        users[role] = user
+    return users
+
+
+def create_load_accounts(per_role, password):
+    """`per_role` users of every role sharing one password, as {role: [(username, password)]}"""
+    hashed = make_password(password)
+    accounts = {}
+    for role in ROLES:
+        usernames = [f'load_{role}_{n}' for n in range(per_role)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        User.objects.bulk_create([User(username=name, password=hashed) for name in usernames if name not in existing])
+        User.objects.filter(username__in=usernames).update(password=hashed)
+        for user in User.objects.filter(username__in=usernames):
+            UserProfile.objects.update_or_create(user=user, defaults={'role': role})
+        accounts[role] = [(name, password) for name in usernames]
+    return accounts
+
+
+def seed_equipment(size, seed=0, batch_size=5000):
+    """Top the Equipment table up to `size` rows with a reproducible spread of due dates"""
+    existing = Equipment.objects.count()
+    rng = random.Random(seed + existing)
+    today = date.today()
+    types = [value for value, _ in MACHINE_TYPE_CHOICES]
+
+    batch = []
+    for number in range(existing + 1, size + 1):
+        # Numeric ids so /api/equipment/<int:pk>/status/ can address them
+        batch.append(Equipment(
+            machine_id=str(number),
+            machine_name=f'{rng.choice(NAMES)} {number}',
+            machine_type=rng.choice(types),
+            machine_location=rng.choice(LOCATIONS),
+            last_calibration_date=today - timedelta(days=rng.randint(0, 400)),
+            last_maintenance_date=today - timedelta(days=rng.randint(0, 120)),
+            calibration_interval_days=rng.choice(INTERVALS),
+            maintenance_interval_days=rng.choice(INTERVALS),
+        ))
+        if len(batch) >= batch_size:
+            Equipment.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Equipment.objects.bulk_create(batch)
+    return max(size - existing, 0)
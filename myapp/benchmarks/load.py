@@ -0,0 +1,288 @@
+"""
+Concurrent load generator for a running server.
+
+Each virtual user is an asyncio task with its own keep-alive HTTP/1.1
+connection and cookie jar. It logs in as one of the seeded accounts and
+loops over its role's weighted mix of actions until the run ends. Only the
+standard library is used, so it runs anywhere the app does.
+
+The "browse" mix replays people using the pages; the "poll" mix replays
+dashboards and scripts polling the JSON API with If-None-Match, the traffic
+the async API views are for.
+"""
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from datetime import date
+from urllib.parse import urlencode, urlsplit
+
+# Share of virtual users per role - technicians dominate at shift change
+DEFAULT_ROLE_MIX = {'maintenance': 0.6, 'quality': 0.2, 'administrator': 0.2}
+MIXES = ('browse', 'poll')
+SEARCH_TERMS = ('Pump', 'Press', 'Lab 1', 'Clean Room', 'Oven')
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client that keeps cookies between requests"""
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def request(self, method, path, data=None, headers=None):
+        """Returns (status, headers, body); retries once if a kept-alive connection went stale"""
+        for attempt in (1, 2):
+            reused = self._writer is not None
+            try:
+                return await asyncio.wait_for(self._send(method, path, data, headers), self.timeout)
+            except asyncio.TimeoutError:
+                # The late response would be read as the answer to the next request
+                await self.close()
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt == 2:
+                    raise
+
+    async def _send(self, method, path, data, extra_headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        body = urlencode(data).encode() if data is not None else b''
+        headers = {
+            'Host': f'{self.host}:{self.port}',
+            'Connection': 'keep-alive',
+            'User-Agent': 'myapp-loadtest',
+            **(extra_headers or {}),
+        }
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        if method == 'POST':
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['Content-Length'] = str(len(body))
+            if 'csrftoken' in self.cookies:
+                headers['X-CSRFToken'] = self.cookies['csrftoken']
+        head = f'{method} {path} HTTP/1.1\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in headers.items()) + '\r\n'
+        self._writer.write(head.encode('latin-1') + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = (await self._reader.readuntil(b'\r\n')).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie_name, _, cookie_value = value.split(';', 1)[0].partition('=')
+                self.cookies[cookie_name.strip()] = cookie_value.strip()
+            response_headers[name] = value
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            response_body = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            response_body = await self._reader.readexactly(int(response_headers['content-length']))
+        elif method == 'HEAD' or status in (204, 304):
+            response_body = b''
+        else:
+            response_body = await self._reader.read()
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, response_headers, response_body
+
+
+class LoadStats:
+    """Latencies and failures per route"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, route, latency, error=None):
+        self.latencies.setdefault(route, []).append(latency)
+        if error is not None:
+            errors = self.errors.setdefault(route, {})
+            errors[error] = errors.get(error, 0) + 1
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = {}
+        for route, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            failed = sum(self.errors.get(route, {}).values())
+            rows[route] = {
+                'requests': len(latencies),
+                'throughput': len(latencies) / elapsed if elapsed else 0.0,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': latencies[-1],
+                'error_rate': failed / len(latencies),
+                'errors': dict(self.errors.get(route, {})),
+            }
+        return {'elapsed': elapsed, 'routes': rows}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class VirtualUser:
+    """One logged-in browser session replaying its role's action mix"""
+
+    def __init__(self, client, stats, role, machine_ids, think_time=0.0, rng=None, mix='browse'):
+        self.client = client
+        self.stats = stats
+        self.role = role
+        self.machine_ids = machine_ids
+        self.think_time = think_time
+        self.rng = rng or random.Random()
+        self.mix = mix
+        self.etags = {}
+
+    async def call(self, route, method, path, data=None, expected=(200,), headers=None):
+        start = time.perf_counter()
+        error = None
+        try:
+            status, response_headers, _ = await self.client.request(method, path, data, headers)
+            if status not in expected:
+                error = str(status)
+            elif 'etag' in response_headers:
+                self.etags[path] = response_headers['etag']
+        except asyncio.TimeoutError:
+            error = 'timeout'
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            error = type(exc).__name__
+        self.stats.record(route, time.perf_counter() - start, error)
+        return error is None
+
+    async def login(self, username, password):
+        if not await self.call('login_form', 'GET', '/login/'):
+            return False
+        return await self.call('login', 'POST', '/login/', {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self.client.cookies.get('csrftoken', ''),
+        }, expected=(302,))
+
+    def actions(self):
+        """(weight, coroutine factory) pairs for this role"""
+        if self.mix == 'poll':
+            return [
+                (60, lambda: self.poll('api_stats', '/api/equipment/stats/')),
+                (30, lambda: self.poll('api_status', f'/api/equipment/{self.rng.choice(self.machine_ids)}/status/')),
+                (10, lambda: self.poll('api_list', '/api/equipment/list/')),
+            ]
+        dashboard = {
+            'administrator': '/admin-dashboard/',
+            'maintenance': '/maintenance-dashboard/',
+            'quality': '/quality-dashboard/',
+        }[self.role]
+        mix = [
+            (30, lambda: self.call('dashboard', 'GET', dashboard)),
+            (15, lambda: self.call('dashboard_search', 'GET', f'{dashboard}?{urlencode({"search": self.rng.choice(SEARCH_TERMS)})}')),
+            (30, lambda: self.call('api_stats', 'GET', '/api/equipment/stats/')),
+            (10, lambda: self.call('equipment_detail', 'GET', f'/equipment/{self.rng.choice(self.machine_ids)}/')),
+        ]
+        if self.role == 'maintenance':
+            mix.append((20, self.complete_procedure))
+        return mix
+
+    async def poll(self, route, path):
+        """GET that revalidates with the ETag of this user's previous response, as a poller would"""
+        headers = {'If-None-Match': self.etags[path]} if path in self.etags else None
+        return await self.call(route, 'GET', path, headers=headers, expected=(200, 304))
+
+    async def complete_procedure(self):
+        machine_id = self.rng.choice(self.machine_ids)
+        # 302 = saved, 200 = version conflict re-rendered for the user to resubmit
+        return await self.call('complete_procedure', 'POST', f'/maintenance/complete-procedure/{machine_id}/', {
+            'procedure_type': self.rng.choice(('maintenance', 'calibration')),
+            'completion_date': date.today().isoformat(),
+            'notes': 'load test',
+            'idempotency_key': uuid.uuid4().hex,
+        }, expected=(200, 302))
+
+    async def run(self, username, password, deadline):
+        try:
+            if not await self.login(username, password):
+                return
+            weights, factories = zip(*self.actions())
+            while time.perf_counter() < deadline:
+                await self.rng.choices(factories, weights)[0]()
+                if self.think_time:
+                    await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+        finally:
+            await self.client.close()
+
+
+def assign_roles(concurrency, role_mix):
+    """Spread `concurrency` virtual users over the roles according to role_mix"""
+    total = sum(role_mix.values())
+    roles = []
+    for role, share in role_mix.items():
+        roles.extend([role] * round(concurrency * share / total))
+    cycle = itertools.cycle(role_mix)
+    while len(roles) < concurrency:
+        roles.append(next(cycle))
+    return roles[:concurrency]
+
+
+async def run_load(base_url, accounts, machine_ids, concurrency=20, duration=30.0,
+                   role_mix=None, think_time=0.0, timeout=30.0, seed=None, mix='browse'):
+    """
+    Drive `concurrency` virtual users against base_url for `duration` seconds.
+    accounts maps each role to a list of (username, password) pairs; mix is
+    one of MIXES.
+    """
+    stats = LoadStats()
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + duration
+    next_account = {role: itertools.cycle(pairs) for role, pairs in accounts.items()}
+
+    tasks = []
+    for role in assign_roles(concurrency, role_mix or DEFAULT_ROLE_MIX):
+        if role not in next_account:
+            continue
+        username, password = next(next_account[role])
+        user = VirtualUser(
+            HttpClient(base_url, timeout), stats, role, machine_ids,
+            think_time=think_time, rng=random.Random(rng.random()), mix=mix,
+        )
+        tasks.append(asyncio.create_task(user.run(username, password, deadline)))
+    await asyncio.gather(*tasks)
+    stats.finished = time.perf_counter()
+    return stats.summary()
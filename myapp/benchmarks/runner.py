@@ -0,0 +1,142 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from ..query_inspector import QueryInspector
+from .dataset import create_bench_users, seed_equipment
+from .scenarios import SCENARIOS
+
+DEFAULT_THRESHOLD = 0.2  # 20% slower (or larger) than the baseline is a regression
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def _request(client, scenario):
+    response = client.get(scenario.url, scenario.params)
+    if response.status_code != 200:
+        raise BenchmarkError(f'{scenario.name}: {scenario.url} returned {response.status_code}')
+    return response
+
+
+def measure(func, warmup=2, repeat=10):
+    """Time func after warming up; count its queries and peak Python allocations once each"""
+    for _ in range(warmup):
+        func()
+
+    with QueryInspector() as inspector:
+        func()
+
+    # tracemalloc slows everything down, so it gets a run of its own
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        'min': timings[0],
+        'median': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'mean': statistics.fmean(timings),
+        'repeat': repeat,
+        'queries': inspector.count,
+        'writes': inspector.writes,
+        'peak_memory': peak,
+    }
+
+
+def run_benchmarks(sizes, scenarios=None, warmup=2, repeat=10, seed=0, progress=None):
+    """Seed each size in turn (smallest first) and measure every scenario against it"""
+    scenarios = SCENARIOS if scenarios is None else scenarios
+    results = {}
+    overrides = override_settings(
+        ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+        # The manifest only exists after collectstatic
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    with overrides:
+        users = create_bench_users()
+        clients = {}
+        for role, user in users.items():
+            clients[role] = Client()
+            clients[role].force_login(user)
+
+        for size in sorted(sizes):
+            seed_equipment(size, seed=seed)
+            results[str(size)] = {}
+            for scenario in scenarios:
+                if scenario.func is not None:
+                    func = scenario.func
+                else:
+                    client = clients[scenario.role]
+                    func = lambda client=client, scenario=scenario: _request(client, scenario)
+                result = measure(func, warmup=warmup, repeat=repeat)
+                results[str(size)][scenario.name] = result
+                if progress:
+                    progress(size, scenario, result)
+
+    return {
+        'meta': {
+            'recorded_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'warmup': warmup,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Scenarios that got slower, ran more queries or used more memory than the baseline"""
+    regressions = []
+    for size, scenarios in results['results'].items():
+        for name, current in scenarios.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['median'] > previous['median'] * (1 + threshold):
+                regressions.append(
+                    f"{name} @ {size}: median {current['median'] * 1000:.1f}ms, "
+                    f"baseline {previous['median'] * 1000:.1f}ms"
+                )
+            if current['queries'] > previous['queries']:
+                regressions.append(f"{name} @ {size}: {current['queries']} queries, baseline {previous['queries']}")
+            if current.get('writes', 0) > previous.get('writes', 0):
+                regressions.append(f"{name} @ {size}: {current['writes']} writes, baseline {previous['writes']}")
+            if current['peak_memory'] > previous['peak_memory'] * (1 + threshold):
+                regressions.append(
+                    f"{name} @ {size}: peak memory {current['peak_memory'] / 1024:.0f}KiB, "
+                    f"baseline {previous['peak_memory'] / 1024:.0f}KiB"
+                )
+    return regressions
+
+
+def save_results(results, path):
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2)
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
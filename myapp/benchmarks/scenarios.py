@@ -0,0 +1,36 @@
+from ..models import Equipment
+from ..utils.charts import create_upcoming_tasks_chart
+
+
+class Scenario:
+    """A page or API request made as `role`, or a plain callable"""
+
+    def __init__(self, name, role=None, url=None, params=None, func=None):
+        self.name = name
+        self.role = role
+        self.url = url
+        self.params = params or {}
+        self.func = func
+
+    def __repr__(self):
+        return f'<Scenario {self.name}>'
+
+
+def render_chart():
+    return create_upcoming_tasks_chart(Equipment.objects.all())
+
+
+SCENARIOS = [
+    Scenario('admin_dashboard', 'administrator', '/admin-dashboard/'),
+    Scenario('maintenance_dashboard', 'maintenance', '/maintenance-dashboard/'),
+    Scenario('quality_dashboard', 'quality', '/quality-dashboard/'),
+    Scenario('admin_dashboard_search', 'administrator', '/admin-dashboard/', {'search': 'Pump'}),
+    Scenario('admin_dashboard_overdue', 'administrator', '/admin-dashboard/', {'status': 'overdue_maintenance'}),
+    Scenario('equipment_list', 'administrator', '/equipment/'),
+    Scenario('equipment_list_search', 'administrator', '/equipment/', {'search': 'Lab 1'}),
+    Scenario('equipment_detail', 'administrator', '/equipment/1/'),
+    Scenario('api_status', 'administrator', '/api/equipment/1/status/'),
+    Scenario('api_list', 'administrator', '/api/equipment/list/'),
+    Scenario('api_stats', 'administrator', '/api/equipment/stats/'),
+    Scenario('upcoming_tasks_chart', func=render_chart),
+]
@@ -0,0 +1,83 @@
+"""
+Database writes caused by sessions and flash messages.
+
+A "visit" is what a technician does all shift: complete a procedure (POST,
+which flashes a success message) and land back on the dashboard (GET, which
+displays and consumes it). Each session/message storage combination replays
+that visit and counts the INSERT/UPDATE/DELETE statements of both requests.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.test import Client
+from django.test.utils import override_settings
+
+from ..models import Equipment
+from ..query_inspector import QueryInspector
+from ..utils.idempotency import new_idempotency_key
+from .dataset import create_bench_users
+from .runner import BenchmarkError
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+MESSAGE_STORAGES = {
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'fallback': 'django.contrib.messages.storage.fallback.FallbackStorage',
+}
+# (session engine, message storage) - the first one is the all-database baseline
+CONFIGURATIONS = [
+    ('db', 'session'),
+    ('db', 'fallback'),
+    ('cached_db', 'fallback'),
+    ('signed_cookies', 'cookie'),
+]
+
+
+def _writes(inspector):
+    return {'writes': inspector.writes, 'session_writes': inspector.writes_to('django_session')}
+
+
+def measure_visit(session_engine, message_storage, user, machine_id):
+    """Writes made by one completion POST and the dashboard GET it redirects to"""
+    overrides = override_settings(
+        SESSION_ENGINE=SESSION_ENGINES[session_engine],
+        MESSAGE_STORAGE=MESSAGE_STORAGES[message_storage],
+        ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    with overrides:
+        # A new client builds its middleware, and so picks up SESSION_ENGINE, on first use
+        client = Client()
+        client.force_login(user)
+
+        with QueryInspector() as post:
+            response = client.post(f'/maintenance/complete-procedure/{machine_id}/', {
+                'procedure_type': 'maintenance',
+                'completion_date': date.today().isoformat(),
+                'idempotency_key': new_idempotency_key(),
+            })
+        if response.status_code != 302:
+            raise BenchmarkError(f'Completing {machine_id} returned {response.status_code}')
+
+        with QueryInspector() as dashboard:
+            response = client.get(response.url)
+        if response.status_code != 200 or b'Maintenance completed' not in response.content:
+            raise BenchmarkError('The dashboard did not show the completion message')
+
+    return {'post': _writes(post), 'dashboard': _writes(dashboard)}
+
+
+def run_session_benchmark(configurations=None):
+    """Writes per visit for every configuration, keyed 'engine+storage'"""
+    user = create_bench_users()['maintenance']
+    machine_id = Equipment.objects.values_list('machine_id', flat=True).first()
+    if machine_id is None:
+        raise BenchmarkError('Seed some equipment first')
+    return {
+        f'{engine}+{storage}': measure_visit(engine, storage, user, machine_id)
+        for engine, storage in (configurations or CONFIGURATIONS)
+    }
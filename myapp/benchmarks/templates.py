@@ -0,0 +1,115 @@
+"""
+Dashboard render time per 1,000 table rows, Django templates vs Jinja2.
+
+Each dashboard template is rendered straight from a context holding `rows`
+machines in every table it loops over - no view, query or middleware - so
+the timings are the template engine alone. Jinja2 is only measured when
+the jinja2 package is installed. Each engine is timed twice: with the
+cached sections (utils/fragment_cache.py) rendered every time, and with
+them already in the cache ("+cache"), as on a dashboard visit between
+two equipment changes.
+"""
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.template import engines
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from ..forms import EquipmentFilterForm
+from ..models import Equipment
+from .dataset import create_bench_users, seed_equipment
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+
+def _admin_context(equipment):
+    return {
+        'total_users': 3,
+        'total_equipment': len(equipment),
+        'filtered_equipment_count': len(equipment),
+        'overdue_maintenance_count': len(equipment),
+        'overdue_calibration_count': len(equipment),
+        'due_soon_count': len(equipment),
+        'overdue_maintenance': equipment[:3],
+        'overdue_calibration': equipment[:3],
+        'due_soon': equipment[:3],
+        'search': '',
+        'filter_form': EquipmentFilterForm(initial={'status': 'overdue_maintenance'}),
+        'filtered_equipment': equipment,
+        'has_filters': True,
+    }, len(equipment) + 9
+
+
+def _maintenance_context(equipment):
+    return {
+        'total_equipment': len(equipment),
+        'filtered_equipment_count': len(equipment),
+        'overdue_maintenance_count': len(equipment),
+        'overdue_calibration_count': len(equipment),
+        'due_soon_maintenance_count': 0,
+        'due_soon_calibration_count': 0,
+        'search': '',
+        'filter_form': EquipmentFilterForm(initial={'status': 'overdue_maintenance'}),
+        'filtered_equipment': equipment,
+        'has_filters': True,
+        'due_calibration': equipment,
+        'due_maintenance': equipment,
+        'today': timezone.now().date(),
+    }, len(equipment) * 3
+
+
+# template: (role viewing it, context builder returning (context, table rows rendered))
+DASHBOARDS = {
+    'myapp/admin_dashboard.html': ('administrator', _admin_context),
+    'myapp/maintenance_dashboard.html': ('maintenance', _maintenance_context),
+}
+
+
+def available_engines():
+    return ('django', 'jinja2') if jinja2 is not None else ('django',)
+
+
+def _time_render(template, context, request, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        template.render(context, request)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_template_benchmark(rows=1000, repeat=5):
+    """Median render time in ms per 1,000 table rows, keyed by template then engine (and engine+cache)"""
+    seed_equipment(rows)
+    equipment = list(Equipment.objects.order_by('pk')[:rows])
+    users = create_bench_users()
+    django_templates = [engine for engine in settings.TEMPLATES if engine is not settings.JINJA2_TEMPLATES]
+
+    overrides = override_settings(
+        TEMPLATES=[settings.JINJA2_TEMPLATES, *django_templates] if jinja2 is not None else django_templates,
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    )
+    results = {}
+    with overrides:
+        for name, (role, build_context) in DASHBOARDS.items():
+            request = RequestFactory().get('/')
+            request.user = users[role]
+            context, table_rows = build_context(equipment)
+            context.update(search='', machine_type='', status='overdue_maintenance')
+            results[name] = {}
+            for engine in available_engines():
+                template = engines[engine].get_template(name)
+                # A version of its own, so no section cached by an earlier run is hit
+                for label, timeout in ((engine, 0), (f'{engine}+cache', 60)):
+                    context.update(fragment_timeout=timeout, fragment_version=uuid.uuid4().hex)
+                    template.render(context, request)  # compile, and fill the section cache
+                    seconds = _time_render(template, context, request, repeat)
+                    results[name][label] = seconds * 1000 * 1000 / table_rows
+    return results
@@ -0,0 +1,151 @@
+"""
+Response compression for pages and API responses.
+
+Bodies are gzipped, or brotli-compressed when the optional brotli package is
+installed and the client accepts "br". Only types in COMPRESSION_TYPES of
+at least COMPRESSION_MIN_SIZE bytes are compressed. Images (the PNG charts
+are compressed already), responses that carry a Content-Encoding (WhiteNoise's
+pre-compressed static files) and Server-Sent Events pass through untouched -
+a compressor holds events back until its buffer fills. Other streaming
+responses are compressed chunk by chunk with a flush after each chunk, so a
+client still receives every chunk as soon as it is sent.
+"""
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024  # bytes; smaller bodies barely shrink
+DEFAULT_TYPES = (
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript', 'application/javascript',
+    'application/json', 'application/xml', 'image/svg+xml',
+)
+NEVER_COMPRESSED = {'text/event-stream'}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 11 is for static assets; 4-6 is the usual choice for dynamic pages
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """The best available encoding the Accept-Encoding header allows, or None"""
+    accepted = {}
+    for part in accept_encoding.lower().split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    # Django's random gzip filename, which varies the compressed length (BREACH mitigation)
+    return compress_string(content, max_random_bytes=GZipMiddleware.max_random_bytes)
+
+
+def _stream_compressor(encoding):
+    """(compress and flush one chunk, finish the stream) for one streamed response"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 - gzip header and trailer
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    process, finish = _stream_compressor(encoding)
+    for chunk in chunks:
+        if chunk:
+            yield process(chunk)
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding):
+    process, finish = _stream_compressor(encoding)
+    async for chunk in chunks:
+        if chunk:
+            yield process(chunk)
+    yield finish()
+
+
+def _media_type(response):
+    return response.get('Content-Type', '').split(';')[0].strip().lower()
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding') or response.status_code in (204, 206, 304):
+        return False
+    media_type = _media_type(response)
+    if media_type in NEVER_COMPRESSED:
+        return False
+    if media_type not in getattr(settings, 'COMPRESSION_TYPES', DEFAULT_TYPES):
+        return False
+    return response.streaming or len(response.content) >= getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+
+class CompressionMiddleware:
+    """Compresses allowed responses for clients that accept it; place it above anything reading the body"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag names exact bytes; the compressed body only matches weakly
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,313 @@
+"""
+Server-Sent Events for equipment changes.
+
+Every Equipment save or delete writes an EquipmentEvent row from its
+post_save/post_delete receiver. Equipment.save(), save_versioned() and
+deletes run their receivers inside the transaction that makes the change,
+so an event exists exactly when its change commits, no matter which worker
+made it. In each ASGI process one EventBroker task polls that
+table and fans new events out to the connected streams; a "counts" event
+follows each batch so dashboards know to refresh their totals. Streams
+resume from the Last-Event-ID header after a reconnect. Under WSGI the
+endpoint returns the pending events and closes, and EventSource's automatic
+reconnect turns that into polling.
+
+Events are read in commit order. SQLite serializes writers, so ids already
+are; on PostgreSQL a transaction can commit after one holding a higher id,
+so there the cursor is (id of the change's transaction, event id) and only
+transactions older than every one still running are read.
+"""
+import asyncio
+import json
+import logging
+import random
+import weakref
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import EquipmentEvent
+from .roles import login_required
+from .utils.conditional import equipment_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0  # seconds between checks of the event table
+DEFAULT_HEARTBEAT = 15.0  # seconds of silence before a keep-alive comment
+DEFAULT_RETENTION = 60 * 60  # seconds of events kept for reconnecting streams
+DEFAULT_STREAM_MAX_AGE = 10 * 60  # seconds before a stream is closed for the client to reconnect
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Fraction of recorded events that also prune expired ones
+PRUNE_PROBABILITY = 0.01
+BATCH_SIZE = 500
+RETRY_MS = 3000  # EventSource reconnect delay
+
+# Fields that a procedure completion writes, besides the bookkeeping ones
+_COMPLETION_FIELDS = {'last_maintenance_date', 'last_calibration_date'}
+_BOOKKEEPING_FIELDS = {'updated_at', 'version'}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def equipment_payload(equipment):
+    def iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        'machine_id': equipment.machine_id,
+        'machine_name': equipment.machine_name,
+        'machine_location': equipment.machine_location,
+        'last_maintenance_date': iso(equipment.last_maintenance_date),
+        'last_calibration_date': iso(equipment.last_calibration_date),
+        'next_maintenance_date': iso(equipment.next_maintenance_date),
+        'next_calibration_date': iso(equipment.next_calibration_date),
+        'is_maintenance_overdue': equipment.is_maintenance_overdue,
+        'is_calibration_overdue': equipment.is_calibration_overdue,
+        'version': equipment.version,
+    }
+
+
+def record_equipment_saved(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        kind = 'created'
+    elif update_fields and set(update_fields) - _BOOKKEEPING_FIELDS <= _COMPLETION_FIELDS:
+        kind = 'completed'
+    else:
+        kind = 'updated'
+    _record(kind, instance.pk, equipment_payload(instance))
+
+
+def record_equipment_deleted(sender, instance, **kwargs):
+    _record('deleted', instance.pk, {'machine_id': instance.pk})
+
+
+def _commit_ordered():
+    """True where ids can commit out of order, so reads go by transaction id"""
+    return connections[router.db_for_write(EquipmentEvent)].vendor == 'postgresql'
+
+
+def _record(kind, machine_id, payload):
+    # Called inside the change's transaction (see Equipment.save()) - the event commits or rolls back with it
+    event = EquipmentEvent(kind=kind, machine_id=machine_id, payload=payload)
+    if _commit_ordered():
+        event.txid = RawSQL('txid_current()', ())
+    event.save()
+    if random.random() < PRUNE_PROBABILITY:
+        prune_events()
+
+
+def event_cursor(event):
+    """(txid, id) position just after an event; txid is 0 where ids are commit-ordered"""
+    return (event.txid or 0, event.id)
+
+
+def format_cursor(cursor):
+    txid, event_id = cursor
+    return f'{txid}.{event_id}' if txid else str(event_id)
+
+
+def parse_cursor(value):
+    """Cursor from a Last-Event-ID; None when it isn't one"""
+    txid, _, event_id = (value or '').rpartition('.')
+    try:
+        return (int(txid) if txid else 0, int(event_id))
+    except ValueError:
+        return None
+
+
+def _final_events():
+    """Events no running transaction can still add to in front of"""
+    if not _commit_ordered():
+        return EquipmentEvent.objects.order_by('id')
+    # Transactions below the snapshot's xmin have all ended; the current one sees its own events
+    return EquipmentEvent.objects.filter(
+        Q(txid__lt=RawSQL('txid_snapshot_xmin(txid_current_snapshot())', ())) |
+        Q(txid=RawSQL('txid_current_if_assigned()', ()))
+    ).order_by('txid', 'id')
+
+
+def events_since(cursor, limit=BATCH_SIZE):
+    txid, event_id = cursor
+    if not _commit_ordered():
+        return list(_final_events().filter(id__gt=event_id)[:limit])
+    return list(_final_events().filter(Q(txid__gt=txid) | Q(txid=txid, id__gt=event_id))[:limit])
+
+
+def latest_cursor():
+    event = _final_events().reverse().only('id', 'txid').first()
+    return event_cursor(event) if event else (0, 0)
+
+
+def prune_events():
+    """Delete events older than EVENTS_RETENTION seconds. Returns the number removed"""
+    cutoff = timezone.now() - timedelta(seconds=_setting('EVENTS_RETENTION', DEFAULT_RETENTION))
+    deleted, _ = EquipmentEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def counts_payload():
+    version = equipment_version()
+    return {
+        'total_equipment': version['rows'],
+        'last_change': version['last_change'].isoformat() if version['last_change'] else None,
+    }
+
+
+def format_event(cursor, kind, data):
+    lines = [f'id: {format_cursor(cursor)}'] if cursor is not None else []
+    lines.append(f'event: {kind}')
+    lines.append(f'data: {json.dumps(data)}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class EventBroker:
+    """Polls the event table for one event loop and fans events out to subscriber queues"""
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or _setting('EVENTS_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+        self.subscribers = set()
+        self.cursor = None
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def _run(self):
+        if self.cursor is None:
+            self.cursor = await sync_to_async(latest_cursor)()
+        while self.subscribers:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception('Equipment event poll failed')
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll(self):
+        events = await sync_to_async(events_since)(self.cursor)
+        if not events:
+            return
+        self.cursor = event_cursor(events[-1])
+        counts = await sync_to_async(counts_payload)()
+        for queue in list(self.subscribers):
+            try:
+                for event in events:
+                    queue.put_nowait((event_cursor(event), event.kind, event.payload))
+                queue.put_nowait((None, 'counts', counts))
+            except asyncio.QueueFull:
+                # A stalled client - end its stream; it resumes from Last-Event-ID
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+_brokers = weakref.WeakKeyDictionary()
+
+
+def get_broker():
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        broker = _brokers[loop] = EventBroker()
+    return broker
+
+
+async def _client_gone(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_events(cursor=None, heartbeat=None, receive=None, max_age=None):
+    """
+    Async iterator of SSE frames: missed events first, then live ones. Ends when
+    the client disconnects (seen on the ASGI receive channel, when given) or
+    after max_age seconds, and EventSource reconnects from the last id.
+    """
+    heartbeat = heartbeat or _setting('EVENTS_HEARTBEAT', DEFAULT_HEARTBEAT)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (max_age or _setting('EVENTS_STREAM_MAX_AGE', DEFAULT_STREAM_MAX_AGE))
+    broker = get_broker()
+    queue = broker.subscribe()
+    # Django 4.2 stops reading receive() once the body is in, so nothing else consumes it
+    gone = asyncio.ensure_future(_client_gone(receive)) if receive else None
+    try:
+        yield f'retry: {RETRY_MS}\n\n'.encode()
+        if cursor is not None:
+            # Replay what this client missed while it was reconnecting
+            for event in await sync_to_async(events_since)(cursor, limit=SUBSCRIBER_QUEUE_SIZE):
+                yield format_event(event_cursor(event), event.kind, event.payload)
+                cursor = event_cursor(event)
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {get, gone} - {None}, timeout=min(heartbeat, remaining), return_when=asyncio.FIRST_COMPLETED,
+            )
+            if get not in done:
+                get.cancel()
+                if gone in done or loop.time() >= deadline:
+                    return
+                yield b': keep-alive\n\n'
+                continue
+            item = get.result()
+            if item is None:
+                return
+            position, kind, data = item
+            if position is not None and cursor is not None and position <= cursor:
+                continue  # already replayed
+            yield format_event(position, kind, data)
+    finally:
+        broker.unsubscribe(queue)
+        if gone is not None:
+            gone.cancel()
+
+
+def _last_event_cursor(request):
+    return parse_cursor(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+
+
+@login_required
+async def equipment_events(request):
+    """text/event-stream of equipment changes for any logged-in user"""
+    cursor = _last_event_cursor(request)
+    if not isinstance(request, ASGIRequest):
+        # Can't hold a worker thread open under WSGI - answer with what's pending and let the client reconnect
+        if cursor is None:
+            cursor = await sync_to_async(latest_cursor)()
+        events = await sync_to_async(events_since)(cursor)
+        body = f'retry: {RETRY_MS}\n\n'.encode() + b''.join(
+            format_event(event_cursor(e), e.kind, e.payload) for e in events
+        )
+        if events:
+            body += format_event(None, 'counts', await sync_to_async(counts_payload)())
+        elif cursor != (0, 0):
+            # Keep the client's position when nothing happened
+            body += f'id: {format_cursor(cursor)}\n\n'.encode()
+        response = HttpResponse(body, content_type='text/event-stream')
+    else:
+        # The ASGI receive channel, put in the scope by the project's asgi.py
+        receive = request.scope.get('myapp.receive')
+        response = StreamingHttpResponse(stream_events(cursor, receive=receive), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
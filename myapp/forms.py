@@ -33,6 +33,9 @@ class CustomUserCreationForm(UserCreationForm):
         return user
 #Defined fields for Equipment    
 class EquipmentForm(forms.ModelForm):
+    # Row version the user started editing from (optimistic concurrency)
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+    
     class Meta:
         model = Equipment
         fields = [
@@ -175,4 +178,5 @@ class ProcedureCompleteForm(forms.Form):
         widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         required=False,
         label="Notes (optional)"
-    )
\ No newline at end of file
+    )
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Non-blocking structured logging.
+
+AsyncQueueHandler is the only handler request threads touch: it puts the
+record on an in-memory queue and returns. A QueueListener thread formats the
+record as one JSON object per line and does the actual I/O. Messages are
+formatted in that thread too, so log with %-style arguments
+(logger.info('... %s', value)) rather than f-strings. DEBUG records are
+sampled by DebugSampleFilter before they are queued.
+"""
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+QUEUE_SIZE = 10000
+
+# Attributes every LogRecord has - anything else was passed with extra={...}
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any extra={...} fields"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str)
+
+
+class DebugSampleFilter(logging.Filter):
+    """Keep 1 in `every` DEBUG records per call site; INFO and above always pass"""
+
+    def __init__(self, every=1):
+        super().__init__()
+        self.every = max(int(every), 1)
+        self._counters = defaultdict(itertools.count)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        return next(self._counters[(record.pathname, record.lineno)]) % self.every == 0
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Queues records for a background QueueListener that writes JSON lines to
+    `filename` (or `stream`, stderr by default). Records are dropped, never
+    waited on, when the queue is full.
+    """
+
+    def __init__(self, stream=None, filename=None):
+        super().__init__(queue.Queue(maxsize=QUEUE_SIZE))
+        if filename:
+            target = logging.FileHandler(filename, encoding='utf-8', delay=True)
+        else:
+            target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JsonFormatter())
+        self.target = target
+        self.dropped = 0
+        self._lock_listener = threading.Lock()
+        self.listener = None
+        self.start()
+        atexit.register(self.stop)
+        # gunicorn --preload forks after settings load; threads don't survive a fork
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def start(self):
+        with self._lock_listener:
+            if self.listener is None:
+                self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+                self.listener.start()
+
+    def stop(self):
+        """Flush everything queued so far and stop the listener thread"""
+        with self._lock_listener:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+        self.target.flush()
+
+    def _restart_in_child(self):
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.listener = None
+        self._lock_listener = threading.Lock()
+        self.start()
+
+    def prepare(self, record):
+        # Unlike QueueHandler.prepare, leave msg % args for the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
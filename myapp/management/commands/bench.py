@@ -0,0 +1,113 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import setup_databases, teardown_databases
+
+from myapp.benchmarks import (
+    SCENARIOS, compare, load_results, run_benchmarks, run_compression_benchmark, run_session_benchmark,
+    run_template_benchmark, save_results,
+)
+from myapp.benchmarks.runner import DEFAULT_THRESHOLD
+
+
+class Command(BaseCommand):
+    help = 'Time dashboards, list views, APIs, search and charts against seeded datasets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, nargs='+', default=[10000], help='Equipment rows to seed (one run per size)')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed runs before measuring')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per scenario')
+        parser.add_argument('--only', nargs='+', default=None, help='Scenario names to run (default: all)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the dataset')
+        parser.add_argument('--output', default='bench-results.json', help='Where to write the JSON results')
+        parser.add_argument('--baseline', default=None, help='Earlier results file to compare against')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown, 0.2 = 20%%')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit non-zero when a regression is found')
+        parser.add_argument('--sessions', action='store_true',
+                            help='Also count DB writes per dashboard visit for each session/message storage')
+        parser.add_argument('--compression', action='store_true',
+                            help='Also report bytes sent per route uncompressed, gzipped and brotli-compressed')
+        parser.add_argument('--templates', action='store_true',
+                            help='Also time dashboard template rendering per 1k rows, Django engine vs Jinja2, '
+                                 'with and without the cached sections')
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [s for s in SCENARIOS if s.name in options['only']]
+            unknown = set(options['only']) - {s.name for s in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        baseline = load_results(options['baseline']) if options['baseline'] else None
+
+        # Seed and measure in a throwaway test database, never the real one
+        old_config = setup_databases(verbosity=0, interactive=False, aliases=set(connections))
+        try:
+            results = run_benchmarks(
+                options['size'], scenarios,
+                warmup=options['warmup'], repeat=options['repeat'], seed=options['seed'],
+                progress=self.report,
+            )
+            if options['sessions']:
+                results['sessions'] = run_session_benchmark()
+                self.report_sessions(results['sessions'])
+            if options['compression']:
+                results['compression'] = run_compression_benchmark()
+                self.report_compression(results['compression'])
+            if options['templates']:
+                results['templates'] = run_template_benchmark(repeat=options['repeat'])
+                self.report_templates(results['templates'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        save_results(results, options['output'])
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is None:
+            return
+        regressions = compare(results, baseline, options['threshold'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+            return
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(regression))
+        if options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+
+    def report(self, size, scenario, result):
+        self.stdout.write(
+            f"{size:>8} {scenario.name:28} median={result['median'] * 1000:8.1f}ms  "
+            f"p95={result['p95'] * 1000:8.1f}ms  queries={result['queries']:3}  writes={result['writes']:2}  "
+            f"peak={result['peak_memory'] / 1024:8.0f}KiB"
+        )
+
+    def report_sessions(self, sessions):
+        self.stdout.write(f"\n{'sessions+messages':26} {'POST writes':>12} {'dashboard writes':>17} {'session writes':>15}")
+        baseline_name = next(iter(sessions))
+        baseline = sessions[baseline_name]['post']['writes'] + sessions[baseline_name]['dashboard']['writes']
+        for name, visit in sessions.items():
+            saved = baseline - visit['post']['writes'] - visit['dashboard']['writes']
+            session_writes = visit['post']['session_writes'] + visit['dashboard']['session_writes']
+            self.stdout.write(
+                f"{name:26} {visit['post']['writes']:12} {visit['dashboard']['writes']:17} {session_writes:15}"
+                + (f"  {saved} fewer than {baseline_name}" if saved else '')
+            )
+
+    def report_compression(self, compression):
+        encodings = list(next(iter(compression.values())))
+        self.stdout.write(f"\n{'route':40}" + ''.join(f'{encoding:>12}' for encoding in encodings) + '  saved')
+        for url, sizes in compression.items():
+            smallest = min(sizes.values())
+            saved = sizes['identity'] - smallest
+            self.stdout.write(
+                f'{url:40}' + ''.join(f'{size:12}' for size in sizes.values())
+                + f"  {saved} bytes ({saved / sizes['identity']:.0%})"
+            )
+
+    def report_templates(self, templates):
+        engines = list(next(iter(templates.values())))
+        self.stdout.write(f"\n{'template (ms per 1k rows)':36}" + ''.join(f'{engine:>14}' for engine in engines))
+        for name, timings in templates.items():
+            line = f'{name:36}' + ''.join(f'{ms:14.1f}' for ms in timings.values())
+            if 'jinja2' in timings:
+                line += f"  {timings['django'] / timings['jinja2']:.1f}x faster with jinja2"
+            self.stdout.write(line)
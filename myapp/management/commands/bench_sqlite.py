@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from myapp.utils.sqlite import apply_pragmas, get_pragmas
+
+class Command(BaseCommand):
+    help = 'Compare SQLite read/write concurrency with default settings and the tuned pragmas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=6, help='Concurrent reader threads')
+        parser.add_argument('--writers', type=int, default=2, help='Concurrent writer threads')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+        parser.add_argument('--rows', type=int, default=5000, help='Equipment rows to seed')
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('default', {}, 5.0),
+            ('tuned', get_pragmas(), 20.0),
+        ]
+        for name, pragmas, timeout in profiles:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                self.seed(path, options['rows'])
+                result = self.run(path, pragmas, timeout, options)
+            self.stdout.write(
+                f"{name:8} reads/s={result['reads'] / options['seconds']:9.1f}  "
+                f"writes/s={result['writes'] / options['seconds']:8.1f}  "
+                f"locked errors={result['errors']}"
+            )
+
+    def seed(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.execute(
+            'CREATE TABLE equipment (machine_id TEXT PRIMARY KEY, machine_name TEXT, '
+            'last_maintenance_date TEXT, version INTEGER)'
+        )
+        conn.executemany(
+            'INSERT INTO equipment VALUES (?, ?, ?, 1)',
+            ((f'EQ{i:06d}', f'Machine {i}', '2025-01-01') for i in range(rows)),
+        )
+        conn.commit()
+        conn.close()
+
+    def run(self, path, pragmas, timeout, options):
+        stop = threading.Event()
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def connect():
+            conn = sqlite3.connect(path, timeout=timeout)
+            apply_pragmas(conn.cursor(), pragmas)
+            return conn
+
+        def reader():
+            conn = connect()
+            done = 0
+            while not stop.is_set():
+                try:
+                    # Dashboard-style scan of the whole table
+                    conn.execute("SELECT COUNT(*) FROM equipment WHERE last_maintenance_date < '2025-06-01'").fetchone()
+                    done += 1
+                except sqlite3.OperationalError:
+                    with lock:
+                        counts['errors'] += 1
+            conn.close()
+            with lock:
+                counts['reads'] += done
+
+        def writer(offset):
+            conn = connect()
+            done = 0
+            i = offset
+            while not stop.is_set():
+                try:
+                    # Completion-style versioned single-row update
+                    conn.execute(
+                        "UPDATE equipment SET last_maintenance_date = date('now'), version = version + 1 "
+                        "WHERE machine_id = ?", (f'EQ{i % options["rows"]:06d}',)
+                    )
+                    conn.commit()
+                    done += 1
+                except sqlite3.OperationalError:
+                    conn.rollback()
+                    with lock:
+                        counts['errors'] += 1
+                i += 7
+            conn.close()
+            with lock:
+                counts['writes'] += done
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return counts
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from myapp.benchmarks import create_load_accounts, seed_equipment
+from myapp.benchmarks.load import DEFAULT_ROLE_MIX, MIXES, run_load
+from myapp.models import Equipment
+
+LOAD_PASSWORD = 'load-test-password'
+SERVERS = ('wsgi', 'asgi')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class Command(BaseCommand):
+    help = 'Replay a concurrent mix of technician/supervisor traffic against a local server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=None,
+                            help='Target an already running server that uses this database (default: start one)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Virtual users')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+        parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between a user\'s requests')
+        parser.add_argument('--size', type=int, default=5000, help='Equipment rows to seed')
+        parser.add_argument('--users-per-role', type=int, default=10, help='Seeded accounts per role')
+        parser.add_argument('--maintenance', type=float, default=DEFAULT_ROLE_MIX['maintenance'],
+                            help='Share of virtual users that are technicians')
+        parser.add_argument('--quality', type=float, default=DEFAULT_ROLE_MIX['quality'],
+                            help='Share of virtual users that are quality engineers')
+        parser.add_argument('--administrator', type=float, default=DEFAULT_ROLE_MIX['administrator'],
+                            help='Share of virtual users that are administrators')
+        parser.add_argument('--mix', choices=MIXES, default='browse',
+                            help='browse: pages and completions; poll: JSON API revalidation')
+        parser.add_argument('--server', choices=SERVERS + ('both',), default='wsgi',
+                            help='Local server to start: gunicorn (wsgi), uvicorn (asgi) or one after the other')
+        parser.add_argument('--workers', type=int, default=settings.GUNICORN_WORKERS, help='Server worker processes')
+        parser.add_argument('--threads', type=int, default=settings.GUNICORN_THREADS, help='gunicorn threads per worker')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout')
+        parser.add_argument('--output', default=None, help='Also write the results as JSON')
+        parser.add_argument('--server-log', default=None, help='File for the local server\'s output (default: discarded)')
+
+    def handle(self, *args, **options):
+        role_mix = {role: options[role] for role in DEFAULT_ROLE_MIX if options[role] > 0}
+
+        if options['url']:
+            accounts, machine_ids = self.seed(options)
+            summary = self.run(options['url'], accounts, machine_ids, role_mix, options)
+            self.report(summary)
+        else:
+            servers = SERVERS if options['server'] == 'both' else (options['server'],)
+            summaries = self.run_local(servers, role_mix, options)
+            for server, summary in summaries.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(f'\n{server}'))
+                self.report(summary)
+            if len(summaries) > 1:
+                self.compare(summaries)
+            summary = summaries if len(summaries) > 1 else summaries[servers[0]]
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(summary, handle, indent=2)
+
+    def seed(self, options):
+        self.stdout.write(f"Seeding {options['size']} equipment rows and {options['users_per_role']} users per role")
+        seed_equipment(options['size'])
+        accounts = create_load_accounts(options['users_per_role'], LOAD_PASSWORD)
+        machine_ids = list(Equipment.objects.values_list('machine_id', flat=True)[:1000])
+        if not machine_ids:
+            raise CommandError('No equipment to load test against')
+        return accounts, machine_ids
+
+    def run(self, url, accounts, machine_ids, role_mix, options):
+        self.stdout.write(f"Running {options['concurrency']} virtual users for {options['duration']}s against {url}")
+        return asyncio.run(run_load(
+            url, accounts, machine_ids,
+            concurrency=options['concurrency'], duration=options['duration'], role_mix=role_mix,
+            think_time=options['think_time'], timeout=options['timeout'], mix=options['mix'],
+        ))
+
+    def run_local(self, servers, role_mix, options):
+        """Seed a throwaway database once and run the load against each server in turn"""
+        for server in servers:
+            self.check_server(server)  # before the slow seeding
+        with tempfile.TemporaryDirectory() as tmp:
+            # Seed a throwaway copy of the database, then point the server at it
+            if connection.vendor == 'sqlite':
+                connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmp, 'loadtest.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                accounts, machine_ids = self.seed(options)
+                connections.close_all()
+                return {
+                    server: self.run_server(server, accounts, machine_ids, role_mix, options)
+                    for server in servers
+                }
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_server(self, server, accounts, machine_ids, role_mix, options):
+        port = free_port()
+        env = dict(os.environ)
+        env['DB_NAME' if connection.vendor == 'sqlite' else 'POSTGRES_DB'] = str(connection.settings_dict['NAME'])
+        env['WEB_CONCURRENCY'] = str(options['workers'])
+        env['GUNICORN_THREADS'] = str(options['threads'])
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+        # Every page uses {% static %}, which fails on a manifest storage before collectstatic
+        if hasattr(staticfiles_storage, 'read_manifest') and staticfiles_storage.read_manifest() is None:
+            self.stdout.write(self.style.WARNING('No staticfiles manifest - serving unhashed static URLs'))
+            env['STATICFILES_STORAGE'] = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        # Appended to, so `--server both` keeps both servers' output
+        log = open(options['server_log'], 'a') if options['server_log'] else subprocess.DEVNULL
+        process = subprocess.Popen(
+            self.server_command(port, options, server), env=env, cwd=os.getcwd(), stdout=log, stderr=log,
+        )
+        try:
+            if not wait_for_port(port):
+                raise CommandError(f'The {server} server did not start listening within 30 seconds')
+            return self.run(f'http://127.0.0.1:{port}', accounts, machine_ids, role_mix, options)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            if log is not subprocess.DEVNULL:
+                log.close()
+
+    def check_server(self, server):
+        if server == 'asgi' and find_spec('uvicorn') is None:
+            raise CommandError('The ASGI run needs uvicorn: pip install uvicorn')
+
+    def server_command(self, port, options, server='wsgi'):
+        if server == 'asgi':
+            # Async views and middleware: --threads doesn't apply, each worker is one event loop
+            module, attribute = settings.ASGI_APPLICATION.rsplit('.', 1)
+            return [
+                sys.executable, '-m', 'uvicorn',
+                '--workers', str(options['workers']),
+                '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning',
+                f'{module}:{attribute}',
+            ]
+        if find_spec('gunicorn') is not None:
+            module, attribute = settings.WSGI_APPLICATION.rsplit('.', 1)
+            return [
+                sys.executable, '-m', 'gunicorn',
+                '--workers', str(options['workers']), '--threads', str(options['threads']),
+                '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+                f'{module}:{attribute}',
+            ]
+        self.stdout.write(self.style.WARNING('gunicorn is not installed - falling back to runserver'))
+        return [sys.executable, '-m', 'django', 'runserver', '--noreload', f'127.0.0.1:{port}']
+
+    def report(self, summary):
+        self.stdout.write(
+            f"{'route':22} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>8}"
+        )
+        total = 0
+        for route, row in summary['routes'].items():
+            total += row['requests']
+            self.stdout.write(
+                f"{route:22} {row['requests']:9d} {row['throughput']:8.1f} {row['p50'] * 1000:8.1f} "
+                f"{row['p95'] * 1000:8.1f} {row['p99'] * 1000:8.1f} {row['error_rate']:8.1%}"
+            )
+            if row['errors']:
+                self.stdout.write(f"{'':22} errors: {row['errors']}")
+        self.stdout.write(f"{total} requests in {summary['elapsed']:.1f}s ({total / summary['elapsed']:.1f} req/s)")
+
+    def compare(self, summaries):
+        self.stdout.write(self.style.MIGRATE_HEADING('\nthroughput'))
+        baseline = None
+        for server, summary in summaries.items():
+            rate = sum(row['requests'] for row in summary['routes'].values()) / summary['elapsed']
+            change = f' ({rate / baseline - 1:+.0%} vs {SERVERS[0]})' if baseline else ''
+            self.stdout.write(f'{server:22} {rate:8.1f} req/s{change}')
+            baseline = baseline or rate
@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto the local replica file (local replica testing)'
+
+    def handle(self, *args, **options):
+        databases = settings.DATABASES
+        if 'replica' not in databases:
+            raise CommandError('No replica database configured - set DB_REPLICA_NAME')
+        if databases['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('sync_replica only handles SQLite; use PostgreSQL streaming replication')
+
+        source = sqlite3.connect(databases['default']['NAME'])
+        target = sqlite3.connect(databases['replica']['NAME'])
+        try:
+            # Online backup - consistent even while the app is writing
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Replica {databases['replica']['NAME']} refreshed from primary")
+        )
@@ -0,0 +1,315 @@
+"""
+Per-request performance metrics exposed at /metrics in the Prometheus text format.
+
+Each process aggregates in memory. When METRICS_DIR is set (one directory shared
+by all gunicorn workers) every process also snapshots its totals to
+<METRICS_DIR>/<pid>.json at most once per METRICS_FLUSH_INTERVAL seconds, and
+/metrics sums the snapshots of live workers so any worker can answer a scrape.
+gunicorn's child_exit hook (gunicorn.conf.py) removes an exited worker's file.
+"""
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .utils import sql_hooks
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1000, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000)
+
+METRIC_HELP = {
+    'myapp_http_request_duration_seconds': ('histogram', 'Time spent handling a request'),
+    'myapp_http_response_size_bytes': ('histogram', 'Size of the response body'),
+    'myapp_http_requests_total': ('counter', 'Requests handled, by status code'),
+    'myapp_db_queries_total': ('counter', 'SQL queries executed'),
+    'myapp_db_query_seconds_total': ('counter', 'Time spent in SQL queries'),
+    'myapp_template_render_seconds_total': ('counter', 'Time spent rendering templates'),
+}
+
+
+class Registry:
+    """Thread-safe in-process counters and histograms keyed by (name, labels)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name, labels, value=1.0):
+        with self.lock:
+            self.counters[(name, labels)] += value
+
+    def observe(self, name, labels, value, buckets):
+        index = bisect.bisect_left(buckets, value)
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                # Per-bucket (non-cumulative) counts, the last slot is +Inf
+                histogram = self.histograms[(name, labels)] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), list(counts), total, count]
+                    for (name, labels), (counts, total, count) in self.histograms.items()
+                ],
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+registry = Registry()
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+
+# Stats for the request currently being handled (per thread / asyncio task)
+_request_stats = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+
+
+def _sql_timer(execute, sql, params, many, context):
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - start
+
+
+sql_hooks.register(_sql_timer)
+
+
+_templates_instrumented = False
+
+
+def _instrument_templates():
+    """Time every Django template render (views call render() directly)"""
+    global _templates_instrumented
+    if _templates_instrumented:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        stats = _request_stats.get()
+        if stats is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+    Template.render = render
+    _templates_instrumented = True
+
+
+def _snapshot_path(directory):
+    return os.path.join(directory, f'{os.getpid()}.json')
+
+
+def flush(force=False):
+    """Write this process's totals to METRICS_DIR (rate limited unless forced)"""
+    global _last_flush
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return
+    now = time.monotonic()
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+    if not force and now - _last_flush < interval:
+        return
+    with _flush_lock:
+        _last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so a scrape never reads a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(registry.snapshot(), handle)
+        os.replace(tmp_path, _snapshot_path(directory))
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill(pid, 0) sends CTRL_C_EVENT on Windows, where gunicorn does not run anyway
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def mark_process_dead(pid, directory=None):
+    """Remove an exited worker's snapshot so it is no longer summed"""
+    directory = directory or getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return
+    try:
+        os.remove(os.path.join(directory, f'{pid}.json'))
+    except FileNotFoundError:
+        pass
+
+
+def collect():
+    """Merged snapshot: all worker files when METRICS_DIR is set, else this process"""
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        snapshots = [registry.snapshot()]
+    else:
+        flush(force=True)
+        snapshots = []
+        for filename in os.listdir(directory):
+            pid = filename[:-len('.json')]
+            # Skip workers that exited without their file being removed (killed, crashed master)
+            if not filename.endswith('.json') or not pid.isdigit() or not _pid_alive(int(pid)):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, counts, total, count in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+    return counters, histograms
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(counters, histograms):
+    by_name = defaultdict(list)
+    for (name, labels), value in counters.items():
+        by_name[name].append((labels, value))
+    for (name, labels), value in histograms.items():
+        by_name[name].append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name[name]):
+            if kind != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            counts, total, count = value
+            buckets = SIZE_BUCKETS if name.endswith('_bytes') else LATENCY_BUCKETS
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden('Invalid metrics token.')
+    counters, histograms = collect()
+    return HttpResponse(render_prometheus(counters, histograms), content_type='text/plain; version=0.0.4')
+
+
+class MetricsMiddleware:
+    """Records latency, SQL count/time, template time and response size per view"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _instrument_templates()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with self._measure() as stats:
+            response = self.get_response(request)
+        return self._record(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with self._measure() as stats:
+            response = await self.get_response(request)
+        return self._record(request, response, stats, time.perf_counter() - start)
+
+    @contextmanager
+    def _measure(self):
+        # _sql_timer counts into it from whichever thread runs the queries
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            _request_stats.reset(token)
+
+    def _record(self, request, response, stats, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        if view == 'metrics':
+            return response
+        labels = (('view', view), ('method', request.method))
+
+        registry.observe('myapp_http_request_duration_seconds', labels, elapsed, LATENCY_BUCKETS)
+        registry.inc('myapp_http_requests_total', labels + (('status', str(response.status_code)),))
+        registry.inc('myapp_db_queries_total', labels, stats.queries)
+        registry.inc('myapp_db_query_seconds_total', labels, stats.query_time)
+        registry.inc('myapp_template_render_seconds_total', labels, stats.template_time)
+        if not response.streaming:
+            registry.observe('myapp_http_response_size_bytes', labels, len(response.content), SIZE_BUCKETS)
+
+        flush()
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_alter_userprofile_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Row version for concurrent edits'),
+        ),
+    ]
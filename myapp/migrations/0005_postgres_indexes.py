@@ -0,0 +1,42 @@
+# PostgreSQL-only indexes for the dashboard search.
+# No-op on SQLite.
+
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    # Search uses icontains, which PostgreSQL runs as UPPER(col::text) LIKE UPPER(%s)
+    'CREATE INDEX IF NOT EXISTS equipment_machine_id_trgm ON myapp_equipment '
+    'USING gin (UPPER(machine_id::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS equipment_machine_name_trgm ON myapp_equipment '
+    'USING gin (UPPER(machine_name::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS equipment_location_trgm ON myapp_equipment '
+    'USING gin (UPPER(machine_location::text) gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS equipment_location_trgm',
+    'DROP INDEX IF EXISTS equipment_machine_name_trgm',
+    'DROP INDEX IF EXISTS equipment_machine_id_trgm',
+]
+
+
+def run_on_postgres(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgres(POSTGRES_FORWARD), run_on_postgres(POSTGRES_REVERSE)),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-19 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_postgres_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('completed', 'Procedure completed'), ('deleted', 'Deleted')], max_length=20)),
+                ('machine_id', models.CharField(max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Equipment Event',
+                'verbose_name_plural': 'Equipment Events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.23 on 2026-10-19 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_idempotencykey_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentevent',
+            name='txid',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentevent',
+            index=models.Index(fields=['txid', 'id'], name='equipmentevent_commit_order'),
+        ),
+    ]
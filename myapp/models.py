@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -30,17 +30,11 @@ class UserProfile(models.Model):
         verbose_name_plural = "User Profiles"
 
 # Signal to automatically create/update profile when user is created/updated
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance, default='') #default role
-
 @receiver(post_save, sender=User)
 def create_or_save_user_profile(sender, instance, created, **kwargs):
-     if created:
-        UserProfile.objects.create(user=instance)
-     else:
-       
+    if created:
+        UserProfile.objects.get_or_create(user=instance)
+    else:
         try:
             instance.profile.save()
         except UserProfile.DoesNotExist:
@@ -78,6 +72,9 @@ class Equipment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     
+    # Optimistic concurrency - bumped on every versioned write
+    version = models.PositiveIntegerField(default=1, editable=False, help_text="Row version for concurrent edits")
+    
     class Meta:
         ordering = ['machine_name']
         verbose_name = 'Equipment'
@@ -85,6 +82,53 @@ class Equipment(models.Model):
     
     def __str__(self):
         return f"{self.machine_id} - {self.machine_name}"
+
+    def save(self, *args, **kwargs):
+        """
+        Unchecked write (the Django admin, ModelForm.save(), scripts) - it still moves the
+        version past the stored one, so versioned writers holding the old version see a conflict.
+        """
+        # One transaction with the post_save receivers, so the change event commits with it
+        using = kwargs.get('using') or router.db_for_write(Equipment, instance=self)
+        with transaction.atomic(using=using):
+            if not self._state.adding:
+                # From the database being written - a replica may still hold an older version
+                stored = Equipment.objects.using(using).filter(pk=self.pk).values_list('version', flat=True).first()
+                self.version = max(stored or 0, self.version) + 1
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None and 'version' not in update_fields:
+                    kwargs['update_fields'] = {*update_fields, 'version'}
+            super().save(*args, **kwargs)
+
+    def save_versioned(self, update_fields, expected_version=None):
+        """
+        Write only update_fields, and only if the row is still at expected_version.
+        Returns False (and writes nothing) when someone else saved the equipment first.
+        """
+        if expected_version is None:
+            expected_version = self.version
+        
+        self.updated_at = timezone.now()
+        values = {field: getattr(self, field) for field in update_fields}
+        values['updated_at'] = self.updated_at
+        
+        using = router.db_for_write(Equipment, instance=self)
+        # One transaction with the post_save receivers, so the change event commits with it
+        with transaction.atomic(using=using):
+            # UPDATE ... WHERE machine_id = %s AND version = %s - no row lock is held
+            updated = Equipment.objects.using(using).filter(pk=self.pk, version=expected_version).update(
+                version=models.F('version') + 1, **values
+            )
+            if not updated:
+                return False
+            
+            self.version = expected_version + 1
+            # Let receivers see the write the same way as a regular save(update_fields=...)
+            post_save.send(
+                sender=Equipment, instance=self, created=False,
+                update_fields=frozenset(values) | {'version'}, raw=False, using=using,
+            )
+        return True
     
     @property
     def next_calibration_date(self):
@@ -130,4 +174,50 @@ class Equipment(models.Model):
         next_date = self.next_maintenance_date
         if next_date:
             return (next_date - timezone.now().date()).days
-        return None
\ No newline at end of file
+        return None
+
+#Idempotency keys for completion/edit POSTs (retried submissions from the shop floor)
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=64)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    # A client may reuse one key against different endpoints - each gets its own record
+    path = models.CharField(max_length=255, default='')
+    # Stored response - empty status means the original request is still running
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_content_type = models.CharField(max_length=100, blank=True)
+    response_location = models.CharField(max_length=500, blank=True)
+    response_body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        unique_together = ('user', 'path', 'key')
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+    
+    def __str__(self):
+        return f"{self.key} {self.path} ({self.user_id})"
+
+#Committed equipment changes, read by the SSE stream in every server process (myapp/events.py)
+class EquipmentEvent(models.Model):
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('completed', 'Procedure completed'),
+        ('deleted', 'Deleted'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    machine_id = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # PostgreSQL id of the writing transaction - streams read in commit order by (txid, id); empty on SQLite
+    txid = models.BigIntegerField(null=True, blank=True, editable=False)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['txid', 'id'], name='equipmentevent_commit_order')]
+        verbose_name = 'Equipment Event'
+        verbose_name_plural = 'Equipment Events'
+    
+    def __str__(self):
+        return f"{self.kind} {self.machine_id}"
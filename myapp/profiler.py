@@ -0,0 +1,162 @@
+"""
+On-demand cProfile sampling of production requests.
+
+A request is profiled when
+  - it is the Nth request of this process (PROFILER_SAMPLE_EVERY, 0 disables), or
+  - an administrator adds ?_profile=1 or an "X-Profile: 1" header, or
+  - it carries an "X-Profile-Token" header made with make_profile_token().
+Profiles go to a bounded ring buffer of .prof files in PROFILER_DIR.
+"""
+import cProfile
+import itertools
+import os
+import pstats
+import re
+import time
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+
+from .roles import get_role
+
+TOKEN_SALT = 'myapp.profiler'
+DEFAULT_MAX_FILES = 50
+DEFAULT_TOKEN_MAX_AGE = 60 * 60  # seconds
+
+_request_counter = itertools.count(1)
+
+
+def get_profile_dir():
+    return str(getattr(settings, 'PROFILER_DIR', os.path.join(settings.BASE_DIR, 'profiles')))
+
+
+def make_profile_token():
+    """Signed value for the X-Profile-Token header (valid for PROFILER_TOKEN_MAX_AGE)"""
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def _has_valid_token(request):
+    token = request.headers.get('X-Profile-Token')
+    if not token:
+        return False
+    max_age = getattr(settings, 'PROFILER_TOKEN_MAX_AGE', DEFAULT_TOKEN_MAX_AGE)
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def _is_administrator(request):
+    # request.role is set by RoleMiddleware, which runs before the profiler
+    role = getattr(request, 'role', None)
+    if role is None:
+        role = get_role(request.user)
+    return role == 'administrator'
+
+
+def should_profile(request):
+    sample_every = getattr(settings, 'PROFILER_SAMPLE_EVERY', 0)
+    if sample_every and next(_request_counter) % sample_every == 0:
+        return True
+    if _has_valid_token(request):
+        return True
+    requested = request.GET.get('_profile') == '1' or request.headers.get('X-Profile') == '1'
+    # Only look up the role when an administrator switch was actually requested
+    return requested and _is_administrator(request)
+
+
+def list_profiles():
+    """Stored profiles, newest first"""
+    directory = get_profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(directory), reverse=True):
+        match = re.match(r'^(\d+)-(\d+)ms-(.+)\.prof$', filename)
+        if not match:
+            continue
+        profiles.append({
+            'filename': filename,
+            'path': os.path.join(directory, filename),
+            'recorded_at': datetime.fromtimestamp(int(match.group(1)) / 1e9, tz=timezone.utc),
+            'duration_ms': int(match.group(2)),
+            'view': match.group(3),
+        })
+    return profiles
+
+
+def save_profile(profile, view_name, duration):
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    safe_view = re.sub(r'[^\w.-]', '_', view_name)
+    path = os.path.join(directory, f'{time.time_ns()}-{int(duration * 1000)}ms-{safe_view}.prof')
+    profile.dump_stats(path)
+
+    # Ring buffer - drop the oldest profiles beyond the limit
+    max_files = getattr(settings, 'PROFILER_MAX_FILES', DEFAULT_MAX_FILES)
+    for stale in list_profiles()[max_files:]:
+        try:
+            os.remove(stale['path'])
+        except OSError:
+            pass
+    return path
+
+
+def hot_functions(paths, limit=30, sort='tottime'):
+    """Aggregate stored profiles into the functions with the most own (or cumulative) time"""
+    if not paths:
+        return []
+    stats = pstats.Stats(*paths)
+    rows = []
+    for (filename, line, name), (calls, _, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f'{name} ({os.path.basename(filename)}:{line})',
+            'calls': calls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    return rows[:limit]
+
+
+class SamplingProfilerMiddleware:
+    """
+    Profiles the sampled/requested requests with cProfile. Requests served
+    async under ASGI are not profiled: the profiler would time every other
+    request sharing the event loop thread, and none of the ORM work, which
+    runs in a worker thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)  # the coroutine, unprofiled
+        if not should_profile(request):
+            return self.get_response(request)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active (3.12+ allows only one at a time)
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        save_profile(profile, match.view_name if match else 'unresolved', duration)
+        response['X-Profiled'] = 'true'
+        return response
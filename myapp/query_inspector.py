@@ -0,0 +1,172 @@
+"""
+N+1 and query-budget detection for development and tests.
+
+Views declare how many queries they may run with @query_budget(n). The
+QueryBudgetMiddleware (opt-in, QUERY_INSPECTOR_ENABLED) and
+QueryBudgetTestMixin fingerprint every SQL statement of a request and flag
+repeated query shapes and budget overruns.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import resolve
+
+from .utils import sql_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """Declare the most queries a view may run (session/auth lookups included)"""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def fingerprint(sql):
+    """Reduce a statement to its shape so repeated lookups compare equal"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+# Inspectors open in this thread / asyncio task (sync_to_async carries them into worker threads)
+_active_inspectors = ContextVar('active_query_inspectors', default=())
+
+
+def _record(execute, sql, params, many, context):
+    inspectors = _active_inspectors.get()
+    if not inspectors:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        query = (fingerprint(sql), time.perf_counter() - start)
+        for inspector in inspectors:
+            inspector.queries.append(query)
+
+
+sql_hooks.register(_record)
+
+
+class QueryInspector:
+    """Context manager that records every query run on behalf of the enclosed code"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        self._token = _active_inspectors.set(_active_inspectors.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_inspectors.reset(self._token)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def writes(self):
+        """INSERT/UPDATE/DELETE statements - the ones that take SQLite's write lock"""
+        return sum(1 for shape, _ in self.queries if shape.upper().startswith(_WRITE_STATEMENTS))
+
+    def writes_to(self, table):
+        return sum(
+            1 for shape, _ in self.queries
+            if shape.upper().startswith(_WRITE_STATEMENTS) and f'"{table}"' in shape
+        )
+
+    def repeated(self, threshold=None):
+        """Query shapes run at least threshold times - the signature of an N+1"""
+        if threshold is None:
+            threshold = getattr(settings, 'QUERY_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+        shapes = Counter(shape for shape, _ in self.queries)
+        return {shape: n for shape, n in shapes.items() if n >= threshold}
+
+    def problems(self, budget=None, threshold=None):
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f'{self.count} queries, budget is {budget}')
+        for shape, n in self.repeated(threshold).items():
+            problems.append(f'N+1: {n} x {shape[:200]}')
+        return problems
+
+
+class QueryBudgetMiddleware:
+    """Development middleware - logs (or with QUERY_BUDGET_STRICT raises on) budget overruns and N+1s"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTOR_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._query_budget = None
+        with QueryInspector() as inspector:
+            response = self.get_response(request)
+        return self._check(request, response, inspector)
+
+    async def __acall__(self, request):
+        request._query_budget = None
+        with QueryInspector() as inspector:
+            response = await self.get_response(request)
+        return self._check(request, response, inspector)
+
+    def _check(self, request, response, inspector):
+        response['X-Query-Count'] = str(inspector.count)
+        problems = inspector.problems(budget=request._query_budget)
+        if problems:
+            view = request.resolver_match.view_name if request.resolver_match else request.path
+            message = f'{view}: ' + '; '.join(problems)
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, 'query_budget', None)
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin: fail when a page goes over its declared budget or runs an N+1"""
+
+    def assertWithinQueryBudget(self, url, method='get', data=None, threshold=None, **extra):
+        view_func = resolve(url.split('?')[0]).func
+        budget = getattr(view_func, 'query_budget', None)
+        self.assertIsNotNone(budget, f'{url} has no @query_budget')
+
+        with QueryInspector() as inspector:
+            response = getattr(self.client, method)(url, data or {}, **extra)
+
+        problems = inspector.problems(budget=budget, threshold=threshold)
+        self.assertFalse(problems, f'{url}: ' + '; '.join(problems))
+        return response
@@ -0,0 +1,108 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+PRIMARY_ALIAS = 'default'
+# Session key holding the time until which reads stay on the primary
+PIN_SESSION_KEY = '_db_pin_primary_until'
+DEFAULT_PIN_SECONDS = 10
+
+# Set per request (or per task under ASGI) by ReplicaPinningMiddleware
+_use_primary = ContextVar('use_primary', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _primary_only(model):
+    """Models that are read back immediately after being written"""
+    return model._meta.app_label == 'sessions' or model._meta.model_name in ('idempotencykey', 'equipmentevent')
+
+
+@contextmanager
+def use_primary():
+    """Send every read inside the block to the primary database"""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to the replica alias (when one is configured), writes to the primary.
+    Requests that write - or that follow a write by the same user within
+    REPLICA_PIN_SECONDS - read from the primary so users see their own changes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_configured() or _use_primary.get() or _primary_only(model):
+            return PRIMARY_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary and is never migrated directly
+        return db == PRIMARY_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """Read-your-writes: pin a user's reads to the primary right after they write"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_configured():
+            return self.get_response(request)
+
+        token = _use_primary.set(self._needs_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_primary.reset(token)
+        return self._pin(request, response)
+
+    async def __acall__(self, request):
+        if not replica_configured():
+            return await self.get_response(request)
+
+        # Reading the pin loads the session - a query
+        token = _use_primary.set(await sync_to_async(self._needs_primary)(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_primary.reset(token)
+        return self._pin(request, response)
+
+    @staticmethod
+    def _writes(request):
+        return request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def _needs_primary(self, request):
+        return self._writes(request) or request.session.get(PIN_SESSION_KEY, 0) > time.time()
+
+    def _pin(self, request, response):
+        if self._writes(request) and response.status_code < 400:
+            pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+            request.session[PIN_SESSION_KEY] = time.time() + pin_seconds
+        return response
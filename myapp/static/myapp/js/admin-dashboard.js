@@ -0,0 +1,60 @@
+// Live updates from /events/equipment/: patch rows in place and refresh the stat cards
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+    var config = document.currentScript.dataset;
+    var hasFilters = config.hasFilters === 'true';
+    var source = new EventSource(config.eventsUrl);
+
+    function updateRows(data) {
+        document.querySelectorAll('tr[data-machine-id="' + CSS.escape(data.machine_id) + '"]').forEach(function (row) {
+            var overdue = row.dataset.overdue;
+            if ((overdue === 'maintenance' && !data.is_maintenance_overdue) ||
+                    (overdue === 'calibration' && !data.is_calibration_overdue)) {
+                row.remove();
+                return;
+            }
+            row.querySelectorAll('[data-field]').forEach(function (cell) {
+                var value = data[cell.dataset.field];
+                if (value) {
+                    cell.textContent = value;
+                }
+            });
+        });
+    }
+
+    source.addEventListener('completed', function (e) { updateRows(JSON.parse(e.data)); });
+    source.addEventListener('updated', function (e) { updateRows(JSON.parse(e.data)); });
+    source.addEventListener('deleted', function (e) {
+        var data = JSON.parse(e.data);
+        document.querySelectorAll('tr[data-machine-id="' + CSS.escape(data.machine_id) + '"]').forEach(function (row) {
+            row.remove();
+        });
+    });
+    source.addEventListener('counts', function () {
+        // Filtered cards count only the matching equipment - leave those until a reload
+        if (hasFilters) {
+            return;
+        }
+        fetch(config.statsUrl, {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(function (body) {
+                if (!body.success) {
+                    return;
+                }
+                var stats = body.stats;
+                var values = {
+                    total_equipment: stats.total_equipment,
+                    overdue: stats.overdue_maintenance + stats.overdue_calibration,
+                    due_soon: stats.due_soon_equipment
+                };
+                Object.keys(values).forEach(function (name) {
+                    var element = document.querySelector('[data-stat="' + name + '"]');
+                    if (element) {
+                        element.textContent = values[name];
+                    }
+                });
+            });
+    });
+})();
@@ -0,0 +1,48 @@
+// "Done Today" completes in place: swap in the re-rendered row (or drop it) and refresh the counter cards
+(function () {
+    var counts = document.getElementById('maintenance-counts');
+
+    function refreshCounts() {
+        fetch(counts.dataset.fragmentUrl + window.location.search, {credentials: 'same-origin'})
+            .then(function (response) { return response.ok ? response.text() : null; })
+            .then(function (html) {
+                if (html) {
+                    counts.outerHTML = html;
+                    counts = document.getElementById('maintenance-counts');
+                }
+            });
+    }
+
+    document.querySelectorAll('form.js-quick-complete').forEach(function (form) {
+        form.addEventListener('submit', function (event) {
+            if (!window.fetch) {
+                return;  // plain POST and redirect back
+            }
+            event.preventDefault();
+            var row = form.closest('tr');
+            var headers = {
+                'X-Requested-With': 'XMLHttpRequest',
+                'Accept': 'text/html',
+                'X-CSRFToken': form.querySelector('[name=csrfmiddlewaretoken]').value
+            };
+            if (window.crypto && crypto.randomUUID) {
+                headers['Idempotency-Key'] = crypto.randomUUID();
+            }
+            fetch(form.action, {method: 'POST', body: new FormData(form), headers: headers, credentials: 'same-origin'})
+                .then(function (response) {
+                    if (response.status === 204) {
+                        row.remove();
+                    } else if (response.ok) {
+                        return response.text().then(function (html) { row.outerHTML = html; refreshCounts(); });
+                    } else if (response.status === 409) {
+                        window.location.reload();  // someone else changed it - show their version
+                        return;
+                    } else {
+                        alert('Could not complete the task. Please try again.');
+                        return;
+                    }
+                    refreshCounts();
+                });
+        });
+    });
+})();
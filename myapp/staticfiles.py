@@ -0,0 +1,34 @@
+"""
+WhiteNoise that can run in Django's async middleware chain.
+
+WhiteNoise 6.6's middleware is sync-only, and a single sync-only middleware
+makes Django push every ASGI request through one shared thread. Finding a
+static file is a dict lookup (a stat with WHITENOISE_AUTOREFRESH), so the
+async path does that inline and only awaits the rest of the chain.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise import middleware
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,75 @@
+"""
+Jinja2 environment for the optional Jinja2 template backend.
+
+With TEMPLATE_ENGINE=jinja2 the Jinja2 backend is listed in front of the
+Django one. Only the row-heavy pages have Jinja2 versions (myapp/jinja2/):
+the admin and maintenance dashboards, their base templates and the
+maintenance fragments. Every other template isn't found there and still
+renders with the Django engine. The globals and filters below are the ones
+those templates need, producing the same output as the Django tags and
+filters they replace. Django's {% cache %} tag becomes a call block:
+
+    {% call cache(fragment_timeout, 'admin_overdue', fragment_version, search) %}...{% endcall %}
+
+Compiled templates are kept in memory for the life of the process (Django
+turns auto_reload off unless DEBUG), and their bytecode is also written to
+JINJA2_BYTECODE_CACHE_DIR, so a new worker loads them without parsing or
+compiling.
+"""
+import os
+
+from django.conf import settings
+from django.core.cache import cache as fragment_cache
+from django.core.cache.utils import make_template_fragment_key
+from django.middleware.csrf import get_token
+from django.template.backends.utils import csrf_input
+from django.template.defaultfilters import date
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+from jinja2 import Environment, FileSystemBytecodeCache
+from markupsafe import Markup
+
+
+def url(name, *args):
+    """{% url name arg ... %}"""
+    return reverse(name, args=args)
+
+
+def cache(timeout, name, *vary_on, caller):
+    """{% cache timeout name vary_on... %}; keys are apart from the Django engine's, whose HTML differs in whitespace"""
+    key = make_template_fragment_key(f'jinja2.{name}', vary_on)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = caller()
+        fragment_cache.set(key, value, timeout)
+    return Markup(value)
+
+
+def csrf(request):
+    """
+    Context processor: csrf_input and csrf_token worked out once per render.
+    The backend's own are lazy() values that mask the token again every time
+    they are printed - once per row in the due tables.
+    """
+    return {
+        'csrf_input': SimpleLazyObject(lambda: csrf_input(request)),
+        'csrf_token': SimpleLazyObject(lambda: get_token(request)),
+    }
+
+
+def bytecode_cache():
+    directory = getattr(settings, 'JINJA2_BYTECODE_CACHE_DIR', '')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # None is a per-user directory under the system temp dir
+    return FileSystemBytecodeCache(directory or None)
+
+
+def environment(**options):
+    options.setdefault('bytecode_cache', bytecode_cache())
+    env = Environment(**options)
+    env.globals.update(url=url, static=static, cache=cache)
+    # |date uses DATE_FORMAT without an argument, as {{ value }} and |date do in Django templates
+    env.filters['date'] = date
+    return env
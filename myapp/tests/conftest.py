@@ -0,0 +1,35 @@
+# tests/conftest.py - pytest fixtures (pytest-django)
+
+import pytest
+from django.test import Client
+from .factories import EquipmentFactory, UserFactory
+
+
+@pytest.fixture
+def client():
+    """Provide a Django test client"""
+    return Client()
+
+
+@pytest.fixture
+def admin_user(db):
+    """Create an admin user for testing"""
+    return UserFactory(username='admin_test', role='administrator')
+
+
+@pytest.fixture
+def quality_user(db):
+    """Create a quality user for testing"""
+    return UserFactory(username='quality_test', role='quality')
+
+
+@pytest.fixture
+def maintenance_user(db):
+    """Create a maintenance user for testing"""
+    return UserFactory(username='maintenance_test', role='maintenance')
+
+
+@pytest.fixture
+def sample_equipment(db):
+    """Create sample equipment for testing"""
+    return EquipmentFactory(machine_id='TEST001', machine_name='Test Machine')
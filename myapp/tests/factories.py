@@ -0,0 +1,70 @@
+# tests/factories.py - factory_boy factories for the current models
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+import factory
+from factory.django import DjangoModelFactory
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from myapp.models import Equipment, UserProfile
+
+DEFAULT_PASSWORD = 'TestPassword123!'
+ROLES = ('administrator', 'maintenance', 'quality')
+
+
+@lru_cache(maxsize=None)
+def hashed_password(raw=DEFAULT_PASSWORD):
+    """Hash once per process - hashing is the slowest part of creating users"""
+    return make_password(raw)
+
+
+class UserFactory(DjangoModelFactory):
+    """User whose profile (created by the post_save signal) gets `role`"""
+
+    class Meta:
+        model = User
+        django_get_or_create = ('username',)
+
+    username = factory.Sequence(lambda n: f'user{n}')
+    email = factory.LazyAttribute(lambda user: f'{user.username}@example.com')
+    password = factory.LazyFunction(hashed_password)
+
+    @factory.post_generation
+    def role(user, create, extracted, **kwargs):
+        if not create or extracted is None:
+            return
+        UserProfile.objects.filter(user=user).update(role=extracted)
+        # Drop the cached profile so user.profile reflects the new role
+        user._state.fields_cache.pop('profile', None)
+
+
+class EquipmentFactory(DjangoModelFactory):
+    """Equipment that is up to date unless `overdue` or `due_soon` is passed"""
+
+    class Meta:
+        model = Equipment
+
+    machine_id = factory.Sequence(lambda n: f'EQ{n:05d}')
+    machine_name = factory.Sequence(lambda n: f'Test Machine {n}')
+    machine_type = 'PRODUCTION'
+    machine_location = 'Test Location'
+    last_calibration_date = factory.LazyFunction(lambda: date.today() - timedelta(days=30))
+    last_maintenance_date = factory.LazyFunction(lambda: date.today() - timedelta(days=15))
+    calibration_interval_days = 365
+    maintenance_interval_days = 90
+
+    class Params:
+        overdue = factory.Trait(
+            last_calibration_date=factory.LazyFunction(lambda: date.today() - timedelta(days=400)),
+            last_maintenance_date=factory.LazyFunction(lambda: date.today() - timedelta(days=120)),
+        )
+        due_soon = factory.Trait(
+            last_calibration_date=factory.LazyFunction(lambda: date.today() - timedelta(days=358)),
+            last_maintenance_date=factory.LazyFunction(lambda: date.today() - timedelta(days=83)),
+        )
+
+    @classmethod
+    def create_bulk(cls, size, **kwargs):
+        """Build `size` rows in memory and insert them with one bulk_create"""
+        return Equipment.objects.bulk_create(cls.build_batch(size, **kwargs))
@@ -0,0 +1,119 @@
+# tests/runner.py - Test runner that reports the slowest tests
+
+import argparse
+import time
+import traceback
+import unittest
+
+from django.test.runner import DiscoverRunner, ParallelTestSuite, RemoteTestResult, RemoteTestRunner
+
+try:
+    import tblib
+except ImportError:
+    tblib = None
+
+DEFAULT_DURATIONS = 10
+
+
+class DurationsMixin:
+    """Records how long each test took, keyed by test id"""
+
+    def startTest(self, test):
+        self._test_started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.addDuration(test, time.perf_counter() - self._test_started)
+
+    def addDuration(self, test, elapsed):
+        # Python 3.12+ also reports durations itself - keying by id avoids double counting
+        if not hasattr(self, 'durations_by_test'):
+            self.durations_by_test = {}
+        self.durations_by_test[test.id()] = elapsed
+
+
+class TimedTextTestResult(DurationsMixin, unittest.TextTestResult):
+    pass
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    """Sends each test's duration from the worker process back to the parent"""
+
+    def startTest(self, test):
+        self._test_started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        elapsed = time.perf_counter() - self._test_started
+        super().stopTest(test)
+        self.events.append(('addDuration', self.test_index, elapsed))
+
+    def _without_traceback(self, err):
+        # Without tblib a traceback can't cross the process boundary - send it as text
+        if tblib is not None or err[2] is None:
+            return err
+        exc_type, exc_value, tb = err
+        # In the message rather than exc_value.add_note(), which is Python 3.11+
+        exc_value.args = (f"{exc_value}\n\n{''.join(traceback.format_tb(tb)).rstrip()}",)
+        return exc_type, exc_value.with_traceback(None), None
+
+    def addError(self, test, err):
+        super().addError(test, self._without_traceback(err))
+
+    def addFailure(self, test, err):
+        super().addFailure(test, self._without_traceback(err))
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err if err is None else self._without_traceback(err))
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    runner_class = TimedRemoteTestRunner
+
+
+class TimedTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner that runs in parallel by default (one process per core,
+    each with its own in-memory SQLite database) and lists the slowest tests.
+    """
+
+    parallel_test_suite = TimedParallelTestSuite
+
+    def __init__(self, durations=DEFAULT_DURATIONS, **kwargs):
+        super().__init__(**kwargs)
+        self.durations = durations
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel='auto')
+        try:
+            parser.add_argument(
+                '--durations', type=int, default=DEFAULT_DURATIONS, metavar='N',
+                help='Show the N slowest tests (0 to disable).',
+            )
+        except argparse.ArgumentError:
+            # Django 5.0+ on Python 3.12+ already provides --durations
+            pass
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        self.report_durations(result)
+        return result
+
+    def report_durations(self, result):
+        durations = getattr(result, 'durations_by_test', None)
+        if not self.durations or not durations:
+            return
+        slowest = sorted(durations.items(), key=lambda item: item[1], reverse=True)[:self.durations]
+        self.log(f'\nSlowest {len(slowest)} tests ({sum(durations.values()):.2f}s in {len(durations)} tests):')
+        for test_id, elapsed in slowest:
+            self.log(f'  {elapsed:8.3f}s  {test_id}')
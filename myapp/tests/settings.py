@@ -0,0 +1,76 @@
+# tests/settings.py - Test-specific settings
+#
+#   python -m django test --settings=myapp.tests.settings --parallel
+#   pytest  (pytest.ini points at this module)
+#
+# DB_ENGINE=postgresql runs the suite against the PostgreSQL profile from the
+# base settings (Django creates and drops the test_ database).
+
+from settings import *  # Import base settings
+
+if DB_ENGINE != 'postgresql':
+    # Every test process gets its own in-memory SQLite database; parallel workers
+    # are forked after the schema is built, so each one starts from a copy
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+
+# Build the schema straight from the models instead of replaying migrations
+class DisableMigrations:
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+MIGRATION_MODULES = DisableMigrations()
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Keep log output (and the queue listener thread) out of test runs
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'null': {
+            'class': 'logging.NullHandler',
+        },
+    },
+    'root': {
+        'handlers': ['null'],
+    },
+}
+
+# No cached dashboard sections: TestCase rolls the data back without a commit, so the data
+# version never changes and a section cached by one test would be served to the next
+FRAGMENT_CACHE_TIMEOUT = 0
+
+# Use a simple password hasher for faster tests
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# No collectstatic in test runs
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+# Set test-specific email backend
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Instrumentation stays off regardless of the environment
+METRICS_DIR = ''
+PROFILER_SAMPLE_EVERY = 0
+TRACING_ENABLED = False
+QUERY_INSPECTOR_ENABLED = False
+
+TEST_RUNNER = 'myapp.tests.runner.TimedTestRunner'
+
+# Testing flags
+TESTING = True
+DEBUG = False
@@ -0,0 +1,78 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from myapp import metrics, views
+from .factories import EquipmentFactory
+from .utils import SharedDataTestCase
+
+
+class AsyncApiTest(SharedDataTestCase):
+    """Test the JSON API as served under ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # The status route only matches numeric machine ids
+        cls.numbered = EquipmentFactory(machine_id='1001', overdue=True)
+
+    def setUp(self):
+        self.async_client.force_login(self.users['quality'])
+
+    def test_views_are_async(self):
+        for view in (views.equipment_api_status, views.equipment_api_list, views.equipment_api_stats):
+            with self.subTest(view.__name__):
+                self.assertTrue(iscoroutinefunction(view))
+
+    def test_middleware_runs_async(self):
+        """One sync-only middleware would push every ASGI request through a single thread"""
+        for path in settings.MIDDLEWARE:
+            with self.subTest(path):
+                self.assertTrue(getattr(import_string(path), 'async_capable', False))
+
+    async def test_stats(self):
+        response = await self.async_client.get(reverse('equipment_api_stats'))
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['stats']
+        self.assertEqual(stats['total_equipment'], len(self.equipment) + 1)
+        self.assertEqual(stats['overdue_maintenance'], self.equipment_per_status + 1)
+
+    async def test_list_revalidates(self):
+        url = reverse('equipment_api_list')
+        response = await self.async_client.get(url)
+        self.assertEqual(response.json()['count'], len(self.equipment) + 1)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        cached = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        cached = await self.async_client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_status(self):
+        response = await self.async_client.get(reverse('equipment_api_status', args=[1001]))
+        equipment = response.json()['equipment']
+        self.assertEqual(equipment['machine_id'], '1001')
+        self.assertEqual(equipment['maintenance_status'], 'overdue')
+
+    async def test_unknown_equipment_is_404(self):
+        response = await self.async_client.get(reverse('equipment_api_status', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['error'], 'Equipment not found')
+
+    async def test_anonymous_redirected_to_login(self):
+        url = reverse('equipment_api_stats')
+        response = await AsyncClient().get(url)
+        self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+
+    @override_settings(QUERY_INSPECTOR_ENABLED=True, METRICS_DIR='')
+    async def test_queries_measured_under_asgi(self):
+        """The ORM runs in sync_to_async worker threads, not on the event loop the middleware runs on"""
+        metrics.registry.reset()
+        response = await self.async_client.get(reverse('equipment_api_stats'))
+        self.assertGreater(int(response['X-Query-Count']), 0)
+
+        counters, _ = metrics.collect()
+        labels = (('view', 'equipment_api_stats'), ('method', 'GET'))
+        self.assertGreater(counters[('myapp_db_queries_total', labels)], 0)
@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from myapp.models import UserProfile  # Adjust import path as needed
+from .factories import DEFAULT_PASSWORD, UserFactory
 
 
 class UserCreationTest(TestCase):
@@ -16,10 +17,12 @@ class UserCreationTest(TestCase):
         
         self.user_data = {
             'username': 'testuser',
+            'first_name': 'Test',
+            'last_name': 'User',
             'email': 'test@example.com',
             'password1': 'TestPassword123!',
             'password2': 'TestPassword123!',
-            'role': 'Quality',
+            'role': 'quality',
             'employee_id': 'EMP001'
         }
     
@@ -32,9 +35,10 @@ class UserCreationTest(TestCase):
         
         # Check if user profile was created
         user = User.objects.get(username='testuser')
-        self.assertTrue(hasattr(user, 'userprofile'))
-        self.assertEqual(user.userprofile.role, 'Quality')
-        self.assertEqual(user.userprofile.employee_id, 'EMP001')
+        self.assertTrue(hasattr(user, 'profile'))
+        # The signup form has no role field - an administrator assigns it (admin_profiles)
+        self.assertEqual(user.profile.role, '')
+        self.assertEqual(user.profile.employee_id, 'EMP001')
     
     def test_user_signup_password_mismatch(self):
         """Test signup with password mismatch"""
@@ -63,16 +67,7 @@ class UserCreationTest(TestCase):
     def test_user_login_success(self):
         """Test successful user login"""
         # Create user first
-        user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=user,
-            role='Quality',
-            employee_id='EMP001'
-        )
+        UserFactory(username='testuser', role='quality')
         
         login_data = {
             'username': 'testuser',
@@ -122,7 +117,7 @@ class UserCreationTest(TestCase):
     
     def test_user_roles_assignment(self):
         """Test that users can be assigned different roles"""
-        roles = ['Administrator', 'Maintenance', 'Quality']
+        roles = ['administrator', 'maintenance', 'quality']
         
         for i, role in enumerate(roles):
             user = User.objects.create_user(
@@ -131,11 +126,10 @@ class UserCreationTest(TestCase):
                 password='TestPassword123!'
             )
             
-            profile = UserProfile.objects.create(
-                user=user,
-                role=role,
-                employee_id=f'EMP00{i+1}'
-            )
+            profile = user.profile
+            profile.role = role
+            profile.employee_id = f'EMP00{i+1}'
+            profile.save()
             
             self.assertEqual(profile.role, role)
 
@@ -143,62 +137,34 @@ class UserCreationTest(TestCase):
 class UserPermissionsTest(TestCase):
     """Test cases for user permissions and access control"""
     
-    def setUp(self):
-        """Set up test users with different roles"""
-        self.client = Client()
-        
-        # Create users with different roles
-        self.admin_user = User.objects.create_user(
-            username='admin',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.admin_user,
-            role='Administrator',
-            employee_id='ADM001'
-        )
-        
-        self.quality_user = User.objects.create_user(
-            username='quality',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.quality_user,
-            role='Quality',
-            employee_id='QUA001'
-        )
-        
-        self.maintenance_user = User.objects.create_user(
-            username='maintenance',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.maintenance_user,
-            role='Maintenance',
-            employee_id='MAI001'
-        )
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test users with different roles once for the class"""
+        cls.admin_user = UserFactory(username='admin', role='administrator')
+        cls.quality_user = UserFactory(username='quality', role='quality')
+        cls.maintenance_user = UserFactory(username='maintenance', role='maintenance')
     
     def test_admin_user_permissions(self):
         """Test that admin user has correct role"""
-        self.assertEqual(self.admin_user.userprofile.role, 'Administrator')
+        self.assertEqual(self.admin_user.profile.role, 'administrator')
     
     def test_quality_user_permissions(self):
         """Test that quality user has correct role"""
-        self.assertEqual(self.quality_user.userprofile.role, 'Quality')
+        self.assertEqual(self.quality_user.profile.role, 'quality')
     
     def test_maintenance_user_permissions(self):
         """Test that maintenance user has correct role"""
-        self.assertEqual(self.maintenance_user.userprofile.role, 'Maintenance')
+        self.assertEqual(self.maintenance_user.profile.role, 'maintenance')
     
     def test_user_can_access_dashboard_when_logged_in(self):
         """Test that logged in users can access dashboard"""
-        self.client.login(username='quality', password='TestPassword123!')
+        self.client.login(username='quality', password=DEFAULT_PASSWORD)
         
         dashboard_url = reverse('dashboard')  # Adjust URL name as needed
         response = self.client.get(dashboard_url)
         
-        # Should not redirect to login page
-        self.assertNotEqual(response.status_code, 302)
+        # Should not redirect to login page (it may redirect to the role's dashboard)
+        self.assertNotIn(reverse('login'), response.get('Location', ''))
     
     def test_anonymous_user_redirected_to_login(self):
         """Test that anonymous users are redirected to login"""
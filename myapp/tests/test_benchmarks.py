@@ -0,0 +1,92 @@
+from django.test import TestCase, SimpleTestCase
+from myapp.models import Equipment
+from myapp.benchmarks import (
+    SCENARIOS, compare, run_benchmarks, run_compression_benchmark, run_session_benchmark, run_template_benchmark,
+    seed_equipment,
+)
+from myapp.benchmarks.templates import DASHBOARDS, available_engines
+
+
+class SeedTest(TestCase):
+    """Test the benchmark dataset"""
+
+    def test_seed_tops_up_to_size(self):
+        self.assertEqual(seed_equipment(30, batch_size=7), 30)
+        self.assertEqual(seed_equipment(50), 20)
+        self.assertEqual(seed_equipment(40), 0)
+        self.assertEqual(Equipment.objects.count(), 50)
+        self.assertTrue(Equipment.objects.filter(pk='1').exists())
+
+
+class RunBenchmarksTest(TestCase):
+    """Test that every scenario runs and reports timings, queries and memory"""
+
+    def test_all_scenarios_measured(self):
+        results = run_benchmarks([20], warmup=0, repeat=1)
+
+        measured = results['results']['20']
+        self.assertEqual(set(measured), {s.name for s in SCENARIOS})
+        for result in measured.values():
+            self.assertGreater(result['median'], 0)
+            self.assertGreater(result['peak_memory'], 0)
+        self.assertGreater(measured['api_list']['queries'], 0)
+
+
+class CompareTest(SimpleTestCase):
+    """Test regression detection against a baseline"""
+
+    def result(self, median=0.1, queries=3, peak_memory=1000):
+        return {'results': {'100': {'api_list': {'median': median, 'queries': queries, 'peak_memory': peak_memory}}}}
+
+    def test_within_threshold(self):
+        self.assertEqual(compare(self.result(median=0.11), self.result(), threshold=0.2), [])
+
+    def test_flags_slower_more_queries_and_memory(self):
+        regressions = compare(self.result(median=0.2, queries=4, peak_memory=2000), self.result())
+        self.assertEqual(len(regressions), 3)
+        self.assertIn('api_list @ 100: median 200.0ms', regressions[0])
+
+    def test_ignores_scenarios_missing_from_baseline(self):
+        self.assertEqual(compare(self.result(), {'results': {}}), [])
+
+
+class SessionBenchmarkTest(TestCase):
+    """Test the per-visit write counts for each session/message storage"""
+
+    def test_cookie_storage_removes_session_writes(self):
+        seed_equipment(5)
+        sessions = run_session_benchmark()
+
+        baseline = sessions['db+session']
+        self.assertGreater(baseline['post']['session_writes'], 0)
+        self.assertGreater(baseline['dashboard']['session_writes'], 0)
+        # Messages in a cookie - the dashboard visit itself writes nothing
+        for name in ('db+fallback', 'cached_db+fallback', 'signed_cookies+cookie'):
+            self.assertEqual(sessions[name]['dashboard']['writes'], 0, name)
+        self.assertEqual(sessions['signed_cookies+cookie']['post']['session_writes'], 0)
+        self.assertLess(sessions['signed_cookies+cookie']['post']['writes'], baseline['post']['writes'])
+
+
+class CompressionBenchmarkTest(TestCase):
+    """Test the per-route byte counts for each encoding"""
+
+    def test_pages_shrink(self):
+        seed_equipment(20)
+        compression = run_compression_benchmark()
+        for url, sizes in compression.items():
+            self.assertLessEqual(sizes['gzip'], sizes['identity'], url)
+        # The stats API is under COMPRESSION_MIN_SIZE; pages are many times over it
+        dashboard = compression['/maintenance-dashboard/']
+        self.assertLess(dashboard['gzip'] * 3, dashboard['identity'])
+
+
+class TemplateBenchmarkTest(TestCase):
+    """Test the per-row render timings for each template engine"""
+
+    def test_every_dashboard_timed(self):
+        templates = run_template_benchmark(rows=20, repeat=1)
+        self.assertEqual(set(templates), set(DASHBOARDS))
+        for timings in templates.values():
+            self.assertEqual(set(timings), {f'{engine}{cached}' for engine in available_engines() for cached in ('', '+cache')})
+            for ms in timings.values():
+                self.assertGreater(ms, 0)
@@ -0,0 +1,75 @@
+import gzip
+import json
+from datetime import date
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from myapp.utils.columnar import decode_columns, encode_columns
+from myapp.views import LIST_DATE_FIELDS
+from .utils import SharedDataTestCase
+
+
+class ColumnarEncodingTest(SimpleTestCase):
+    """Test the columnar encoding on its own"""
+
+    rows = [
+        {'id': 'A', 'type': 'LAB', 'due': date(2026, 1, 11)},
+        {'id': 'B', 'type': 'PRODUCTION', 'due': None},
+        {'id': 'C', 'type': 'LAB', 'due': date(2025, 12, 31)},
+    ]
+
+    def test_encode(self):
+        payload = encode_columns(self.rows, ['type'], ['due'], epoch=date(2026, 1, 1))
+        self.assertEqual(payload, {
+            'epoch': '2026-01-01',
+            'columns': {'id': ['A', 'B', 'C'], 'type': [0, 1, 0], 'due': [10, None, -1]},
+            'dictionaries': {'type': ['LAB', 'PRODUCTION']},
+        })
+
+    def test_round_trip(self):
+        payload = encode_columns(self.rows, ['type'], ['due'])
+        self.assertEqual(decode_columns(payload, ['due']), self.rows)
+
+    def test_no_rows(self):
+        payload = encode_columns([], ['type'], ['due'])
+        self.assertEqual(payload['columns'], {})
+        self.assertEqual(decode_columns(payload), [])
+
+
+class ColumnarApiTest(SharedDataTestCase):
+    """Test ?format=columnar on the equipment list API"""
+
+    def setUp(self):
+        self.login_as('quality')
+        self.url = reverse('equipment_api_list')
+
+    def test_same_rows_as_default_format(self):
+        rows = self.client.get(self.url).json()['equipment']
+        response = self.client.get(self.url, {'format': 'columnar'})
+        payload = response.json()
+        self.assertEqual(payload['format'], 'columnar')
+        self.assertEqual(payload['count'], len(rows))
+
+        decoded = decode_columns(payload, LIST_DATE_FIELDS)
+        for row in decoded:
+            for name in LIST_DATE_FIELDS:
+                row[name] = row[name] and row[name].isoformat()
+        self.assertEqual(decoded, rows)
+        self.assertEqual(set(payload['dictionaries']['maintenance_status']), {'compliant', 'due_soon', 'overdue'})
+
+    def test_smaller_than_rows(self):
+        rows = self.client.get(self.url).content
+        columns = self.client.get(self.url, {'format': 'columnar'}).content
+        self.assertLess(len(columns) * 2, len(rows))
+
+    def test_gzip(self):
+        response = self.client.get(self.url, {'format': 'columnar'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(decode_columns(json.loads(gzip.decompress(response.content)))), len(self.equipment))
+
+        # Revalidation still works on the compressed representation
+        cached = self.client.get(self.url, {'format': 'columnar'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
@@ -0,0 +1,102 @@
+import gzip
+import zlib
+from unittest import skipIf
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from myapp import compression
+from myapp.compression import CompressionMiddleware, choose_encoding
+from .utils import SharedDataTestCase
+
+BODY = b'<tr><td>EQ000001</td><td>Lathe</td></tr>' * 100
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    """Test which responses get compressed, and how"""
+
+    def process(self, response, accept_encoding='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzips_html(self):
+        response = self.process(HttpResponse(BODY))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_skips(self):
+        png = HttpResponse(BODY, content_type='image/png')
+        small = HttpResponse(b'<p>ok</p>')
+        encoded = HttpResponse(BODY)
+        encoded['Content-Encoding'] = 'br'
+        for name, response in (('image', png), ('below threshold', small), ('already encoded', encoded)):
+            with self.subTest(name):
+                self.assertEqual(self.process(response).content, response.content)
+                self.assertFalse(response.has_header('Vary'))
+
+    def test_client_without_gzip_gets_identity(self):
+        for accept_encoding in ('', 'identity', 'gzip;q=0, deflate'):
+            with self.subTest(accept_encoding):
+                response = self.process(HttpResponse(BODY), accept_encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_event_stream_untouched(self):
+        response = self.process(StreamingHttpResponse(iter([b'data: 1\n\n']), content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_stream_flushes_every_chunk(self):
+        chunks = [b'<tr>row %d</tr>' % n for n in range(3)]
+        response = self.process(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        # Each compressed piece decodes to its whole chunk before the next one is produced
+        decompressor = zlib.decompressobj(31)
+        pieces = list(response.streaming_content)
+        for chunk, piece in zip(chunks, pieces):
+            self.assertEqual(decompressor.decompress(piece), chunk)
+        self.assertEqual(decompressor.decompress(b''.join(pieces[len(chunks):])), b'')
+        self.assertTrue(decompressor.eof)
+
+    async def test_async_stream(self):
+        async def chunks():
+            yield BODY
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = StreamingHttpResponse(chunks())
+        response = CompressionMiddleware(lambda request: response).process_response(request, response)
+        body = b''.join([piece async for piece in response.streaming_content])
+        self.assertEqual(gzip.decompress(body), BODY)
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('*'), compression.available_encodings()[0])
+        self.assertIsNone(choose_encoding('deflate'))
+
+    @skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        response = self.process(HttpResponse(BODY), 'gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), BODY)
+
+    @override_settings(COMPRESSION_TYPES=('application/json',))
+    def test_allow_list_setting(self):
+        self.assertFalse(self.process(HttpResponse(BODY)).has_header('Content-Encoding'))
+
+
+class CompressedPageTest(SharedDataTestCase):
+    """Test compression through the full middleware stack"""
+
+    def test_dashboard_compressed_and_revalidates(self):
+        self.login_as('quality')
+        url = reverse('quality_dashboard')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'</html>', gzip.decompress(response.content))
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        cached = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
@@ -0,0 +1,149 @@
+from django.test import TestCase
+from django.db.models.signals import post_save
+from django.urls import reverse
+from datetime import date, timedelta
+from myapp.models import Equipment
+from .utils import SharedDataTestCase
+
+
+class EquipmentVersioningTest(TestCase):
+    """Test optimistic concurrency on Equipment writes"""
+
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.equipment = Equipment.objects.create(
+            machine_id='EQ001',
+            machine_name='CNC Machine Alpha',
+            machine_type='PRODUCTION',
+            machine_location='Factory Floor A',
+            last_calibration_date=date.today() - timedelta(days=30),
+            last_maintenance_date=date.today() - timedelta(days=15)
+        )
+
+    def test_new_equipment_starts_at_version_one(self):
+        """Test that new equipment starts at version 1"""
+        self.assertEqual(self.equipment.version, 1)
+
+    def test_versioned_save_bumps_version(self):
+        """Test that a successful versioned write increments the version"""
+        self.equipment.last_maintenance_date = date.today()
+
+        self.assertTrue(self.equipment.save_versioned(['last_maintenance_date']))
+        self.assertEqual(self.equipment.version, 2)
+
+        stored = Equipment.objects.get(pk='EQ001')
+        self.assertEqual(stored.version, 2)
+        self.assertEqual(stored.last_maintenance_date, date.today())
+
+    def test_stale_write_is_rejected(self):
+        """Test that the second of two concurrent writers is refused"""
+        first = Equipment.objects.get(pk='EQ001')
+        second = Equipment.objects.get(pk='EQ001')
+
+        first.last_maintenance_date = date.today()
+        self.assertTrue(first.save_versioned(['last_maintenance_date']))
+
+        second.last_maintenance_date = date.today() - timedelta(days=1)
+        self.assertFalse(second.save_versioned(['last_maintenance_date']))
+
+        stored = Equipment.objects.get(pk='EQ001')
+        self.assertEqual(stored.last_maintenance_date, date.today())
+        self.assertEqual(stored.version, 2)
+
+    def test_only_update_fields_are_written(self):
+        """Test that columns outside update_fields are left untouched"""
+        Equipment.objects.filter(pk='EQ001').update(machine_name='Renamed Elsewhere')
+
+        self.equipment.last_calibration_date = date.today()
+        self.assertTrue(self.equipment.save_versioned(['last_calibration_date']))
+
+        stored = Equipment.objects.get(pk='EQ001')
+        self.assertEqual(stored.machine_name, 'Renamed Elsewhere')
+        self.assertEqual(stored.last_calibration_date, date.today())
+
+    def test_expected_version_from_form(self):
+        """Test that the version submitted with a form is what gets checked"""
+        self.equipment.last_maintenance_date = date.today()
+
+        self.assertFalse(self.equipment.save_versioned(['last_maintenance_date'], expected_version=7))
+        self.assertEqual(Equipment.objects.get(pk='EQ001').version, 1)
+
+    def test_plain_save_bumps_version(self):
+        """Test that an unchecked save() (admin, ModelForm) still conflicts with versioned writers"""
+        versioned = Equipment.objects.get(pk='EQ001')
+        stale_admin = Equipment.objects.get(pk='EQ001')
+
+        self.equipment.machine_name = 'Renamed In Admin'
+        self.equipment.save()
+        self.assertEqual(Equipment.objects.get(pk='EQ001').version, 2)
+
+        versioned.last_maintenance_date = date.today()
+        self.assertFalse(versioned.save_versioned(['last_maintenance_date']))
+
+        # A stale instance saved without a check still moves past the stored version
+        stale_admin.save(update_fields=['machine_location'])
+        self.assertEqual(stale_admin.version, 3)
+        self.assertEqual(Equipment.objects.get(pk='EQ001').version, 3)
+
+    def test_post_save_sent_for_versioned_write(self):
+        """Test that receivers are notified about versioned writes"""
+        received = []
+
+        def receiver(sender, instance, created, update_fields, **kwargs):
+            received.append((instance.pk, created, update_fields))
+
+        post_save.connect(receiver, sender=Equipment)
+        try:
+            self.equipment.last_maintenance_date = date.today()
+            self.equipment.save_versioned(['last_maintenance_date'])
+        finally:
+            post_save.disconnect(receiver, sender=Equipment)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0][0], 'EQ001')
+        self.assertFalse(received[0][1])
+        self.assertIn('last_maintenance_date', received[0][2])
+
+
+class VersionConflictViewTest(SharedDataTestCase):
+    """Test that the completion and edit forms re-render on a lost versioned write"""
+
+    def setUp(self):
+        self.equipment = Equipment.objects.get(pk=self.equipment[-1].pk)
+        # Someone else saves after the form was opened at this version
+        self.opened_at = self.equipment.version
+        self.equipment.machine_location = 'Moved Elsewhere'
+        self.equipment.save()
+
+    def test_completion_conflict(self):
+        for role, url in (('maintenance', 'maintenance_complete_procedure'), ('administrator', 'admin_complete_procedure')):
+            with self.subTest(url):
+                self.login_as(role)
+                response = self.client.post(reverse(url, args=[self.equipment.machine_id]), {
+                    'procedure_type': 'maintenance',
+                    'completion_date': date.today().isoformat(),
+                    'version': self.opened_at,
+                })
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'was updated by another user while you were working')
+                self.assertEqual(response.context['form']['version'].value(), self.equipment.version)
+                self.assertNotEqual(Equipment.objects.get(pk=self.equipment.pk).last_maintenance_date, date.today())
+
+    def test_edit_conflict_lists_differences(self):
+        self.login_as('administrator')
+        response = self.client.post(reverse('admin_edit_equipment', args=[self.equipment.machine_id]), {
+            'machine_id': self.equipment.machine_id,
+            'machine_name': self.equipment.machine_name,
+            'machine_type': self.equipment.machine_type,
+            'machine_location': 'My Location',
+            'last_calibration_date': self.equipment.last_calibration_date or '',
+            'last_maintenance_date': self.equipment.last_maintenance_date or '',
+            'calibration_interval_days': self.equipment.calibration_interval_days,
+            'maintenance_interval_days': self.equipment.maintenance_interval_days,
+            'version': self.opened_at,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'was updated by another user while you were editing')
+        conflicts = response.context['conflicts']
+        self.assertEqual([(c['current'], c['submitted']) for c in conflicts], [('Moved Elsewhere', 'My Location')])
+        self.assertEqual(Equipment.objects.get(pk=self.equipment.pk).machine_location, 'Moved Elsewhere')
@@ -0,0 +1,121 @@
+import re
+
+from django.contrib.messages import constants
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from django.utils.http import http_date
+
+from myapp.models import Equipment
+from .factories import DEFAULT_PASSWORD, UserFactory
+from .utils import SharedDataTestCase
+
+
+class ConditionalApiTest(SharedDataTestCase):
+    """Test ETag/Last-Modified revalidation of the equipment APIs"""
+
+    def setUp(self):
+        self.login_as('administrator')
+
+    def test_unchanged_data_returns_304(self):
+        for name in ('equipment_api_list', 'equipment_api_stats'):
+            with self.subTest(name):
+                url = reverse(name)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertIn('no-cache', response['Cache-Control'])
+
+                # The user lookup and the version aggregate - the view itself never runs
+                with self.assertNumQueries(2):
+                    cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached.content, b'')
+
+                cached = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(cached.status_code, 304)
+
+    def test_edit_and_delete_change_the_etag(self):
+        url = reverse('equipment_api_list')
+        etag = self.client.get(url)['ETag']
+
+        equipment = Equipment.objects.get(pk=self.equipment[0].pk)
+        equipment.machine_name = 'Renamed'
+        equipment.save_versioned(['machine_name'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed')
+
+        etag = response['ETag']
+        Equipment.objects.filter(pk=self.equipment[1].pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_last_modified_is_never_before_today(self):
+        """Statuses roll over at midnight, so a day-old If-Modified-Since must not match"""
+        Equipment.objects.update(updated_at='2020-01-01T00:00:00Z')
+        url = reverse('equipment_api_stats')
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(1577836800))
+        self.assertEqual(response.status_code, 200)
+
+
+class ConditionalPageTest(SharedDataTestCase):
+    """Test that dashboard ETags depend on the viewer"""
+
+    def test_same_user_gets_304(self):
+        self.login_as('quality')
+        url = reverse('quality_dashboard')
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_other_user_gets_full_page(self):
+        self.login_as('quality')
+        url = reverse('quality_dashboard')
+        etag = self.client.get(url)['ETag']
+
+        self.client.force_login(UserFactory(role='quality'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pending_message_disables_304(self):
+        self.login_as('maintenance')
+        url = reverse('maintenance_dashboard')
+        etag = self.client.get(url)['ETag']
+
+        # Queue a flash message in the cookie, as a completion POST would
+        storage = CookieStorage(RequestFactory().get('/'))
+        storage.add(constants.SUCCESS, 'Maintenance completed')
+        carrier = HttpResponse()
+        storage.update(carrier)
+        self.client.cookies.update(carrier.cookies)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Maintenance completed')
+
+    def test_new_login_gets_fresh_form_tokens(self):
+        client = Client(enforce_csrf_checks=True)
+        user = self.users['maintenance']
+        url = reverse('maintenance_dashboard')
+
+        def log_in():
+            client.get(reverse('login'))
+            response = client.post(reverse('login'), {
+                'username': user.username, 'password': DEFAULT_PASSWORD,
+                'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+            }, follow=True)  # lands on the dashboard, showing the welcome message
+            self.assertEqual(response.request['PATH_INFO'], url)
+
+        log_in()
+        etag = client.get(url)['ETag']
+        client.get(reverse('logout'))
+        log_in()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+        due = self.equipment[self.equipment_per_status]
+        response = client.post(reverse('quick_task_complete', args=[due.machine_id]), {
+            'task_type': 'calibration', 'csrfmiddlewaretoken': token,
+        })
+        self.assertNotEqual(response.status_code, 403)
@@ -13,23 +13,23 @@ class DatabaseIntegrityTest(TestCase):
     def test_equipment_primary_key_uniqueness(self):
         """Test that Machine_ID as primary key is unique"""
         Equipment.objects.create(
-            Machine_ID='TEST001',
-            Machine_Name='Test Machine 1',
-            Machine_Type='Test',
-            Machine_Location='Test Location',
-            Last_Calibration_Date=date.today(),
-            Last_Maintenance_Date=date.today()
+            machine_id='TEST001',
+            machine_name='Test Machine 1',
+            machine_type='Test',
+            machine_location='Test Location',
+            last_calibration_date=date.today(),
+            last_maintenance_date=date.today()
         )
         
         # Try to create another equipment with same Machine_ID
         with self.assertRaises(IntegrityError):
             Equipment.objects.create(
-                Machine_ID='TEST001',
-                Machine_Name='Test Machine 2',
-                Machine_Type='Test',
-                Machine_Location='Test Location',
-                Last_Calibration_Date=date.today(),
-                Last_Maintenance_Date=date.today()
+                machine_id='TEST001',
+                machine_name='Test Machine 2',
+                machine_type='Test',
+                machine_location='Test Location',
+                last_calibration_date=date.today(),
+                last_maintenance_date=date.today()
             )
     
     def test_foreign_key_constraints(self):
@@ -40,11 +40,10 @@ class DatabaseIntegrityTest(TestCase):
             password='TestPassword123!'
         )
         
-        profile = UserProfile.objects.create(
-            user=user,
-            role='Quality',
-            employee_id='EMP001'
-        )
+        profile = user.profile
+        profile.role = 'quality'
+        profile.employee_id = 'EMP001'
+        profile.save()
         
         # Test that deleting user cascades to profile
         user_id = user.id
@@ -57,12 +56,12 @@ class DatabaseIntegrityTest(TestCase):
         """Test database transaction handling"""
         with transaction.atomic():
             equipment = Equipment.objects.create(
-                Machine_ID='TRANS001',
-                Machine_Name='Transaction Test',
-                Machine_Type='Test',
-                Machine_Location='Test Location',
-                Last_Calibration_Date=date.today(),
-                Last_Maintenance_Date=date.today()
+                machine_id='TRANS001',
+                machine_name='Transaction Test',
+                machine_type='Test',
+                machine_location='Test Location',
+                last_calibration_date=date.today(),
+                last_maintenance_date=date.today()
             )
             
             # Rollback transaction on error
@@ -70,47 +69,47 @@ class DatabaseIntegrityTest(TestCase):
                 with transaction.atomic():
                     # This should fail due to duplicate Machine_ID
                     Equipment.objects.create(
-                        Machine_ID='TRANS001',
-                        Machine_Name='Another Machine',
-                        Machine_Type='Test',
-                        Machine_Location='Test Location',
-                        Last_Calibration_Date=date.today(),
-                        Last_Maintenance_Date=date.today()
+                        machine_id='TRANS001',
+                        machine_name='Another Machine',
+                        machine_type='Test',
+                        machine_location='Test Location',
+                        last_calibration_date=date.today(),
+                        last_maintenance_date=date.today()
                     )
             except IntegrityError:
                 pass
         
         # Original equipment should still exist
-        self.assertTrue(Equipment.objects.filter(Machine_ID='TRANS001').exists())
+        self.assertTrue(Equipment.objects.filter(machine_id='TRANS001').exists())
     
     def test_bulk_operations(self):
         """Test bulk database operations"""
         equipment_list = []
         for i in range(100):
             equipment_list.append(Equipment(
-                Machine_ID=f'BULK{i:03d}',
-                Machine_Name=f'Bulk Machine {i}',
-                Machine_Type='Bulk Test',
-                Machine_Location=f'Location {i}',
-                Last_Calibration_Date=date.today(),
-                Last_Maintenance_Date=date.today()
+                machine_id=f'BULK{i:03d}',
+                machine_name=f'Bulk Machine {i}',
+                machine_type='Bulk Test',
+                machine_location=f'Location {i}',
+                last_calibration_date=date.today(),
+                last_maintenance_date=date.today()
             ))
         
         # Bulk create
         Equipment.objects.bulk_create(equipment_list)
         
         # Verify all were created
-        self.assertEqual(Equipment.objects.filter(Machine_Type='Bulk Test').count(), 100)
+        self.assertEqual(Equipment.objects.filter(machine_type='Bulk Test').count(), 100)
         
         # Bulk update
-        Equipment.objects.filter(Machine_Type='Bulk Test').update(
-            Machine_Location='Updated Location'
+        Equipment.objects.filter(machine_type='Bulk Test').update(
+            machine_location='Updated Location'
         )
         
         # Verify all were updated
         updated_count = Equipment.objects.filter(
-            Machine_Type='Bulk Test',
-            Machine_Location='Updated Location'
+            machine_type='Bulk Test',
+            machine_location='Updated Location'
         ).count()
         self.assertEqual(updated_count, 100)
 
@@ -118,71 +117,74 @@ class DatabaseIntegrityTest(TestCase):
 class DatabaseQueryTest(TestCase):
     """Test database queries and performance"""
     
-    def setUp(self):
-        """Set up test data"""
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class - each test runs in a savepoint on top of it"""
         # Create test equipment
-        for i in range(50):
-            Equipment.objects.create(
-                Machine_ID=f'QUERY{i:03d}',
-                Machine_Name=f'Query Test Machine {i}',
-                Machine_Type='CNC' if i % 2 == 0 else 'Lathe',
-                Machine_Location=f'Floor {i // 10 + 1}',
-                Last_Calibration_Date=date.today() - timedelta(days=i * 7),
-                Last_Maintenance_Date=date.today() - timedelta(days=i * 3)
+        Equipment.objects.bulk_create([
+            Equipment(
+                machine_id=f'QUERY{i:03d}',
+                machine_name=f'Query Test Machine {i}',
+                machine_type='CNC' if i % 2 == 0 else 'Lathe',
+                machine_location=f'Floor {i // 10 + 1}',
+                last_calibration_date=date.today() - timedelta(days=i * 7),
+                last_maintenance_date=date.today() - timedelta(days=i * 3)
             )
+            for i in range(50)
+        ])
     
     def test_simple_queries(self):
         """Test basic database queries"""
         # Test get by primary key
-        equipment = Equipment.objects.get(Machine_ID='QUERY001')
-        self.assertEqual(equipment.Machine_Name, 'Query Test Machine 1')
+        equipment = Equipment.objects.get(machine_id='QUERY001')
+        self.assertEqual(equipment.machine_name, 'Query Test Machine 1')
         
         # Test filter
-        cnc_machines = Equipment.objects.filter(Machine_Type='CNC')
+        cnc_machines = Equipment.objects.filter(machine_type='CNC')
         self.assertEqual(cnc_machines.count(), 25)
         
         # Test exclude
-        non_cnc = Equipment.objects.exclude(Machine_Type='CNC')
+        non_cnc = Equipment.objects.exclude(machine_type='CNC')
         self.assertEqual(non_cnc.count(), 25)
     
     def test_complex_queries(self):
         """Test complex database queries"""
         # Test Q objects
         recent_calibration = Equipment.objects.filter(
-            Q(Last_Calibration_Date__gte=date.today() - timedelta(days=30))
+            Q(last_calibration_date__gte=date.today() - timedelta(days=30))
         )
         self.assertGreater(recent_calibration.count(), 0)
         
         # Test OR queries
         cnc_or_recent = Equipment.objects.filter(
-            Q(Machine_Type='CNC') | 
-            Q(Last_Maintenance_Date__gte=date.today() - timedelta(days=7))
+            Q(machine_type='CNC') | 
+            Q(last_maintenance_date__gte=date.today() - timedelta(days=7))
         )
         self.assertGreater(cnc_or_recent.count(), 0)
         
         # Test ordering
-        ordered_equipment = Equipment.objects.order_by('-Last_Calibration_Date')
-        self.assertEqual(ordered_equipment.first().Machine_ID, 'QUERY000')
+        ordered_equipment = Equipment.objects.order_by('-last_calibration_date')
+        self.assertEqual(ordered_equipment.first().machine_id, 'QUERY000')
     
     def test_aggregation_queries(self):
         """Test aggregation queries"""
         from django.db.models import Count, Min, Max
         
         # Count by type
-        type_counts = Equipment.objects.values('Machine_Type').annotate(
-            count=Count('Machine_ID')
+        type_counts = Equipment.objects.values('machine_type').annotate(
+            count=Count('machine_id')
         )
         
         cnc_count = next(
-            (item['count'] for item in type_counts if item['Machine_Type'] == 'CNC'),
+            (item['count'] for item in type_counts if item['machine_type'] == 'CNC'),
             0
         )
         self.assertEqual(cnc_count, 25)
         
         # Min/Max dates
         date_stats = Equipment.objects.aggregate(
-            min_cal_date=Min('Last_Calibration_Date'),
-            max_cal_date=Max('Last_Calibration_Date')
+            min_cal_date=Min('last_calibration_date'),
+            max_cal_date=Max('last_calibration_date')
         )
         
         self.assertIsNotNone(date_stats['min_cal_date'])
@@ -192,20 +194,20 @@ class DatabaseQueryTest(TestCase):
         """Test search functionality across multiple fields"""
         # Search by machine name
         name_search = Equipment.objects.filter(
-            Machine_Name__icontains='Machine 1'
+            machine_name__icontains='Machine 1'
         )
         self.assertGreater(name_search.count(), 0)
         
         # Search by location
         location_search = Equipment.objects.filter(
-            Machine_Location__icontains='Floor 1'
+            machine_location__icontains='Floor 1'
         )
         self.assertEqual(location_search.count(), 10)  # Machines 0-9
         
         # Combined search
         combined_search = Equipment.objects.filter(
-            Q(Machine_Name__icontains='Test') & 
-            Q(Machine_Type='CNC')
+            Q(machine_name__icontains='Test') & 
+            Q(machine_type='CNC')
         )
         self.assertEqual(combined_search.count(), 25)
     
@@ -213,20 +215,20 @@ class DatabaseQueryTest(TestCase):
         """Test queries for equipment due for calibration/maintenance"""
         # Equipment due for calibration (older than 1 year)
         due_for_calibration = Equipment.objects.filter(
-            Last_Calibration_Date__lt=date.today() - timedelta(days=365)
+            last_calibration_date__lt=date.today() - timedelta(days=365)
         )
         
         # Equipment due for maintenance (older than 6 months)
         due_for_maintenance = Equipment.objects.filter(
-            Last_Maintenance_Date__lt=date.today() - timedelta(days=180)
+            last_maintenance_date__lt=date.today() - timedelta(days=180)
         )
         
         # Equipment due in next 2 weeks (based on intervals)
         # This assumes we have calibration_interval and maintenance_interval fields
         # or we calculate based on some business logic
         upcoming_due = Equipment.objects.filter(
-            Q(Last_Calibration_Date__lt=date.today() - timedelta(days=350)) |
-            Q(Last_Maintenance_Date__lt=date.today() - timedelta(days=170))
+            Q(last_calibration_date__lt=date.today() - timedelta(days=350)) |
+            Q(last_maintenance_date__lt=date.today() - timedelta(days=170))
         )
         
         self.assertGreaterEqual(due_for_calibration.count(), 0)
@@ -253,9 +255,9 @@ class DatabaseConnectionTest(TestCase):
         # Check that database is configured
         self.assertIn('default', settings.DATABASES)
         
-        # For testing, we typically use SQLite
+        # For testing, we typically use SQLite - PostgreSQL when run with DB_ENGINE=postgresql
         db_engine = settings.DATABASES['default']['ENGINE']
-        self.assertIn('sqlite', db_engine.lower())
+        self.assertIn('postgresql' if settings.DB_ENGINE == 'postgresql' else 'sqlite', db_engine.lower())
 
 
 class DataValidationTest(TestCase):
@@ -266,31 +268,31 @@ class DataValidationTest(TestCase):
         # Test Machine_ID is required
         with self.assertRaises((IntegrityError, ValidationError)):
             equipment = Equipment(
-                Machine_Name='Test Machine',
-                Machine_Type='Test',
-                Machine_Location='Test Location'
+                machine_name='Test Machine',
+                machine_type='Test',
+                machine_location='Test Location'
             )
             equipment.full_clean()  # This will raise ValidationError
     
     def test_date_field_validation(self):
         """Test date field validation"""
         equipment = Equipment.objects.create(
-            Machine_ID='DATE001',
-            Machine_Name='Date Test Machine',
-            Machine_Type='Test',
-            Machine_Location='Test Location',
-            Last_Calibration_Date=date.today(),
-            Last_Maintenance_Date=date.today()
+            machine_id='DATE001',
+            machine_name='Date Test Machine',
+            machine_type='Test',
+            machine_location='Test Location',
+            last_calibration_date=date.today(),
+            last_maintenance_date=date.today()
         )
         
         # Test that dates can be None (if allowed)
-        equipment.Last_Calibration_Date = None
-        equipment.Last_Maintenance_Date = None
+        equipment.last_calibration_date = None
+        equipment.last_maintenance_date = None
         equipment.save()
         
         equipment.refresh_from_db()
-        self.assertIsNone(equipment.Last_Calibration_Date)
-        self.assertIsNone(equipment.Last_Maintenance_Date)
+        self.assertIsNone(equipment.last_calibration_date)
+        self.assertIsNone(equipment.last_maintenance_date)
     
     def test_field_length_constraints(self):
         """Test field length constraints"""
@@ -299,12 +301,12 @@ class DataValidationTest(TestCase):
         
         with self.assertRaises((IntegrityError, ValidationError)):
             equipment = Equipment(
-                Machine_ID=long_machine_id,
-                Machine_Name='Test Machine',
-                Machine_Type='Test',
-                Machine_Location='Test Location',
-                Last_Calibration_Date=date.today(),
-                Last_Maintenance_Date=date.today()
+                machine_id=long_machine_id,
+                machine_name='Test Machine',
+                machine_type='Test',
+                machine_location='Test Location',
+                last_calibration_date=date.today(),
+                last_maintenance_date=date.today()
             )
             equipment.full_clean()
 
@@ -316,19 +318,19 @@ class DatabaseBackupRestoreTest(TransactionTestCase):
         """Test that data persists across transactions"""
         # Create equipment
         equipment = Equipment.objects.create(
-            Machine_ID='PERSIST001',
-            Machine_Name='Persistence Test',
-            Machine_Type='Test',
-            Machine_Location='Test Location',
-            Last_Calibration_Date=date.today(),
-            Last_Maintenance_Date=date.today()
+            machine_id='PERSIST001',
+            machine_name='Persistence Test',
+            machine_type='Test',
+            machine_location='Test Location',
+            last_calibration_date=date.today(),
+            last_maintenance_date=date.today()
         )
         
         # Commit transaction
         transaction.commit()
         
         # Verify data exists in new transaction
-        equipment_exists = Equipment.objects.filter(Machine_ID='PERSIST001').exists()
+        equipment_exists = Equipment.objects.filter(machine_id='PERSIST001').exists()
         self.assertTrue(equipment_exists)
     
     def test_rollback_functionality(self):
@@ -338,12 +340,12 @@ class DatabaseBackupRestoreTest(TransactionTestCase):
         try:
             with transaction.atomic():
                 Equipment.objects.create(
-                    Machine_ID='ROLLBACK001',
-                    Machine_Name='Rollback Test',
-                    Machine_Type='Test',
-                    Machine_Location='Test Location',
-                    Last_Calibration_Date=date.today(),
-                    Last_Maintenance_Date=date.today()
+                    machine_id='ROLLBACK001',
+                    machine_name='Rollback Test',
+                    machine_type='Test',
+                    machine_location='Test Location',
+                    last_calibration_date=date.today(),
+                    last_maintenance_date=date.today()
                 )
                 
                 # Force an error to trigger rollback
@@ -354,4 +356,4 @@ class DatabaseBackupRestoreTest(TransactionTestCase):
         
         # Count should be unchanged
         final_count = Equipment.objects.count()
-        self.assertEqual(initial_count, final_count)
\ No newline at end of file
+        self.assertEqual(initial_count, final_count)
\ No newline at end of file
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import threading
+from datetime import date
+from unittest import skipUnless
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from myapp.events import (
+    EventBroker, event_cursor, events_since, format_cursor, get_broker, latest_cursor, parse_cursor, stream_events,
+)
+from myapp.models import Equipment, EquipmentEvent
+from .factories import EquipmentFactory
+from .utils import SharedDataTestCase
+
+
+def parse_stream(content):
+    """(id, event, data) for each dispatched SSE frame"""
+    frames = []
+    for block in content.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            frames.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return frames
+
+
+class EquipmentEventRecordTest(TestCase):
+    """Test that equipment changes leave events behind"""
+
+    def test_completion_recorded(self):
+        equipment = EquipmentFactory()
+        equipment.last_maintenance_date = date.today()
+        equipment.save_versioned(['last_maintenance_date'])
+
+        created, completed = EquipmentEvent.objects.all()
+        self.assertEqual(created.kind, 'created')
+        self.assertEqual(completed.kind, 'completed')
+        self.assertEqual(completed.machine_id, equipment.machine_id)
+        self.assertEqual(completed.payload['last_maintenance_date'], date.today().isoformat())
+        self.assertFalse(completed.payload['is_maintenance_overdue'])
+
+    def test_edit_recorded_as_update(self):
+        equipment = EquipmentFactory()
+        equipment.machine_name = 'Renamed'
+        equipment.save()
+        self.assertEqual(EquipmentEvent.objects.last().kind, 'updated')
+
+    def test_rolled_back_change_leaves_no_event(self):
+        equipment = EquipmentFactory()
+        before = EquipmentEvent.objects.count()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            equipment.last_calibration_date = date.today()
+            equipment.save_versioned(['last_calibration_date'])
+            raise RuntimeError
+        self.assertEqual(EquipmentEvent.objects.count(), before)
+
+    def test_failed_event_rolls_back_the_change(self):
+        equipment = EquipmentFactory()
+        calibrated = equipment.last_calibration_date
+
+        def crash(sender, **kwargs):
+            raise RuntimeError
+
+        post_save.connect(crash, sender=Equipment)
+        try:
+            equipment.last_calibration_date = date.today()
+            with self.assertRaises(RuntimeError):
+                equipment.save_versioned(['last_calibration_date'])
+            with self.assertRaises(RuntimeError):
+                Equipment.objects.get(pk=equipment.pk).save()
+        finally:
+            post_save.disconnect(crash, sender=Equipment)
+        # Neither write is left behind without its event
+        stored = Equipment.objects.get(pk=equipment.pk)
+        self.assertEqual((stored.version, stored.last_calibration_date), (1, calibrated))
+
+    def test_delete_recorded(self):
+        equipment = EquipmentFactory()
+        machine_id = equipment.machine_id
+        equipment.delete()
+        event = EquipmentEvent.objects.last()
+        self.assertEqual((event.kind, event.machine_id), ('deleted', machine_id))
+
+
+class EquipmentEventViewTest(SharedDataTestCase):
+    """Test the event endpoint as served under WSGI"""
+
+    def test_anonymous_redirected_to_login(self):
+        response = self.client.get(reverse('equipment_events'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_pending_events_then_counts(self):
+        self.login_as('maintenance')
+        cursor = latest_cursor()
+        equipment = Equipment.objects.get(pk=self.equipment[0].pk)
+        equipment.last_maintenance_date = date.today()
+        equipment.save_versioned(['last_maintenance_date'])
+
+        response = self.client.get(reverse('equipment_events'), HTTP_LAST_EVENT_ID=format_cursor(cursor))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        frames = parse_stream(response.content)
+        self.assertEqual([kind for _, kind, _ in frames], ['completed', 'counts'])
+        self.assertEqual(frames[0][0], format_cursor(event_cursor(EquipmentEvent.objects.last())))
+        self.assertEqual(frames[0][2]['machine_id'], equipment.machine_id)
+        self.assertEqual(frames[1][2]['total_equipment'], Equipment.objects.count())
+
+    def test_first_request_only_reports_position(self):
+        self.login_as('quality')
+        EquipmentFactory()
+        event = EquipmentEvent.objects.last()
+        response = self.client.get(reverse('equipment_events'))
+        self.assertEqual(parse_stream(response.content), [])
+        self.assertIn(f'id: {format_cursor(event_cursor(event))}\n', response.content.decode())
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(parse_cursor(format_cursor((0, 42))), (0, 42))
+        self.assertEqual(parse_cursor(format_cursor((918, 42))), (918, 42))
+        self.assertIsNone(parse_cursor('not-an-id'))
+
+
+class EventStreamTest(TestCase):
+    """Test replay and live fan-out of the async stream"""
+
+    async def test_replay_then_live_events(self):
+        equipment = await sync_to_async(EquipmentFactory)()
+        created = await EquipmentEvent.objects.alast()
+
+        txid, event_id = event_cursor(created)
+        stream = stream_events(cursor=(txid, event_id - 1), heartbeat=60)
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+        replayed = parse_stream(await stream.__anext__())
+        self.assertEqual(replayed[0][1], 'created')
+
+        # The broker delivers what was saved after subscribing
+        broker = get_broker()
+        equipment.machine_name = 'Renamed'
+        await equipment.asave()
+        await broker.poll()
+        live = parse_stream(await stream.__anext__()) + parse_stream(await stream.__anext__())
+        self.assertEqual([kind for _, kind, _ in live], ['updated', 'counts'])
+        self.assertEqual(live[0][2]['machine_name'], 'Renamed')
+
+        await stream.aclose()
+        self.assertFalse(broker.subscribers)
+        await asyncio.sleep(0)  # let the broker task see there is nobody left
+
+    async def test_stalled_subscriber_is_dropped(self):
+        broker = EventBroker(poll_interval=60)
+        queue = asyncio.Queue(maxsize=1)
+        broker.subscribers.add(queue)
+        broker.cursor = (0, 0)
+        await sync_to_async(EquipmentFactory.create_batch)(2)
+        await broker.poll()
+        self.assertNotIn(queue, broker.subscribers)
+        self.assertIsNone(queue.get_nowait())
+
+    async def test_stream_ends_when_client_disconnects(self):
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        stream = stream_events(heartbeat=60, receive=receive)
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        disconnected.set()
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(pending, 5)
+        self.assertFalse(get_broker().subscribers)
+
+    async def test_stream_closed_after_max_age(self):
+        stream = stream_events(heartbeat=60, max_age=0.05)
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(stream.__anext__(), 5)
+        self.assertFalse(get_broker().subscribers)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'ids only commit out of order on PostgreSQL')
+class CommitOrderTest(TransactionTestCase):
+    """Test that an event committed after a higher id is not skipped"""
+
+    def test_late_commit_is_read(self):
+        cursor = latest_cursor()
+        inserted, release = threading.Event(), threading.Event()
+
+        def slow_writer():
+            try:
+                with transaction.atomic():
+                    EquipmentFactory(machine_id='SLOW')
+                    inserted.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=slow_writer)
+        writer.start()
+        try:
+            self.assertTrue(inserted.wait(10))
+            EquipmentFactory(machine_id='FAST')  # higher id, committed first
+            # Nothing is final while the older transaction is still open
+            self.assertEqual(events_since(cursor), [])
+        finally:
+            release.set()
+            writer.join()
+
+        self.assertEqual([event.machine_id for event in events_since(cursor)], ['SLOW', 'FAST'])
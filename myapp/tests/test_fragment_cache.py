@@ -0,0 +1,131 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from myapp.models import Equipment
+from myapp.utils.fragment_cache import bump_data_version, data_version
+from .factories import EquipmentFactory, UserFactory
+from .utils import SharedDataTestCase
+
+
+class DataVersionTest(TestCase):
+    """Test that Equipment writes replace the data version once they commit"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stable_until_changed(self):
+        version = data_version()
+        self.assertEqual(data_version(), version)
+        bump_data_version()
+        self.assertNotEqual(data_version(), version)
+
+    def test_save_and_delete(self):
+        version = data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            equipment = EquipmentFactory()
+        self.assertNotEqual(data_version(), version)
+
+        version = data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            equipment.last_maintenance_date = None
+            self.assertTrue(equipment.save_versioned(['last_maintenance_date']))
+        self.assertNotEqual(data_version(), version)
+
+        version = data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            equipment.delete()
+        self.assertNotEqual(data_version(), version)
+
+    def test_not_before_commit(self):
+        version = data_version()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            EquipmentFactory()
+        self.assertEqual(data_version(), version)
+        self.assertEqual(len(callbacks), 1)
+
+
+@override_settings(FRAGMENT_CACHE_TIMEOUT=60)
+class DashboardSectionCacheTest(SharedDataTestCase):
+    """Test the dashboards' cached sections"""
+
+    def setUp(self):
+        cache.clear()
+        self.overdue = self.equipment[-1]
+        self.query = {'status': 'overdue_maintenance'}
+
+    def rename_without_signal(self, name):
+        Equipment.objects.filter(pk=self.overdue.pk).update(machine_name=name)
+
+    def test_sections_kept_until_data_version_changes(self):
+        for role, url in (('administrator', 'admin_dashboard'), ('maintenance', 'maintenance_dashboard')):
+            with self.subTest(role):
+                cache.clear()
+                self.overdue.refresh_from_db()
+                self.login_as(role)
+                old_name = self.overdue.machine_name
+                self.assertContains(self.client.get(reverse(url), self.query), old_name)
+
+                # Still in the cached search results (the maintenance due tables already show the new one)
+                self.rename_without_signal(f'Renamed for {role}')
+                self.assertContains(self.client.get(reverse(url), self.query), old_name)
+                bump_data_version()
+                self.assertNotContains(self.client.get(reverse(url), self.query), old_name)
+
+    def test_cached_sections_skip_classification(self):
+        for role, url in (('administrator', 'admin_dashboard'), ('maintenance', 'maintenance_dashboard'),
+                          ('quality', 'quality_dashboard')):
+            with self.subTest(role):
+                cache.clear()
+                self.login_as(role)
+                with CaptureQueriesContext(connection) as rendered:
+                    self.client.get(reverse(url), self.query)
+                with CaptureQueriesContext(connection) as cached:
+                    response = self.client.get(reverse(url), self.query)
+                self.assertEqual(response.status_code, 200)
+                # The equipment behind the cached sections is never loaded
+                self.assertLess(len(cached), len(rendered))
+
+    def test_quality_sections_cached(self):
+        self.login_as('quality')
+        url, query = reverse('quality_dashboard'), {'search': self.overdue.machine_id}
+        old_name = self.overdue.machine_name
+        self.assertContains(self.client.get(url, query), old_name)
+        self.rename_without_signal('Renamed for quality')
+        self.assertContains(self.client.get(url, query), old_name)
+        bump_data_version()
+        self.assertNotContains(self.client.get(url, query), old_name)
+
+    def test_save_refreshes_sections(self):
+        self.login_as('administrator')
+        self.client.get(reverse('admin_dashboard'), self.query)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.overdue.machine_name = 'Saved Name'
+            self.overdue.save()
+        self.assertContains(self.client.get(reverse('admin_dashboard'), self.query), 'Saved Name')
+
+    def test_sections_vary_on_query(self):
+        self.login_as('administrator')
+        self.client.get(reverse('admin_dashboard'), self.query)
+        response = self.client.get(reverse('admin_dashboard'), {'search': self.overdue.machine_id})
+        self.assertContains(response, f'value="{self.overdue.machine_id}"')
+
+    def test_per_user_parts_stay_dynamic(self):
+        self.login_as('administrator')
+        self.client.get(reverse('admin_dashboard'), self.query)
+
+        other = UserFactory(username='second_admin', role='administrator')
+        self.client.force_login(other)
+        response = self.client.get(reverse('admin_dashboard'), self.query)
+        self.assertContains(response, 'Welcome, second_admin!')
+
+    def test_due_rows_are_not_cached(self):
+        self.login_as('maintenance')
+        self.client.get(reverse('maintenance_dashboard'))
+        due = self.equipment[self.equipment_per_status]
+        Equipment.objects.filter(pk=due.pk).update(machine_name='Renamed Due Machine')
+        # The due tables hold CSRF tokens, so they render on every request
+        self.assertContains(self.client.get(reverse('maintenance_dashboard')), 'Renamed Due Machine')
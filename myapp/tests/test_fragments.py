@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp.models import Equipment
+from .factories import EquipmentFactory
+from .utils import SharedDataTestCase
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+AJAX_HTML = {**AJAX, 'HTTP_ACCEPT': 'text/html'}
+
+
+class QuickCompleteTest(SharedDataTestCase):
+    """Test completing a task from the maintenance dashboard without a reload"""
+
+    def setUp(self):
+        self.login_as('maintenance')
+
+    def complete(self, equipment, task_type='maintenance', **extra):
+        url = reverse('quick_task_complete', args=[equipment.machine_id])
+        return self.client.post(url, {'task_type': task_type}, **extra)
+
+    def test_row_leaving_due_table_is_204(self):
+        overdue = self.equipment[-1]
+        response = self.complete(overdue, **AJAX_HTML)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Equipment.objects.get(pk=overdue.pk).last_maintenance_date, timezone.now().date())
+
+    def test_row_still_due_is_rerendered(self):
+        weekly = EquipmentFactory(overdue=True, maintenance_interval_days=7)
+        response = self.complete(weekly, **AJAX_HTML)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'myapp/fragments/due_row.html')
+        self.assertContains(response, f'data-machine-id="{weekly.machine_id}"')
+        next_due = timezone.now().date() + timedelta(days=7)
+        self.assertContains(response, next_due.strftime('%Y-%m-%d'))
+
+    def test_retried_ajax_completion_is_replayed(self):
+        weekly = EquipmentFactory(overdue=True, maintenance_interval_days=7)
+        for equipment, status in ((weekly, 200), (self.equipment[-1], 204)):
+            with self.subTest(status=status):
+                version = Equipment.objects.get(pk=equipment.pk).version
+                key = {'HTTP_IDEMPOTENCY_KEY': f'retry-{status}'}
+                first = self.complete(equipment, **AJAX_HTML, **key)
+                retry = self.complete(equipment, **AJAX_HTML, **key)
+
+                self.assertEqual((first.status_code, retry.status_code), (status, status))
+                self.assertEqual(retry['Idempotent-Replayed'], 'true')
+                self.assertEqual(retry.content, first.content)
+                # Completed once
+                self.assertEqual(Equipment.objects.get(pk=equipment.pk).version, version + 1)
+
+    def test_ajax_without_html_gets_json(self):
+        response = self.complete(self.equipment[-1], task_type='calibration', **AJAX)
+        self.assertTrue(response.json()['success'])
+
+    def test_form_post_redirects_back(self):
+        referer = reverse('maintenance_dashboard')
+        response = self.complete(self.equipment[-1], HTTP_REFERER=referer)
+        self.assertRedirects(response, referer, fetch_redirect_response=False)
+
+    def test_dashboard_rows_post_to_quick_complete(self):
+        response = self.client.get(reverse('maintenance_dashboard'))
+        due = self.equipment[self.equipment_per_status]
+        self.assertContains(response, reverse('quick_task_complete', args=[due.machine_id]))
+        self.assertContains(response, 'id="maintenance-counts"', count=1)
+
+
+class FragmentViewTest(SharedDataTestCase):
+    """Test the row and counter fragments the dashboard refetches"""
+
+    def setUp(self):
+        self.login_as('maintenance')
+
+    def test_counts_match_dashboard(self):
+        for query in ({}, {'search': self.equipment[0].machine_id}):
+            with self.subTest(query=query):
+                dashboard = self.client.get(reverse('maintenance_dashboard'), query).context
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse('maintenance_counts_fragment'), query)
+                for name in ('total_equipment', 'overdue_maintenance_count', 'overdue_calibration_count',
+                             'due_soon_maintenance_count', 'due_soon_calibration_count'):
+                    self.assertEqual(response.context[name], dashboard[name], name)
+
+    def test_row_fragment(self):
+        due = self.equipment[self.equipment_per_status]
+        url = reverse('equipment_row_fragment', args=[due.machine_id])
+        response = self.client.get(url, {'task_type': 'calibration'})
+        self.assertContains(response, 'data-task-type="calibration"')
+        self.assertEqual(self.client.get(url, {'task_type': 'cleaning'}).status_code, 400)
+
+        up_to_date = self.equipment[0]
+        url = reverse('equipment_row_fragment', args=[up_to_date.machine_id])
+        self.assertEqual(self.client.get(url, {'task_type': 'maintenance'}).status_code, 204)
+
+    def test_other_roles_forbidden(self):
+        self.login_as('quality')
+        response = self.client.get(reverse('maintenance_counts_fragment'))
+        self.assertNotEqual(response.status_code, 200)
+
+
+class MarkTaskCompleteRouteTest(SharedDataTestCase):
+    """Test that the full completion form resolves by machine id"""
+
+    def test_form_and_redirect(self):
+        self.login_as('maintenance')
+        equipment = self.equipment[-1]
+        url = reverse('mark_task_complete', args=[equipment.machine_id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.post(url, {'task_type': 'maintenance'})
+        self.assertRedirects(
+            response, reverse('equipment_detail', args=[equipment.machine_id]), fetch_redirect_response=False
+        )
@@ -0,0 +1,136 @@
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth.models import User
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import redirect
+from datetime import timedelta
+from django.utils import timezone
+from myapp.models import IdempotencyKey
+from myapp.utils.idempotency import idempotent, prune_expired_keys
+
+
+class IdempotencyKeyTest(TestCase):
+    """Test replaying retried POSTs that carry an idempotency key"""
+
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.factory = RequestFactory()
+        # bulk_create skips the profile signals - only a user row is needed here
+        User.objects.bulk_create([User(username='technician')])
+        self.user = User.objects.get(username='technician')
+        self.calls = 0
+
+        @idempotent
+        def complete_view(request):
+            self.calls += 1
+            return redirect('/maintenance-dashboard/')
+
+        @idempotent
+        def api_view(request):
+            self.calls += 1
+            return JsonResponse({'success': True, 'call': self.calls})
+
+        @idempotent
+        def form_view(request):
+            self.calls += 1
+            return HttpResponse('<form></form>', content_type='text/html')
+
+        self.complete_view = complete_view
+        self.api_view = api_view
+        self.form_view = form_view
+
+    def post(self, view, key=None, header=None, path='/complete/'):
+        data = {'idempotency_key': key} if key else {}
+        extra = {'HTTP_IDEMPOTENCY_KEY': header} if header else {}
+        request = self.factory.post(path, data, **extra)
+        request.user = self.user
+        return view(request)
+
+    def test_retry_replays_redirect(self):
+        """Test that a resubmitted form returns the original redirect without re-running"""
+        first = self.post(self.complete_view, key='abc123')
+        second = self.post(self.complete_view, key='abc123')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.status_code, first.status_code)
+        self.assertEqual(second['Location'], '/maintenance-dashboard/')
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+
+    def test_header_key_replays_json(self):
+        """Test that the Idempotency-Key header replays the stored JSON body"""
+        first = self.post(self.api_view, header='key-1')
+        second = self.post(self.api_view, header='key-1')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.content, first.content)
+
+    def test_requests_without_key_always_run(self):
+        """Test that requests without a key are not deduplicated"""
+        self.post(self.api_view)
+        self.post(self.api_view)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 0)
+
+    def test_rerendered_form_is_not_stored(self):
+        """Test that an HTML form re-render leaves the key free for a retry"""
+        self.post(self.form_view, key='form-key')
+        self.post(self.form_view, key='form-key')
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(IdempotencyKey.objects.filter(key='form-key').exists())
+
+    def test_header_key_replays_html_fragment(self):
+        """Test that an HTML fragment requested with the Idempotency-Key header is stored"""
+        first = self.post(self.form_view, header='fragment-key')
+        second = self.post(self.form_view, header='fragment-key')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+
+    def test_empty_response_is_stored(self):
+        """Test that a 204 is replayed rather than running the write again"""
+        @idempotent
+        def remove_view(request):
+            self.calls += 1
+            return HttpResponse(status=204)
+
+        self.post(remove_view, key='gone')
+        second = self.post(remove_view, key='gone')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.status_code, 204)
+
+    def test_in_flight_key_returns_conflict(self):
+        """Test that a retry arriving while the original is still running is refused"""
+        IdempotencyKey.objects.create(user=self.user, path='/complete/', key='busy')
+        response = self.post(self.api_view, key='busy')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.calls, 0)
+
+    @override_settings(IDEMPOTENCY_CLAIM_LEASE=60)
+    def test_abandoned_claim_is_taken_over(self):
+        """Test that a claim left by a crashed request stops blocking retries after the lease"""
+        IdempotencyKey.objects.create(user=self.user, path='/complete/', key='crashed')
+        IdempotencyKey.objects.filter(key='crashed').update(created_at=timezone.now() - timedelta(minutes=5))
+
+        response = self.post(self.api_view, key='crashed')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 1)
+        self.assertIsNotNone(IdempotencyKey.objects.get(key='crashed').response_status)
+
+    def test_key_is_scoped_to_endpoint(self):
+        """Test that reusing a key against another endpoint runs that view"""
+        self.post(self.complete_view, key='shared')
+        response = self.post(self.api_view, key='shared', path='/api/equipment/')
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(IdempotencyKey.objects.filter(key='shared').count(), 2)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=60)
+    def test_expired_keys_are_pruned(self):
+        """Test TTL-based pruning of stored keys"""
+        self.post(self.complete_view, key='old')
+        IdempotencyKey.objects.filter(key='old').update(created_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(prune_expired_keys(), 1)
+        self.post(self.complete_view, key='old')
+        self.assertEqual(self.calls, 2)
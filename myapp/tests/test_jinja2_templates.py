@@ -0,0 +1,82 @@
+import os
+import re
+import tempfile
+from unittest import skipIf
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+from django.template.loader import get_template
+from django.test.utils import override_settings
+from django.urls import reverse
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+from .utils import SharedDataTestCase
+
+DJANGO_TEMPLATES = [engine for engine in settings.TEMPLATES if engine is not settings.JINJA2_TEMPLATES]
+JINJA2_FIRST = [settings.JINJA2_TEMPLATES, *DJANGO_TEMPLATES]
+# Every render masks the CSRF token differently
+CSRF_TOKEN = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*')
+
+
+@skipIf(jinja2 is None, 'jinja2 is not installed')
+class Jinja2ParityTest(SharedDataTestCase):
+    """Test that TEMPLATE_ENGINE=jinja2 serves the same pages as the Django templates"""
+
+    def get(self, templates, url, query):
+        with override_settings(TEMPLATES=templates):
+            response = self.client.get(url, query)
+        self.assertEqual(response.status_code, 200)
+        return CSRF_TOKEN.sub(r'\1', response.content.decode())
+
+    def assertSamePage(self, url, query=None):
+        self.assertHTMLEqual(self.get(JINJA2_FIRST, url, query), self.get(DJANGO_TEMPLATES, url, query))
+
+    def test_only_hot_templates_use_jinja2(self):
+        with override_settings(TEMPLATES=JINJA2_FIRST):
+            self.assertEqual(get_template('myapp/maintenance_dashboard.html').backend.name, 'jinja2')
+            self.assertEqual(get_template('myapp/fragments/due_row.html').backend.name, 'jinja2')
+            self.assertEqual(get_template('myapp/quality_dashboard.html').backend.name, 'django')
+
+    def test_dashboards(self):
+        queries = [
+            {},
+            {'status': 'overdue_maintenance'},
+            {'search': self.equipment[0].machine_name},
+            {'search': '<b>"Pump\'s"</b>'},
+        ]
+        for role, url in (('administrator', 'admin_dashboard'), ('maintenance', 'maintenance_dashboard')):
+            self.login_as(role)
+            for query in queries:
+                with self.subTest(url, query=query):
+                    self.assertSamePage(reverse(url), query)
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=60)
+    def test_cached_sections(self):
+        cache.clear()
+        self.login_as('administrator')
+        url, query = reverse('admin_dashboard'), {'status': 'overdue_maintenance'}
+        self.get(JINJA2_FIRST, url, query)
+        # Served from the section cache; the Django engine caches its own copies
+        self.assertHTMLEqual(self.get(JINJA2_FIRST, url, query), self.get(DJANGO_TEMPLATES, url, query))
+
+    def test_fragments(self):
+        self.login_as('maintenance')
+        due = self.equipment[self.equipment_per_status]
+        self.assertSamePage(reverse('equipment_row_fragment', args=[due.machine_id]), {'task_type': 'calibration'})
+        self.assertSamePage(reverse('maintenance_counts_fragment'))
+
+
+@skipIf(jinja2 is None, 'jinja2 is not installed')
+class Jinja2BytecodeCacheTest(SharedDataTestCase):
+    """Test that compiled templates are written to JINJA2_BYTECODE_CACHE_DIR"""
+
+    def test_bytecode_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(TEMPLATES=JINJA2_FIRST, JINJA2_BYTECODE_CACHE_DIR=directory):
+                engines['jinja2'].get_template('myapp/fragments/maintenance_counts.html')
+            self.assertEqual(len(os.listdir(directory)), 1)
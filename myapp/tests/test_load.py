@@ -0,0 +1,78 @@
+import asyncio
+from django.core.servers.basehttp import WSGIServer
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+from myapp.models import Equipment
+from myapp.benchmarks import create_load_accounts, seed_equipment
+from myapp.benchmarks.load import LoadStats, assign_roles, percentile, run_load
+
+
+class LoadStatsTest(SimpleTestCase):
+    """Test the load report arithmetic"""
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_error_rate_per_route(self):
+        stats = LoadStats()
+        stats.record('api_stats', 0.1)
+        stats.record('api_stats', 0.2, error='500')
+        summary = stats.summary()['routes']['api_stats']
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(summary['error_rate'], 0.5)
+        self.assertEqual(summary['errors'], {'500': 1})
+
+    def test_assign_roles_follows_mix(self):
+        roles = assign_roles(10, {'maintenance': 0.6, 'quality': 0.2, 'administrator': 0.2})
+        self.assertEqual(len(roles), 10)
+        self.assertEqual(roles.count('maintenance'), 6)
+
+
+class SerialLiveServerThread(LiveServerThread):
+    # The in-memory test database is one SQLite connection shared by every server
+    # thread - concurrent requests on it corrupt each other's savepoints
+    def _create_server(self, connections_override=None):
+        return WSGIServer((self.host, self.port), QuietWSGIRequestHandler, allow_reuse_address=False)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class RunLoadTest(LiveServerTestCase):
+    """Drive a short run against the live test server"""
+
+    server_thread_class = SerialLiveServerThread
+
+    def test_every_role_completes_its_mix(self):
+        seed_equipment(20)
+        accounts = create_load_accounts(1, 'load-test-password')
+        machine_ids = list(Equipment.objects.values_list('machine_id', flat=True))
+
+        summary = asyncio.run(run_load(
+            self.live_server_url, accounts, machine_ids, concurrency=3, duration=1.5, seed=1,
+            role_mix={'maintenance': 1, 'quality': 1, 'administrator': 1},
+        ))
+
+        routes = summary['routes']
+        self.assertEqual(routes['login']['requests'], 3)
+        self.assertEqual(routes['login']['error_rate'], 0)
+        for route, row in routes.items():
+            self.assertEqual(row['errors'], {}, route)
+
+    def test_poll_mix_revalidates(self):
+        seed_equipment(20)
+        accounts = create_load_accounts(1, 'load-test-password')
+        machine_ids = list(Equipment.objects.values_list('machine_id', flat=True))
+
+        summary = asyncio.run(run_load(
+            self.live_server_url, accounts, machine_ids, concurrency=2, duration=1.0, seed=1,
+            role_mix={'quality': 1}, mix='poll',
+        ))
+
+        routes = summary['routes']
+        self.assertEqual(set(routes) - {'login_form', 'login'}, {'api_stats', 'api_status', 'api_list'})
+        for route, row in routes.items():
+            self.assertEqual(row['errors'], {}, route)
@@ -0,0 +1,104 @@
+import io
+import json
+import logging
+from contextlib import redirect_stdout
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth.models import User
+from myapp.models import UserProfile
+from myapp.log import AsyncQueueHandler, DebugSampleFilter, JsonFormatter
+
+
+def make_record(level=logging.INFO, msg='hello %s', args=('world',), lineno=1, **extra):
+    record = logging.LogRecord('myapp.test', level, __file__, lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class JsonFormatterTest(SimpleTestCase):
+    """Test the JSON line format"""
+
+    def test_formats_message_and_extra_fields(self):
+        data = json.loads(JsonFormatter().format(make_record(equipment_id=7)))
+
+        self.assertEqual(data['message'], 'hello world')
+        self.assertEqual(data['level'], 'INFO')
+        self.assertEqual(data['logger'], 'myapp.test')
+        self.assertEqual(data['equipment_id'], 7)
+        self.assertNotIn('args', data)
+
+    def test_includes_exception(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = logging.LogRecord('myapp.test', logging.ERROR, __file__, 1, 'failed', (), __import__('sys').exc_info())
+        data = json.loads(JsonFormatter().format(record))
+        self.assertIn('ValueError: boom', data['exception'])
+
+
+class DebugSampleFilterTest(SimpleTestCase):
+    """Test debug sampling"""
+
+    def test_samples_debug_per_call_site(self):
+        sample = DebugSampleFilter(every=10)
+        kept = [sample.filter(make_record(logging.DEBUG, lineno=1)) for _ in range(100)]
+        self.assertEqual(sum(kept), 10)
+        # A different call site has its own counter
+        self.assertTrue(sample.filter(make_record(logging.DEBUG, lineno=2)))
+
+    def test_info_and_above_always_pass(self):
+        sample = DebugSampleFilter(every=10)
+        self.assertTrue(all(sample.filter(make_record(logging.INFO)) for _ in range(20)))
+
+
+class AsyncQueueHandlerTest(SimpleTestCase):
+    """Test that records are written by the listener thread"""
+
+    def test_writes_json_lines_in_background(self):
+        stream = io.StringIO()
+        handler = AsyncQueueHandler(stream=stream)
+        logger = logging.getLogger('myapp.tests.async')
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            logger.warning('%s quick-completed by %s', 'Maintenance', 'tech')
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+            handler.stop()
+
+        [line] = stream.getvalue().splitlines()
+        data = json.loads(line)
+        self.assertEqual(data['message'], 'Maintenance quick-completed by tech')
+        self.assertEqual(data['level'], 'WARNING')
+
+    def test_message_is_formatted_by_the_listener(self):
+        handler = AsyncQueueHandler(stream=io.StringIO())
+        handler.stop()
+        record = make_record()
+        handler.handle(record)
+        queued = handler.queue.get_nowait()
+        self.assertEqual((queued.msg, queued.args), ('hello %s', ('world',)))
+
+    def test_drops_records_when_queue_is_full(self):
+        handler = AsyncQueueHandler(stream=io.StringIO())
+        handler.stop()
+        for _ in range(handler.queue.maxsize + 5):
+            handler.handle(make_record())
+        self.assertEqual(handler.dropped, 5)
+
+
+class DashboardLoggingTest(TestCase):
+    """Test that dashboards no longer print debug output"""
+
+    def test_search_does_not_print(self):
+        User.objects.bulk_create([User(username='admin')])
+        admin = User.objects.get(username='admin')
+        UserProfile.objects.create(user=admin, role='administrator')
+        self.client.force_login(admin)
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), self.assertLogs('myapp.views', level='DEBUG') as logs:
+            self.client.get('/admin-dashboard/', {'search': 'pump'})
+
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertIn("Admin dashboard search: 'pump'", logs.output[0])
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from django.test import TestCase, SimpleTestCase, override_settings
+from myapp import metrics
+
+
+@override_settings(
+    METRICS_DIR='', METRICS_TOKEN='',
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class MetricsMiddlewareTest(TestCase):
+    """Test per-view metrics collection and the /metrics endpoint"""
+
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_request_is_recorded_per_view(self):
+        """Test that latency, status and response size are recorded for the view"""
+        self.client.get('/')
+        body = self.client.get('/metrics').content.decode()
+
+        self.assertIn('myapp_http_request_duration_seconds_count{view="home",method="GET"} 1', body)
+        self.assertIn('myapp_http_requests_total{view="home",method="GET",status="200"} 1.0', body)
+        self.assertIn('myapp_http_response_size_bytes_bucket{view="home",method="GET",le="+Inf"} 1', body)
+        self.assertIn('myapp_template_render_seconds_total{view="home",method="GET"}', body)
+
+    def test_sql_queries_are_counted(self):
+        """Test that queries run inside a view are attributed to it"""
+        self.client.post('/login/', {'username': 'nobody', 'password': 'wrong'})  # looks up the user
+        counters, _ = metrics.collect()
+        labels = (('view', 'login'), ('method', 'POST'))
+        self.assertGreaterEqual(counters[('myapp_db_queries_total', labels)], 1)
+        self.assertGreater(counters[('myapp_db_query_seconds_total', labels)], 0)
+
+    def test_metrics_scrape_is_not_recorded(self):
+        self.client.get('/metrics')
+        counters, histograms = metrics.collect()
+        self.assertEqual(counters, {})
+        self.assertEqual(histograms, {})
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class MultiprocessAggregationTest(SimpleTestCase):
+    """Test summing worker snapshots from a shared directory"""
+
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_worker_snapshots_are_summed(self):
+        labels = (('view', 'admin_dashboard'), ('method', 'GET'))
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            # Another worker's snapshot
+            other = metrics.Registry()
+            other.inc('myapp_db_queries_total', labels, 5)
+            other.observe('myapp_http_request_duration_seconds', labels, 0.2, metrics.LATENCY_BUCKETS)
+            with open(f'{directory}/{os.getppid()}.json', 'w') as handle:
+                json.dump(other.snapshot(), handle)
+
+            metrics.registry.inc('myapp_db_queries_total', labels, 3)
+            metrics.registry.observe('myapp_http_request_duration_seconds', labels, 0.02, metrics.LATENCY_BUCKETS)
+            counters, histograms = metrics.collect()
+
+        self.assertEqual(counters[('myapp_db_queries_total', labels)], 8)
+        counts, total, count = histograms[('myapp_http_request_duration_seconds', labels)]
+        self.assertEqual(count, 2)
+        self.assertAlmostEqual(total, 0.22)
+
+        body = metrics.render_prometheus(counters, histograms)
+        self.assertIn('myapp_http_request_duration_seconds_bucket{view="admin_dashboard",method="GET",le="0.025"} 1', body)
+        self.assertIn('myapp_http_request_duration_seconds_bucket{view="admin_dashboard",method="GET",le="0.25"} 2', body)
+
+    def write_snapshot(self, directory, pid, queries):
+        other = metrics.Registry()
+        other.inc('myapp_db_queries_total', (), queries)
+        with open(f'{directory}/{pid}.json', 'w') as handle:
+            json.dump(other.snapshot(), handle)
+
+    def test_dead_workers_are_skipped(self):
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            self.write_snapshot(directory, os.getppid(), 2)
+            self.write_snapshot(directory, exited.pid, 40)
+            counters, _ = metrics.collect()
+        self.assertEqual(counters[('myapp_db_queries_total', ())], 2)
+
+    def test_exited_worker_snapshot_is_removed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.write_snapshot(directory, 4242, 1)
+            metrics.mark_process_dead(4242, directory)
+            metrics.mark_process_dead(4242, directory)  # already gone
+            self.assertEqual(os.listdir(directory), [])
@@ -1,10 +1,10 @@
-
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from datetime import date, timedelta
 from django.contrib.auth.models import User
-from myapp.models import Equipment, UserProfile  # Adjust import path as needed
+from myapp.models import Equipment, UserProfile
+from .factories import EquipmentFactory, UserFactory
 
 
 class EquipmentModelTest(TestCase):
@@ -13,90 +13,90 @@ class EquipmentModelTest(TestCase):
     def setUp(self):
         """Set up test data before each test method"""
         self.equipment_data = {
-            'Machine_ID': 'EQ001',
-            'Machine_Name': 'CNC Machine Alpha',
-            'Machine_Type': 'CNC',
-            'Machine_Location': 'Factory Floor A',
-            'Last_Calibration_Date': date.today() - timedelta(days=30),
-            'Last_Maintenance_Date': date.today() - timedelta(days=15)
+            'machine_id': 'EQ001',
+            'machine_name': 'CNC Machine Alpha',
+            'machine_type': 'PRODUCTION',
+            'machine_location': 'Factory Floor A',
+            'last_calibration_date': date.today() - timedelta(days=30),
+            'last_maintenance_date': date.today() - timedelta(days=15)
         }
     
     def test_equipment_creation(self):
         """Test creating an equipment instance"""
         equipment = Equipment.objects.create(**self.equipment_data)
         
-        self.assertEqual(equipment.Machine_ID, 'EQ001')
-        self.assertEqual(equipment.Machine_Name, 'CNC Machine Alpha')
-        self.assertEqual(equipment.Machine_Type, 'CNC')
-        self.assertEqual(equipment.Machine_Location, 'Factory Floor A')
-        self.assertIsNotNone(equipment.Last_Calibration_Date)
-        self.assertIsNotNone(equipment.Last_Maintenance_Date)
+        self.assertEqual(equipment.machine_id, 'EQ001')
+        self.assertEqual(equipment.machine_name, 'CNC Machine Alpha')
+        self.assertEqual(equipment.machine_type, 'PRODUCTION')
+        self.assertEqual(equipment.machine_location, 'Factory Floor A')
+        self.assertIsNotNone(equipment.last_calibration_date)
+        self.assertIsNotNone(equipment.last_maintenance_date)
     
     def test_equipment_string_representation(self):
         """Test the string representation of equipment"""
         equipment = Equipment.objects.create(**self.equipment_data)
-        expected_str = f"{equipment.Machine_ID} - {equipment.Machine_Name}"
+        expected_str = f"{equipment.machine_id} - {equipment.machine_name}"
         self.assertEqual(str(equipment), expected_str)
     
     def test_machine_id_uniqueness(self):
-        """Test that Machine_ID must be unique"""
+        """Test that machine_id must be unique"""
         Equipment.objects.create(**self.equipment_data)
         
-        # Try to create another equipment with same Machine_ID
+        # Try to create another equipment with same machine_id
         with self.assertRaises(IntegrityError):
             Equipment.objects.create(**self.equipment_data)
     
     def test_machine_id_required(self):
-        """Test that Machine_ID is required"""
+        """Test that machine_id is required"""
         data = self.equipment_data.copy()
-        data.pop('Machine_ID')
+        data.pop('machine_id')
         
-        with self.assertRaises(IntegrityError):
-            Equipment.objects.create(**data)
+        with self.assertRaises(ValidationError):
+            Equipment(**data).full_clean()
     
     def test_machine_name_required(self):
-        """Test that Machine_Name is required"""
+        """Test that machine_name is required"""
         data = self.equipment_data.copy()
-        data.pop('Machine_Name')
+        data.pop('machine_name')
         
-        with self.assertRaises(IntegrityError):
-            Equipment.objects.create(**data)
+        with self.assertRaises(ValidationError):
+            Equipment(**data).full_clean()
     
     def test_date_fields_can_be_updated(self):
-        """Test that Last_Calibration_Date and Last_Maintenance_Date can be updated"""
+        """Test that last_calibration_date and last_maintenance_date can be updated"""
         equipment = Equipment.objects.create(**self.equipment_data)
         
         new_cal_date = date.today()
         new_maint_date = date.today()
         
-        equipment.Last_Calibration_Date = new_cal_date
-        equipment.Last_Maintenance_Date = new_maint_date
+        equipment.last_calibration_date = new_cal_date
+        equipment.last_maintenance_date = new_maint_date
         equipment.save()
         
         equipment.refresh_from_db()
-        self.assertEqual(equipment.Last_Calibration_Date, new_cal_date)
-        self.assertEqual(equipment.Last_Maintenance_Date, new_maint_date)
+        self.assertEqual(equipment.last_calibration_date, new_cal_date)
+        self.assertEqual(equipment.last_maintenance_date, new_maint_date)
     
     def test_equipment_search_by_name(self):
         """Test searching equipment by name"""
         Equipment.objects.create(**self.equipment_data)
         
-        found_equipment = Equipment.objects.filter(Machine_Name__icontains='CNC')
+        found_equipment = Equipment.objects.filter(machine_name__icontains='CNC')
         self.assertEqual(found_equipment.count(), 1)
-        self.assertEqual(found_equipment.first().Machine_ID, 'EQ001')
+        self.assertEqual(found_equipment.first().machine_id, 'EQ001')
     
     def test_equipment_search_by_type(self):
         """Test searching equipment by type"""
         Equipment.objects.create(**self.equipment_data)
         
-        found_equipment = Equipment.objects.filter(Machine_Type='CNC')
+        found_equipment = Equipment.objects.filter(machine_type='PRODUCTION')
         self.assertEqual(found_equipment.count(), 1)
     
     def test_equipment_search_by_location(self):
         """Test searching equipment by location"""
         Equipment.objects.create(**self.equipment_data)
         
-        found_equipment = Equipment.objects.filter(Machine_Location__icontains='Floor A')
+        found_equipment = Equipment.objects.filter(machine_location__icontains='Floor A')
         self.assertEqual(found_equipment.count(), 1)
     
     def test_multiple_equipment_creation(self):
@@ -105,15 +105,24 @@ class EquipmentModelTest(TestCase):
         
         equipment2_data = self.equipment_data.copy()
         equipment2_data.update({
-            'Machine_ID': 'EQ002',
-            'Machine_Name': 'Lathe Machine Beta',
-            'Machine_Type': 'Lathe'
+            'machine_id': 'EQ002',
+            'machine_name': 'Lathe Machine Beta',
+            'machine_type': 'TESTING'
         })
         
         equipment2 = Equipment.objects.create(**equipment2_data)
         
         self.assertEqual(Equipment.objects.count(), 2)
-        self.assertNotEqual(equipment1.Machine_ID, equipment2.Machine_ID)
+        self.assertNotEqual(equipment1.machine_id, equipment2.machine_id)
+    
+    def test_next_due_dates_follow_intervals(self):
+        """Test next due dates are the last dates plus the intervals"""
+        equipment = EquipmentFactory()
+        
+        self.assertEqual(equipment.next_calibration_date, equipment.last_calibration_date + timedelta(days=365))
+        self.assertEqual(equipment.next_maintenance_date, equipment.last_maintenance_date + timedelta(days=90))
+        self.assertFalse(equipment.is_maintenance_overdue)
+        self.assertTrue(EquipmentFactory(overdue=True).is_maintenance_overdue)
 
 
 class UserProfileModelTest(TestCase):
@@ -128,56 +137,51 @@ class UserProfileModelTest(TestCase):
         }
     
     def test_user_profile_creation(self):
-        """Test creating a user with profile"""
+        """Test that creating a user creates its profile"""
         user = User.objects.create_user(**self.user_data)
-        profile = UserProfile.objects.create(
-            user=user,
-            role='Quality',
-            employee_id='EMP001'
-        )
+        profile = UserProfile.objects.get(user=user)
+        profile.role = 'quality'
+        profile.employee_id = 'EMP001'
+        profile.save()
         
         self.assertEqual(profile.user.username, 'testuser')
-        self.assertEqual(profile.role, 'Quality')
+        self.assertEqual(profile.role, 'quality')
         self.assertEqual(profile.employee_id, 'EMP001')
     
     def test_user_role_choices(self):
         """Test that only valid roles can be assigned"""
         user = User.objects.create_user(**self.user_data)
+        profile = user.profile
         
-        valid_roles = ['Administrator', 'Maintenance', 'Quality']
+        valid_roles = [value for value, _ in UserProfile.ROLE_CHOICES]
         
         for role in valid_roles:
-            profile = UserProfile.objects.create(
-                user=user,
-                role=role,
-                employee_id=f'EMP{role[:3].upper()}'
-            )
+            profile.role = role
+            profile.full_clean()
             self.assertEqual(profile.role, role)
-            profile.delete()  # Clean up for next iteration
+        
+        profile.role = 'superuser'
+        with self.assertRaises(ValidationError):
+            profile.full_clean()
     
     def test_user_profile_string_representation(self):
         """Test string representation of user profile"""
-        user = User.objects.create_user(**self.user_data)
-        profile = UserProfile.objects.create(
-            user=user,
-            role='Administrator',
-            employee_id='EMP001'
-        )
+        user = UserFactory(username='testuser', role='administrator')
         
         expected_str = f"{user.username} - Administrator"
-        self.assertEqual(str(profile), expected_str)
+        self.assertEqual(str(user.profile), expected_str)
     
     def test_one_to_one_relationship(self):
         """Test that User and UserProfile have one-to-one relationship"""
-        user = User.objects.create_user(**self.user_data)
-        profile = UserProfile.objects.create(
-            user=user,
-            role='Maintenance',
-            employee_id='EMP002'
-        )
+        user = UserFactory(role='maintenance')
+        profile = UserProfile.objects.get(user=user)
         
         # Test accessing profile from user
-        self.assertEqual(user.userprofile, profile)
+        self.assertEqual(user.profile, profile)
         
         # Test accessing user from profile
-        self.assertEqual(profile.user, user)
\ No newline at end of file
+        self.assertEqual(profile.user, user)
+        
+        # A second profile for the same user is rejected
+        with self.assertRaises(IntegrityError):
+            UserProfile.objects.create(user=user, role='quality')
@@ -0,0 +1,70 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from myapp.models import UserProfile
+from myapp import profiler
+
+
+@override_settings(
+    PROFILER_SAMPLE_EVERY=0, PROFILER_MAX_FILES=3,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class SamplingProfilerTest(TestCase):
+    """Test the on-demand request profiler and its admin page"""
+
+    def setUp(self):
+        """Set up test data before each test method"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.override = override_settings(PROFILER_DIR=self.tmp.name)
+        self.override.enable()
+        # bulk_create skips the profile signals
+        User.objects.bulk_create([User(username='admin'), User(username='quality')])
+        self.admin = User.objects.get(username='admin')
+        self.quality = User.objects.get(username='quality')
+        UserProfile.objects.create(user=self.admin, role='administrator')
+        UserProfile.objects.create(user=self.quality, role='quality')
+
+    def tearDown(self):
+        self.override.disable()
+        self.tmp.cleanup()
+
+    def test_admin_flag_records_profile(self):
+        self.client.force_login(self.admin)
+        response = self.client.get('/equipment/?_profile=1')
+        self.assertEqual(response['X-Profiled'], 'true')
+        self.assertEqual([p['view'] for p in profiler.list_profiles()], ['equipment_list'])
+
+    def test_flag_ignored_for_other_roles(self):
+        self.client.force_login(self.quality)
+        response = self.client.get('/equipment/?_profile=1', HTTP_X_PROFILE='1')
+        self.assertFalse(response.has_header('X-Profiled'))
+        self.assertEqual(profiler.list_profiles(), [])
+
+    def test_signed_token_header(self):
+        self.client.get('/', HTTP_X_PROFILE_TOKEN=profiler.make_profile_token())
+        self.assertEqual(len(profiler.list_profiles()), 1)
+
+        self.client.get('/', HTTP_X_PROFILE_TOKEN='forged')
+        self.assertEqual(len(profiler.list_profiles()), 1)
+
+    def test_one_in_n_sampling(self):
+        with override_settings(PROFILER_SAMPLE_EVERY=1):
+            self.client.get('/')
+        self.assertEqual(len(profiler.list_profiles()), 1)
+
+    def test_ring_buffer_is_bounded(self):
+        for _ in range(5):
+            self.client.get('/', HTTP_X_PROFILE_TOKEN=profiler.make_profile_token())
+        self.assertEqual(len(profiler.list_profiles()), 3)
+
+    def test_admin_page_shows_hot_functions(self):
+        self.client.force_login(self.admin)
+        self.client.get('/equipment/?_profile=1')
+        response = self.client.get('/administrator/profiles/?sort=cumtime')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'equipment_list')
+        self.assertTrue(response.context['hot_functions'])
+
+    def test_admin_page_requires_administrator(self):
+        self.client.force_login(self.quality)
+        self.assertEqual(self.client.get('/administrator/profiles/').status_code, 403)
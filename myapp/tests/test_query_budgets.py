@@ -0,0 +1,107 @@
+import json
+from datetime import date, timedelta
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from myapp.models import Equipment, UserProfile
+from myapp.views import MAX_BATCH_IDS
+from myapp.query_inspector import (
+    QueryBudgetExceeded, QueryBudgetMiddleware, QueryBudgetTestMixin, QueryInspector,
+    fingerprint, query_budget,
+)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ViewQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """Regression guard: dashboards and APIs stay within their declared query budgets"""
+
+    def setUp(self):
+        """Set up test data before each test method"""
+        Equipment.objects.bulk_create([
+            Equipment(
+                machine_id=f'EQ{i:03d}',
+                machine_name=f'Machine {i}',
+                machine_location='Factory Floor A',
+                last_maintenance_date=date.today() - timedelta(days=i * 7),
+                last_calibration_date=date.today() - timedelta(days=i * 30),
+            )
+            for i in range(30)
+        ])
+        # bulk_create skips the profile signals
+        User.objects.bulk_create([User(username='admin'), User(username='quality')])
+        self.admin = User.objects.get(username='admin')
+        self.quality = User.objects.get(username='quality')
+        UserProfile.objects.create(user=self.admin, role='administrator')
+        UserProfile.objects.create(user=self.quality, role='quality')
+
+    def test_admin_dashboard_budget(self):
+        self.client.force_login(self.admin)
+        self.assertWithinQueryBudget('/admin-dashboard/')
+        self.assertWithinQueryBudget('/admin-dashboard/?search=Machine&status=overdue_maintenance')
+
+    def test_equipment_api_list_budget(self):
+        self.client.force_login(self.admin)
+        self.assertWithinQueryBudget('/api/equipment/list/')
+
+    def test_equipment_api_stats_budget(self):
+        self.client.force_login(self.admin)
+        self.assertWithinQueryBudget('/api/equipment/stats/')
+
+    def test_equipment_api_status_batch_budget(self):
+        self.client.force_login(self.quality)
+        ids = [f'EQ{i:03d}' for i in range(MAX_BATCH_IDS)]
+        response = self.assertWithinQueryBudget(
+            '/api/equipment/status/', 'post', json.dumps({'ids': ids}), content_type='application/json'
+        )
+        self.assertEqual(len(response.json()['equipment']), 30)
+
+    def test_equipment_list_budget(self):
+        self.client.force_login(self.admin)
+        self.assertWithinQueryBudget('/equipment/')
+
+    def test_quality_dashboard_budget(self):
+        self.client.force_login(self.quality)
+        self.assertWithinQueryBudget('/quality-dashboard/')
+
+
+class QueryInspectorTest(TestCase):
+    """Test SQL fingerprinting and N+1 detection"""
+
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'x'"),
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'other'"),
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+        )
+
+    def test_repeated_lookups_are_flagged(self):
+        Equipment.objects.bulk_create([
+            Equipment(machine_id=f'EQ{i}', machine_name=f'M{i}', machine_location='A') for i in range(6)
+        ])
+        with QueryInspector() as inspector:
+            for i in range(6):
+                Equipment.objects.get(pk=f'EQ{i}')
+        self.assertEqual(inspector.count, 6)
+        self.assertEqual(list(inspector.repeated(threshold=5).values()), [6])
+
+    @override_settings(QUERY_INSPECTOR_ENABLED=True, QUERY_BUDGET_STRICT=True)
+    def test_middleware_enforces_budget(self):
+        @query_budget(1)
+        def view(request):
+            Equipment.objects.count()
+            Equipment.objects.exists()
+            return HttpResponse()
+
+        def handler(request):
+            # What the request handler does between middleware __call__ and the view
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = QueryBudgetMiddleware(handler)
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(request)
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from myapp.roles import role_required
+from .factories import UserFactory
+from .utils import SharedDataTestCase
+
+
+class RoleMiddlewareTest(SharedDataTestCase):
+    """Test request.role resolution and the role_required decorator"""
+
+    def test_role_loaded_with_user(self):
+        """The profile comes with the user query - no lookup of its own"""
+        self.login_as('quality')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        user_queries = [q['sql'] for q in queries if 'FROM "auth_user"' in q['sql']]
+        self.assertEqual(len(user_queries), 1)
+        self.assertIn('"myapp_userprofile"', user_queries[0])
+        self.assertFalse([q for q in queries if 'FROM "myapp_userprofile"' in q['sql']])
+        self.assertRedirects(response, reverse('quality_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(response.wsgi_request.role, 'quality')
+
+    def test_role_change_applies_to_next_request(self):
+        """Roles are read per request, so no stale role survives a profile save"""
+        self.login_as('quality')
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 403)
+
+        profile = self.users['quality'].profile
+        profile.role = 'administrator'
+        profile.save()
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+
+    def test_wrong_role_forbidden(self):
+        """Every role-restricted view answers a wrong role the same way"""
+        self.login_as('quality')
+        for url in (
+            reverse('maintenance_dashboard'),
+            reverse('maintenance_add_equipment'),
+            reverse('admin_add_equipment'),
+            reverse('admin_edit_equipment', args=[self.equipment[0].machine_id]),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_anonymous_redirected_to_login(self):
+        url = reverse('admin_dashboard')
+        response = self.client.get(url)
+        self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+
+
+class RoleRequiredWithoutMiddlewareTest(TestCase):
+    """role_required also works where RoleMiddleware didn't run"""
+
+    def test_falls_back_to_profile(self):
+        @role_required(['maintenance'])
+        def view(request):
+            return None
+
+        request = RequestFactory().get('/')
+        request.user = UserFactory(role='quality')
+        self.assertEqual(view(request).status_code, 403)
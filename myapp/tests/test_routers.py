@@ -0,0 +1,88 @@
+import time
+from unittest import mock
+from django.test import TestCase, RequestFactory
+from django.http import HttpResponse
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from myapp.models import Equipment, IdempotencyKey
+from myapp.routers import (
+    PrimaryReplicaRouter, ReplicaPinningMiddleware, PIN_SESSION_KEY, use_primary,
+)
+
+
+@mock.patch('myapp.routers.replica_configured', return_value=True)
+class PrimaryReplicaRouterTest(TestCase):
+    """Test read/write routing between the primary and the replica"""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def test_reads_go_to_replica(self, configured):
+        self.assertEqual(self.router.db_for_read(Equipment), 'replica')
+
+    def test_writes_go_to_primary(self, configured):
+        self.assertEqual(self.router.db_for_write(Equipment), 'default')
+
+    def test_sessions_and_idempotency_keys_read_primary(self, configured):
+        self.assertEqual(self.router.db_for_read(Session), 'default')
+        self.assertEqual(self.router.db_for_read(IdempotencyKey), 'default')
+
+    def test_use_primary_block(self, configured):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Equipment), 'default')
+        self.assertEqual(self.router.db_for_read(Equipment), 'replica')
+
+    def test_save_reads_version_from_primary(self, configured):
+        """Test that the version bump isn't computed from a lagging replica"""
+        with use_primary():
+            equipment = Equipment.objects.create(machine_id='EQ-R1', machine_name='Lathe', machine_location='Bay 1')
+        Equipment.objects.using('default').filter(pk=equipment.pk).update(version=5)
+        # Outside a pinned request; the test settings have no replica connection to read from
+        equipment.save()
+        self.assertEqual(equipment.version, 6)
+
+    def test_replica_never_migrated(self, configured):
+        self.assertTrue(self.router.allow_migrate('default', 'myapp'))
+        self.assertFalse(self.router.allow_migrate('replica', 'myapp'))
+
+    def run_middleware(self, request, view):
+        SessionMiddleware(lambda r: None).process_request(request)
+        return ReplicaPinningMiddleware(view)(request)
+
+    def test_post_pins_following_reads(self, configured):
+        """Test the read-your-writes window after a completion POST"""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Equipment))
+            return HttpResponse(status=302)
+
+        request = self.factory.post('/maintenance/complete-procedure/EQ001/')
+        self.run_middleware(request, view)
+        self.assertEqual(seen, ['default'])
+        self.assertGreater(request.session[PIN_SESSION_KEY], time.time())
+
+        # A dashboard read straight afterwards stays on the primary
+        follow_up = self.factory.get('/maintenance-dashboard/')
+        SessionMiddleware(lambda r: None).process_request(follow_up)
+        follow_up.session = request.session
+        ReplicaPinningMiddleware(view)(follow_up)
+        self.assertEqual(seen, ['default', 'default'])
+
+    def test_unpinned_get_reads_replica(self, configured):
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Equipment))
+            return HttpResponse()
+
+        request = self.factory.get('/api/equipment/list/')
+        self.run_middleware(request, view)
+        self.assertEqual(seen, ['replica'])
+        self.assertNotIn(PIN_SESSION_KEY, request.session)
+
+    def test_failed_post_does_not_pin(self, configured):
+        request = self.factory.post('/administrator/edit-equipment/EQ001/')
+        self.run_middleware(request, lambda r: HttpResponse(status=403))
+        self.assertNotIn(PIN_SESSION_KEY, request.session)
@@ -0,0 +1,43 @@
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.db import connection
+from myapp.utils import sqlite
+
+
+class SQLiteTuningTest(TestCase):
+    """Test the connection_created hook that tunes SQLite connections"""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        """Test that cache, temp store and busy timeout are set on new connections"""
+        connection.ensure_connection()
+        self.assertEqual(self.pragma('cache_size'), -64000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # 2 = MEMORY
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+
+
+class OptimizeScheduleTest(SimpleTestCase):
+    """Test that PRAGMA optimize is throttled per process"""
+
+    def setUp(self):
+        sqlite._last_optimize = 0.0
+
+    @override_settings(SQLITE_OPTIMIZE_INTERVAL=3600)
+    def test_optimize_runs_once_per_interval(self):
+        with mock.patch('myapp.utils.sqlite.time.monotonic', side_effect=[1000.0, 1001.0, 4700.0]):
+            self.assertTrue(sqlite._optimize_due())
+            self.assertFalse(sqlite._optimize_due())
+            self.assertTrue(sqlite._optimize_due())
+
+    @override_settings(SQLITE_OPTIMIZE_INTERVAL=None)
+    def test_optimize_can_be_disabled(self):
+        self.assertFalse(sqlite._optimize_due())
+
+    def test_other_vendors_are_ignored(self):
+        other = mock.Mock(vendor='postgresql')
+        sqlite.configure_sqlite(sender=None, connection=other)
+        other.cursor.assert_not_called()
@@ -0,0 +1,85 @@
+import gzip
+import json
+import os
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from myapp.staticfiles import WhiteNoiseMiddleware
+from .utils import SharedDataTestCase
+
+BUNDLES = ('myapp/css/base.css', 'myapp/css/dashboard.css', 'myapp/js/admin-dashboard.js')
+
+
+class TemplateAssetsTest(SharedDataTestCase):
+    """Test that pages link the shared bundles instead of inlining them"""
+
+    def test_dashboards_link_bundles(self):
+        for role, name in (('administrator', 'admin_dashboard'), ('maintenance', 'maintenance_dashboard'),
+                           ('quality', 'quality_dashboard')):
+            with self.subTest(name):
+                self.login_as(role)
+                response = self.client.get(reverse(name))
+                self.assertContains(response, 'href="/static/myapp/css/base.css"')
+                self.assertContains(response, 'href="/static/myapp/css/dashboard.css"')
+                self.assertNotContains(response, '<style')
+                self.assertNotContains(response, 'style="background')
+
+    def test_scripts_configured_by_data_attributes(self):
+        self.login_as('administrator')
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertContains(response, 'src="/static/myapp/js/admin-dashboard.js"')
+        self.assertContains(response, f'data-events-url="{reverse("equipment_events")}"')
+        self.assertContains(response, 'data-has-filters="false"')
+
+    def test_standalone_pages(self):
+        for name, bundle in (('login', 'login.css'), ('signup', 'signup.css'), ('home', 'home.css')):
+            with self.subTest(name):
+                response = self.client.get(reverse(name))
+                self.assertContains(response, f'href="/static/myapp/css/{bundle}"')
+                self.assertNotContains(response, '<style')
+
+
+class StaticPipelineTest(TestCase):
+    """Test the production pipeline: hashed names, precompressed files and immutable caching"""
+    # TestCase: closing a response sends request_finished, which checks the database connections
+
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        overrides = override_settings(
+            STATIC_ROOT=self.static_root.name,
+            STATICFILES_STORAGE='whitenoise.storage.CompressedManifestStaticFilesStorage',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_bundles_hashed_and_precompressed(self):
+        with open(os.path.join(self.static_root.name, 'staticfiles.json')) as f:
+            paths = json.load(f)['paths']
+        for bundle in BUNDLES:
+            with self.subTest(bundle):
+                hashed = paths[bundle]
+                self.assertRegex(hashed, r'\.[0-9a-f]{12}\.(css|js)$')
+                self.assertEqual(staticfiles_storage.url(bundle), f'/static/{hashed}')
+                self.assertTrue(os.path.exists(os.path.join(self.static_root.name, hashed + '.gz')))
+
+    def test_served_immutable_and_compressed(self):
+        middleware = WhiteNoiseMiddleware(lambda request: HttpResponse(status=404))
+        url = staticfiles_storage.url('myapp/css/dashboard.css')
+        response = middleware(RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'.q-critical-card', gzip.decompress(b''.join(response.streaming_content)))
+        response.close()
+
+        # The unhashed name stays revalidatable
+        response = middleware(RequestFactory().get('/static/myapp/css/dashboard.css'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        response.close()
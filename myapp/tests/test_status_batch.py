@@ -0,0 +1,84 @@
+import json
+
+from django.test import Client
+from django.urls import reverse
+
+from myapp.views import MAX_BATCH_IDS
+from .utils import SharedDataTestCase
+
+
+class StatusBatchApiTest(SharedDataTestCase):
+    """Test looking up many machines' statuses in one request"""
+
+    def setUp(self):
+        self.login_as('quality')
+        self.url = reverse('equipment_api_status_batch')
+        self.up_to_date = self.equipment[0]
+        self.overdue = self.equipment[-1]
+
+    def test_get_repeated_ids(self):
+        ids = [self.up_to_date.machine_id, self.overdue.machine_id, 'NO-SUCH-MACHINE']
+        # The user lookup and one in_bulk query
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'id': ids})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['missing'], ['NO-SUCH-MACHINE'])
+        self.assertEqual(body['equipment'][self.overdue.machine_id]['maintenance_status'], 'overdue')
+        self.assertEqual(body['equipment'][self.up_to_date.machine_id]['calibration_status'], 'compliant')
+        self.assertEqual(set(body['equipment'][self.overdue.machine_id]), set(body['fields']))
+
+    def test_sparse_fields(self):
+        response = self.client.get(self.url, {'id': self.overdue.machine_id, 'fields': 'machine_name,is_maintenance_overdue'})
+        self.assertEqual(response.json()['equipment'][self.overdue.machine_id], {
+            'machine_name': self.overdue.machine_name,
+            'is_maintenance_overdue': True,
+        })
+
+    def test_post_json(self):
+        ids = [equipment.machine_id for equipment in self.equipment]
+        response = self.client.post(
+            self.url, json.dumps({'ids': ids, 'fields': ['next_calibration_date']}), content_type='application/json'
+        )
+        equipment = response.json()['equipment']
+        self.assertEqual(len(equipment), len(ids))
+        self.assertEqual(
+            equipment[self.up_to_date.machine_id]['next_calibration_date'],
+            self.up_to_date.next_calibration_date.strftime('%Y-%m-%d'),
+        )
+
+    def test_post_form(self):
+        response = self.client.post(self.url, {'id': [self.overdue.machine_id], 'fields': 'calibration_status'})
+        self.assertEqual(response.json()['equipment'], {self.overdue.machine_id: {'calibration_status': 'overdue'}})
+
+    def test_post_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.users['quality'])
+        response = client.post(self.url, {'id': [self.overdue.machine_id]})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bad_requests(self):
+        cases = {
+            'no ids': {},
+            'unknown field': {'id': 'X', 'fields': 'password'},
+        }
+        for name, params in cases.items():
+            with self.subTest(name):
+                response = self.client.post(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['success'])
+
+        bodies = (
+            '[1, 2]',
+            '{"ids": ',
+            json.dumps({'ids': list(range(MAX_BATCH_IDS + 1))}),
+            '{"ids": ["A"], "fields": [5]}',
+            '{"ids": ["A"], "fields": {"machine_name": 1}}',
+            '{"ids": [["A"], {"id": "B"}]}',
+            '{"ids": [true]}',
+        )
+        for body in bodies:
+            with self.subTest(body=body[:20]):
+                response = self.client.post(self.url, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.put(self.url).status_code, 405)
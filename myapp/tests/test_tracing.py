@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.contrib.auth.models import User
+from myapp.models import UserProfile
+from myapp import tracing
+
+
+def read_spans(path):
+    spans = []
+    with open(path) as handle:
+        for line in handle:
+            for resource in json.loads(line)['resourceSpans']:
+                for scope in resource['scopeSpans']:
+                    spans.extend(scope['spans'])
+    return spans
+
+
+class TracingTestMixin:
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traces.jsonl')
+        self.override = override_settings(
+            TRACING_ENABLED=True, TRACING_SAMPLE_RATE=1.0, TRACING_EXPORT_PATH=self.path,
+            TRACING_FLUSH_INTERVAL=0.05,
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        )
+        self.override.enable()
+        tracing._exporter = None
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.override.disable()
+        self.tmp.cleanup()
+
+    def flush(self):
+        tracing._exporter.shutdown()
+        tracing._exporter = None
+        return read_spans(self.path)
+
+
+class SpanTest(TracingTestMixin, SimpleTestCase):
+    """Test span nesting, decorators and the OTLP export shape"""
+
+    def test_nested_spans_share_trace(self):
+        with tracing.span('request', kind=tracing.SPAN_KIND_SERVER) as root:
+            with tracing.span('child', rows=3):
+                pass
+        spans = {s['name']: s for s in self.flush()}
+
+        self.assertEqual(spans['child']['traceId'], root.trace_id)
+        self.assertEqual(spans['child']['parentSpanId'], root.span_id)
+        self.assertNotIn('parentSpanId', spans['request'])
+        self.assertEqual(spans['child']['attributes'], [{'key': 'rows', 'value': {'intValue': '3'}}])
+
+    def test_spans_outside_a_trace_are_not_recorded(self):
+        @tracing.traced()
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        self.assertIsNone(tracing._exporter)
+
+    def test_errors_set_status(self):
+        with self.assertRaises(ValueError):
+            with tracing.span('request', kind=tracing.SPAN_KIND_SERVER):
+                raise ValueError('boom')
+        [exported] = self.flush()
+        self.assertEqual(exported['status'], {'code': 2, 'message': 'ValueError: boom'})
+
+
+class RequestTracingTest(TracingTestMixin, TestCase):
+    """Test the middleware's root span, ORM spans and template spans"""
+
+    def test_dashboard_request_is_traced(self):
+        User.objects.bulk_create([User(username='admin')])
+        admin = User.objects.get(username='admin')
+        UserProfile.objects.create(user=admin, role='administrator')
+        self.client.force_login(admin)
+        cache.clear()  # the classification only runs when the dashboard sections aren't cached
+
+        self.client.get('/admin-dashboard/')
+        spans = self.flush()
+        names = [s['name'] for s in spans]
+
+        root = next(s for s in spans if s['name'] == 'HTTP GET admin_dashboard')
+        self.assertTrue(all(s['traceId'] == root['traceId'] for s in spans))
+        self.assertIn('admin_dashboard.classify_equipment', names)
+        self.assertIn('template.render', names)
+        self.assertIn('db.query', names)
+
+
+class AsyncRequestTracingTest(TracingTestMixin, TestCase):
+    """Test that ORM spans are recorded for async views served under ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username='quality')])
+        cls.quality = User.objects.get(username='quality')
+        UserProfile.objects.create(user=cls.quality, role='quality')
+
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.quality)
+
+    async def test_api_request_traces_queries(self):
+        await self.async_client.get('/api/equipment/stats/')
+        spans = self.flush()
+
+        root = next(s for s in spans if s['name'] == 'HTTP GET equipment_api_stats')
+        queries = [s for s in spans if s['name'] == 'db.query']
+        self.assertTrue(queries)
+        self.assertTrue(all(s['traceId'] == root['traceId'] for s in queries))
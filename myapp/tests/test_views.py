@@ -3,64 +3,38 @@ from django.urls import reverse
 from django.contrib.auth.models import User
 from datetime import date, timedelta
 from myapp.models import Equipment, UserProfile  # Adjust import path as needed
+from .factories import UserFactory
 
 
 class DashboardViewTest(TestCase):
     """Test cases for dashboard views based on user roles"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = Client()
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class"""
         # Create test equipment
-        self.equipment1 = Equipment.objects.create(
-            Machine_ID='EQ001',
-            Machine_Name='CNC Machine Alpha',
-            Machine_Type='CNC',
-            Machine_Location='Factory Floor A',
-            Last_Calibration_Date=date.today() - timedelta(days=350),  # Due soon
-            Last_Maintenance_Date=date.today() - timedelta(days=10)
+        cls.equipment1 = Equipment.objects.create(
+            machine_id='EQ001',
+            machine_name='CNC Machine Alpha',
+            machine_type='CNC',
+            machine_location='Factory Floor A',
+            last_calibration_date=date.today() - timedelta(days=355),  # Due soon
+            last_maintenance_date=date.today() - timedelta(days=10)
         )
         
-        self.equipment2 = Equipment.objects.create(
-            Machine_ID='EQ002',
-            Machine_Name='Lathe Machine Beta',
-            Machine_Type='Lathe',
-            Machine_Location='Factory Floor B',
-            Last_Calibration_Date=date.today() - timedelta(days=100),
-            Last_Maintenance_Date=date.today() - timedelta(days=180)  # Due soon
+        cls.equipment2 = Equipment.objects.create(
+            machine_id='EQ002',
+            machine_name='Lathe Machine Beta',
+            machine_type='Lathe',
+            machine_location='Factory Floor B',
+            last_calibration_date=date.today() - timedelta(days=100),
+            last_maintenance_date=date.today() - timedelta(days=180)  # Overdue
         )
         
         # Create users with different roles
-        self.admin_user = User.objects.create_user(
-            username='admin',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.admin_user,
-            role='Administrator',
-            employee_id='ADM001'
-        )
-        
-        self.quality_user = User.objects.create_user(
-            username='quality',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.quality_user,
-            role='Quality',
-            employee_id='QUA001'
-        )
-        
-        self.maintenance_user = User.objects.create_user(
-            username='maintenance',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.maintenance_user,
-            role='Maintenance',
-            employee_id='MAI001'
-        )
+        cls.admin_user = UserFactory(username='admin', role='administrator')
+        cls.quality_user = UserFactory(username='quality', role='quality')
+        cls.maintenance_user = UserFactory(username='maintenance', role='maintenance')
     
     def test_admin_dashboard_access(self):
         """Test that admin can access admin dashboard"""
@@ -78,7 +52,7 @@ class DashboardViewTest(TestCase):
         response = self.client.get(reverse('quality_dashboard'))  # Adjust URL name
         
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'Quality Dashboard')
+        self.assertContains(response, 'Quality Engineer Dashboard')
     
     def test_maintenance_dashboard_access(self):
         """Test that maintenance user can access maintenance dashboard"""
@@ -109,21 +83,21 @@ class DashboardViewTest(TestCase):
         
         # Should see equipment due for maintenance/calibration in next 2 weeks
         self.assertContains(response, 'EQ001')  # Due for calibration
-        self.assertContains(response, 'EQ002')  # Due for maintenance
+        self.assertContains(response, 'EQ002')  # Overdue for maintenance
     
     def test_equipment_search_functionality(self):
         """Test equipment search functionality"""
         self.client.login(username='admin', password='TestPassword123!')
         
-        # Test search by machine name
-        response = self.client.get(reverse('equipment_search'), {'query': 'CNC'})
+        # Test search by machine name (the overdue lists still show every machine)
+        response = self.client.get(reverse('admin_dashboard'), {'search': 'CNC'})
+        self.assertEqual(list(response.context['filtered_equipment']), [self.equipment1])
         self.assertContains(response, 'CNC Machine Alpha')
-        self.assertNotContains(response, 'Lathe Machine Beta')
         
         # Test search by machine ID
-        response = self.client.get(reverse('equipment_search'), {'query': 'EQ002'})
+        response = self.client.get(reverse('admin_dashboard'), {'search': 'EQ002'})
+        self.assertEqual(list(response.context['filtered_equipment']), [self.equipment2])
         self.assertContains(response, 'Lathe Machine Beta')
-        self.assertNotContains(response, 'CNC Machine Alpha')
     
     def test_equipment_details_view(self):
         """Test equipment details view"""
@@ -139,47 +113,41 @@ class DashboardViewTest(TestCase):
     
     def test_homepage_not_logged_in(self):
         """Test homepage shows login/signup buttons when not logged in"""
-        response = self.client.get(reverse('homepage'))
+        response = self.client.get(reverse('home'))
         
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Login')
         self.assertContains(response, 'Sign Up')
-        self.assertContains(response, 'About')
     
-    def test_homepage_logged_in_redirect(self):
-        """Test homepage redirects to dashboard when logged in"""
+    def test_homepage_logged_in_links_dashboard(self):
+        """Test homepage links to the dashboard instead of login/signup when logged in"""
         self.client.login(username='quality', password='TestPassword123!')
         
-        response = self.client.get(reverse('homepage'))
+        response = self.client.get(reverse('home'))
         
-        # Should redirect to appropriate dashboard
-        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse('dashboard'))
+        self.assertNotContains(response, 'Sign Up')
 
 
 class EquipmentManagementViewTest(TestCase):
     """Test cases for equipment management views"""
     
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class"""
+        cls.admin_user = UserFactory(username='admin', role='administrator')
+    
     def setUp(self):
-        """Set up test data"""
-        self.client = Client()
-        
-        self.admin_user = User.objects.create_user(
-            username='admin',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=self.admin_user,
-            role='Administrator',
-            employee_id='ADM001'
-        )
-        
         self.equipment_data = {
-            'Machine_ID': 'EQ003',
-            'Machine_Name': 'Test Machine',
-            'Machine_Type': 'Testing',
-            'Machine_Location': 'Test Floor',
-            'Last_Calibration_Date': date.today().strftime('%Y-%m-%d'),
-            'Last_Maintenance_Date': date.today().strftime('%Y-%m-%d')
+            'machine_id': 'EQ003',
+            'machine_name': 'Test Machine',
+            'machine_type': 'TESTING',
+            'machine_location': 'Test Floor',
+            'last_calibration_date': date.today().strftime('%Y-%m-%d'),
+            'last_maintenance_date': date.today().strftime('%Y-%m-%d'),
+            'calibration_interval_days': 365,
+            'maintenance_interval_days': 90,
         }
     
     def test_admin_can_add_equipment(self):
@@ -187,79 +155,74 @@ class EquipmentManagementViewTest(TestCase):
         self.client.login(username='admin', password='TestPassword123!')
         
         response = self.client.post(
-            reverse('add_equipment'),
+            reverse('admin_add_equipment'),
             self.equipment_data
         )
         
         # Check if equipment was created
-        self.assertTrue(Equipment.objects.filter(Machine_ID='EQ003').exists())
+        self.assertTrue(Equipment.objects.filter(machine_id='EQ003').exists())
     
     def test_admin_can_edit_equipment(self):
         """Test that admin can edit existing equipment"""
         equipment = Equipment.objects.create(
-            Machine_ID='EQ004',
-            Machine_Name='Original Name',
-            Machine_Type='Original Type',
-            Machine_Location='Original Location',
-            Last_Calibration_Date=date.today(),
-            Last_Maintenance_Date=date.today()
+            machine_id='EQ004',
+            machine_name='Original Name',
+            machine_type='PRODUCTION',
+            machine_location='Original Location',
+            last_calibration_date=date.today(),
+            last_maintenance_date=date.today()
         )
         
         self.client.login(username='admin', password='TestPassword123!')
         
         updated_data = {
-            'Machine_ID': 'EQ004',
-            'Machine_Name': 'Updated Name',
-            'Machine_Type': 'Updated Type',
-            'Machine_Location': 'Updated Location',
-            'Last_Calibration_Date': date.today().strftime('%Y-%m-%d'),
-            'Last_Maintenance_Date': date.today().strftime('%Y-%m-%d')
+            'machine_id': 'EQ004',
+            'machine_name': 'Updated Name',
+            'machine_type': 'TESTING',
+            'machine_location': 'Updated Location',
+            'last_calibration_date': date.today().strftime('%Y-%m-%d'),
+            'last_maintenance_date': date.today().strftime('%Y-%m-%d'),
+            'calibration_interval_days': 365,
+            'maintenance_interval_days': 90,
+            'version': equipment.version,
         }
         
         response = self.client.post(
-            reverse('edit_equipment', kwargs={'machine_id': 'EQ004'}),
+            reverse('admin_edit_equipment', kwargs={'machine_id': 'EQ004'}),
             updated_data
         )
         
         equipment.refresh_from_db()
-        self.assertEqual(equipment.Machine_Name, 'Updated Name')
+        self.assertEqual(equipment.machine_name, 'Updated Name')
     
     def test_admin_can_delete_equipment(self):
         """Test that admin can delete equipment"""
         equipment = Equipment.objects.create(
-            Machine_ID='EQ005',
-            Machine_Name='To Delete',
-            Machine_Type='Test',
-            Machine_Location='Test',
-            Last_Calibration_Date=date.today(),
-            Last_Maintenance_Date=date.today()
+            machine_id='EQ005',
+            machine_name='To Delete',
+            machine_type='Test',
+            machine_location='Test',
+            last_calibration_date=date.today(),
+            last_maintenance_date=date.today()
         )
         
         self.client.login(username='admin', password='TestPassword123!')
         
         response = self.client.post(
-            reverse('delete_equipment', kwargs={'machine_id': 'EQ005'})
+            reverse('admin_delete_equipment', kwargs={'machine_id': 'EQ005'})
         )
         
         # Equipment should be deleted
-        self.assertFalse(Equipment.objects.filter(Machine_ID='EQ005').exists())
+        self.assertFalse(Equipment.objects.filter(machine_id='EQ005').exists())
     
     def test_non_admin_cannot_add_equipment(self):
         """Test that non-admin users cannot add equipment"""
-        quality_user = User.objects.create_user(
-            username='quality',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=quality_user,
-            role='Quality',
-            employee_id='QUA001'
-        )
+        quality_user = UserFactory(username='quality', role='quality')
         
         self.client.login(username='quality', password='TestPassword123!')
         
         response = self.client.post(
-            reverse('add_equipment'),
+            reverse('admin_add_equipment'),
             self.equipment_data
         )
         
@@ -269,35 +232,27 @@ class EquipmentManagementViewTest(TestCase):
     def test_maintenance_user_can_update_dates(self):
         """Test that maintenance user can update calibration and maintenance dates"""
         equipment = Equipment.objects.create(
-            Machine_ID='EQ006',
-            Machine_Name='Test Machine',
-            Machine_Type='Test',
-            Machine_Location='Test',
-            Last_Calibration_Date=date.today() - timedelta(days=30),
-            Last_Maintenance_Date=date.today() - timedelta(days=15)
+            machine_id='EQ006',
+            machine_name='Test Machine',
+            machine_type='Test',
+            machine_location='Test',
+            last_calibration_date=date.today() - timedelta(days=30),
+            last_maintenance_date=date.today() - timedelta(days=15)
         )
         
-        maintenance_user = User.objects.create_user(
-            username='maintenance',
-            password='TestPassword123!'
-        )
-        UserProfile.objects.create(
-            user=maintenance_user,
-            role='Maintenance',
-            employee_id='MAI001'
-        )
+        maintenance_user = UserFactory(username='maintenance', role='maintenance')
         
         self.client.login(username='maintenance', password='TestPassword123!')
         
+        # One completed procedure per submission
         new_date = date.today().strftime('%Y-%m-%d')
-        response = self.client.post(
-            reverse('update_equipment_dates', kwargs={'machine_id': 'EQ006'}),
-            {
-                'Last_Calibration_Date': new_date,
-                'Last_Maintenance_Date': new_date
-            }
-        )
+        for procedure_type in ('calibration', 'maintenance'):
+            response = self.client.post(
+                reverse('maintenance_complete_procedure', kwargs={'machine_id': 'EQ006'}),
+                {'procedure_type': procedure_type, 'completion_date': new_date}
+            )
+            self.assertRedirects(response, reverse('maintenance_dashboard'), fetch_redirect_response=False)
         
         equipment.refresh_from_db()
-        self.assertEqual(equipment.Last_Calibration_Date, date.today())
-        self.assertEqual(equipment.Last_Maintenance_Date, date.today())
\ No newline at end of file
+        self.assertEqual(equipment.last_calibration_date, date.today())
+        self.assertEqual(equipment.last_maintenance_date, date.today())
\ No newline at end of file
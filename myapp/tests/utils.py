@@ -0,0 +1,81 @@
+# tests/utils.py - Test utilities
+
+import random
+import string
+
+from django.test import TestCase
+from myapp.models import Equipment
+from .factories import ROLES, EquipmentFactory, UserFactory
+
+
+class BaseTestCase(TestCase):
+    """Base test case with common setup methods"""
+
+    def create_user(self, username=None, role='quality', **kwargs):
+        """Helper method to create a user with profile"""
+        if username:
+            kwargs['username'] = username
+        return UserFactory(role=role, **kwargs)
+
+    def create_equipment(self, machine_id=None, **kwargs):
+        """Helper method to create equipment"""
+        if machine_id:
+            kwargs['machine_id'] = machine_id
+        return EquipmentFactory(**kwargs)
+
+    def generate_random_string(self, length=10):
+        """Generate a random string for testing"""
+        return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+class SharedDataTestCase(BaseTestCase):
+    """
+    One user per role plus a bulk-loaded equipment fleet, created once per
+    class in setUpTestData and rolled back after the class instead of
+    being rebuilt for every test.
+    """
+
+    # Equipment rows per status - up to date, due within two weeks, overdue
+    equipment_per_status = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.users = {role: UserFactory(username=f'{role}_user', role=role) for role in ROLES}
+        cls.equipment = (
+            EquipmentFactory.create_bulk(cls.equipment_per_status)
+            + EquipmentFactory.create_bulk(cls.equipment_per_status, due_soon=True)
+            + EquipmentFactory.create_bulk(cls.equipment_per_status, overdue=True)
+        )
+
+    def login_as(self, role):
+        self.client.force_login(self.users[role])
+        return self.users[role]
+
+
+class DatabaseTestMixin:
+    """Mixin for database-related test utilities"""
+
+    def assert_equipment_exists(self, machine_id):
+        """Assert that equipment with given ID exists"""
+        self.assertTrue(
+            Equipment.objects.filter(machine_id=machine_id).exists(),
+            f"Equipment with ID {machine_id} does not exist"
+        )
+
+    def assert_user_has_role(self, user, expected_role):
+        """Assert that user has expected role"""
+        self.assertEqual(
+            user.profile.role,
+            expected_role,
+            f"Expected user to have role {expected_role}, got {user.profile.role}"
+        )
+
+    def assert_equipment_count(self, expected_count):
+        """Assert the total number of equipment records"""
+        actual_count = Equipment.objects.count()
+        self.assertEqual(
+            actual_count,
+            expected_count,
+            f"Expected {expected_count} equipment records, got {actual_count}"
+        )
@@ -0,0 +1,281 @@
+"""
+Lightweight request tracing.
+
+Spans are opened with `with span('name'):` or the @traced() decorator, nest
+through a context variable, and are handed to a background thread that writes
+them in batches to TRACING_EXPORT_PATH as JSON lines. Each line is one
+OTLP/JSON ExportTraceServiceRequest, so the file can be replayed into any
+OpenTelemetry collector. Nothing is recorded unless TRACING_ENABLED is set.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .utils import sql_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 2.0  # seconds
+QUEUE_SIZE = 10000
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_current_span = ContextVar('current_span', default=None)
+
+
+def tracing_enabled():
+    return getattr(settings, 'TRACING_ENABLED', False)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, name, parent=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        self.trace_id = parent.trace_id if parent else '%032x' % random.getrandbits(128)
+        self.span_id = '%016x' % random.getrandbits(64)
+        self.parent_id = parent.span_id if parent else ''
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        data = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1},
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        return data
+
+
+class BatchExporter:
+    """Queues finished spans; a daemon thread writes them out in batches"""
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+        self._thread.start()
+
+    def export(self, span):
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            # Never block the request thread - losing spans is acceptable
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': getattr(settings, 'TRACING_SERVICE_NAME', 'myapp')}},
+                    {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}},
+                ]},
+                'scopeSpans': [{'scope': {'name': 'myapp.tracing'}, 'spans': [s.to_otlp() for s in batch]}],
+            }]
+        }
+        try:
+            with open(self.path, 'a') as handle:
+                handle.write(json.dumps(payload) + '\n')
+        except OSError:
+            logger.exception('Could not write %d spans to %s', len(batch), self.path)
+
+    def shutdown(self, timeout=5.0):
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = BatchExporter(
+                    getattr(settings, 'TRACING_EXPORT_PATH', os.path.join(settings.BASE_DIR, 'traces.jsonl')),
+                    batch_size=getattr(settings, 'TRACING_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+                    flush_interval=getattr(settings, 'TRACING_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+                )
+                atexit.register(_exporter.shutdown)
+    return _exporter
+
+
+@contextmanager
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """Time a block as a child of the current span (no-op outside a traced request)"""
+    parent = _current_span.get()
+    if parent is None and kind != SPAN_KIND_SERVER:
+        yield None
+        return
+
+    current = Span(name, parent=parent, kind=kind, attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as exc:
+        current.error = f'{type(exc).__name__}: {exc}'
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end = time.time_ns()
+        get_exporter().export(current)
+
+
+def traced(name=None):
+    """Decorator form of span(), named after the function by default"""
+    def decorator(func):
+        span_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _db_span(execute, sql, params, many, context):
+    if _current_span.get() is None:
+        return execute(sql, params, many, context)
+    with span('db.query', kind=SPAN_KIND_CLIENT, **{
+        'db.system': context['connection'].vendor,
+        'db.statement': sql[:500],
+    }):
+        return execute(sql, params, many, context)
+
+
+sql_hooks.register(_db_span)
+
+
+_templates_instrumented = False
+
+
+def _instrument_templates():
+    global _templates_instrumented
+    if _templates_instrumented:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        with span('template.render', **{'template.name': self.origin.template_name or ''}):
+            return original_render(self, context, request)
+
+    Template.render = render
+    _templates_instrumented = True
+
+
+class TracingMiddleware:
+    """Opens the root span for a request and traces its ORM queries"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _instrument_templates()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        with self._root_span(request) as root:
+            response = self.get_response(request)
+            self._finish(root, request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        with self._root_span(request) as root:
+            response = await self.get_response(request)
+            self._finish(root, request, response)
+        return response
+
+    @staticmethod
+    def _sampled():
+        sample_rate = getattr(settings, 'TRACING_SAMPLE_RATE', 1.0)
+        return tracing_enabled() and random.random() < sample_rate
+
+    @contextmanager
+    def _root_span(self, request):
+        # ORM queries join it through _db_span, in whichever thread they run
+        with span(f'HTTP {request.method}', kind=SPAN_KIND_SERVER, **{
+            'http.method': request.method,
+            'http.target': request.path,
+        }) as root:
+            yield root
+
+    @staticmethod
+    def _finish(root, request, response):
+        match = request.resolver_match
+        if match:
+            root.name = f'HTTP {request.method} {match.view_name}'
+            root.set_attribute('http.route', match.route)
+        root.set_attribute('http.status_code', response.status_code)
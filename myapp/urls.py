@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import events, views, metrics
 
 urlpatterns = [
     # Home and auth
@@ -20,6 +20,8 @@ urlpatterns = [
     # Equipment views - SPECIFIC URLS FIRST!
     path('equipment/', views.equipment_list, name='equipment_list'),
     #path('equipment/create/', views.equipment_create, name='equipment_create'),  
+    path('equipment/<str:machine_id>/quick-complete/', views.quick_task_complete, name='quick_task_complete'),
+    path('equipment/<str:machine_id>/row/', views.equipment_row_fragment, name='equipment_row_fragment'),
     path('equipment/<str:machine_id>/complete/', views.mark_task_complete, name='mark_task_complete'),  # ← Specific action
     path('equipment/<str:machine_id>/', views.equipment_detail, name='equipment_detail'),  # ← Generic detail view LAST
     
@@ -28,14 +30,21 @@ urlpatterns = [
     path('administrator/edit-equipment/<str:machine_id>/', views.admin_edit_equipment, name='admin_edit_equipment'),
     path('administrator/delete-equipment/<str:machine_id>/', views.admin_delete_equipment, name='admin_delete_equipment'),
     path('administrator/complete-procedure/<str:machine_id>/', views.admin_complete_procedure, name='admin_complete_procedure'),
+    path('administrator/profiles/', views.admin_profiles, name='admin_profiles'),
     
     # Maintenance user actions
     path('maintenance/add-equipment/', views.maintenance_add_equipment, name='maintenance_add_equipment'),
     path('maintenance/delete-equipment/<str:machine_id>/', views.maintenance_delete_equipment, name='maintenance_delete_equipment'),
     path('maintenance/complete-procedure/<str:machine_id>/', views.maintenance_complete_procedure, name='maintenance_complete_procedure'),
+    path('maintenance/counts/', views.maintenance_counts_fragment, name='maintenance_counts_fragment'),
     
     # API endpoints
     path('api/equipment/<int:pk>/status/', views.equipment_api_status, name='equipment_api_status'),
+    path('api/equipment/status/', views.equipment_api_status_batch, name='equipment_api_status_batch'),
     path('api/equipment/list/', views.equipment_api_list, name='equipment_api_list'),
     path('api/equipment/stats/', views.equipment_api_stats, name='equipment_api_stats'),
+    path('events/equipment/', events.equipment_events, name='equipment_events'),
+    
+    # Monitoring
+    path('metrics', metrics.metrics_view, name='metrics'),
 ]
\ No newline at end of file
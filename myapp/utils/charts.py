@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 from io import BytesIO
 import base64
 from datetime import datetime, timedelta
+from ..tracing import traced
 
 def get_graph():
     """Convert matplotlib figure to base64 string for embedding in HTML"""
@@ -17,6 +18,7 @@ def get_graph():
     plt.close()
     return graph
 
+@traced('charts.create_upcoming_tasks_chart')
 def create_upcoming_tasks_chart(equipment_list):
     """Create a bar chart showing equipment due in next 2 weeks"""
     
@@ -0,0 +1,45 @@
+"""
+Column-oriented JSON for large API responses.
+
+An array of row objects repeats every key name (and every ISO date) once
+per row. The columnar form sends each column once instead:
+
+    {"epoch": "2026-01-01",
+     "columns": {"machine_id": ["EQ1", "EQ2"], "machine_type": [0, 0],
+                 "next_maintenance_date": [12, -3]},
+     "dictionaries": {"machine_type": ["PRODUCTION"]}}
+
+Low-cardinality columns hold indexes into their list in "dictionaries", and
+date columns hold day offsets from "epoch" (null stays null). Row i is
+index i of every column.
+"""
+from datetime import date, timedelta
+
+
+def encode_columns(rows, dictionary_fields=(), date_fields=(), epoch=None):
+    """rows - dicts sharing the same keys, dates as date objects - in columnar form"""
+    epoch = epoch or date.today()
+    columns = {name: [row[name] for row in rows] for name in (rows[0] if rows else ())}
+    dictionaries = {}
+    for name in dictionary_fields:
+        if name in columns:
+            index = {}
+            columns[name] = [index.setdefault(value, len(index)) for value in columns[name]]
+            dictionaries[name] = list(index)
+    for name in date_fields:
+        if name in columns:
+            columns[name] = [None if value is None else (value - epoch).days for value in columns[name]]
+    return {'epoch': epoch.isoformat(), 'columns': columns, 'dictionaries': dictionaries}
+
+
+def decode_columns(payload, date_fields=()):
+    """The rows back from a (JSON-decoded) columnar payload, dates as date objects"""
+    epoch = date.fromisoformat(payload['epoch'])
+    columns = {}
+    for name, values in payload['columns'].items():
+        if name in payload['dictionaries']:
+            values = [payload['dictionaries'][name][value] for value in values]
+        elif name in date_fields:
+            values = [None if value is None else epoch + timedelta(days=value) for value in values]
+        columns[name] = values
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
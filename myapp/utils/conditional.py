@@ -0,0 +1,127 @@
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.db.models import Count, F, Func, IntegerField, Max, Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import md5
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from ..models import Equipment, UserProfile
+
+
+def equipment_version(request=None):
+    """
+    (last change, equipment rows, user profiles) in one aggregate query,
+    memoized on the request so the ETag and Last-Modified share it.
+    A row count catches deletes, which leave no updated_at behind.
+    """
+    if request is not None and hasattr(request, '_equipment_version'):
+        return request._equipment_version
+    profiles = UserProfile.objects.order_by().values(
+        n=Func(F('pk'), function='COUNT', output_field=IntegerField())
+    )
+    version = Equipment.objects.order_by().aggregate(
+        last_change=Max('updated_at'),
+        rows=Count('pk'),
+        profiles=Max(Subquery(profiles)),
+    )
+    if request is not None:
+        request._equipment_version = version
+    return version
+
+
+def _start_of_today():
+    # Due/overdue statuses roll over at midnight even when no row changed
+    return timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+
+def equipment_last_modified(request, *args, **kwargs):
+    last_change = equipment_version(request)['last_change']
+    return max(last_change, _start_of_today()) if last_change else _start_of_today()
+
+
+def equipment_etag(request, *args, **kwargs):
+    version = equipment_version(request)
+    parts = [
+        version['last_change'].isoformat() if version['last_change'] else '',
+        version['rows'],
+        version['profiles'],
+        timezone.localdate().isoformat(),
+    ]
+    return md5('|'.join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+
+
+def page_etag(request, *args, **kwargs):
+    """
+    Rendered pages also depend on who is looking, on pending flash messages
+    and on the CSRF secret their forms' tokens were made from - logging in
+    again rotates it, and a reused page would then fail its next POST.
+    """
+    if len(messages.get_messages(request)):
+        return None  # never answer 304 while a message is waiting to be shown
+    csrf = md5(request.META.get('CSRF_COOKIE', '').encode(), usedforsecurity=False).hexdigest()[:12]
+    return f'{equipment_etag(request)}-{request.user.pk}-{request.role}-{csrf}'
+
+
+def _revalidate(view_func):
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            response = await view_func(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        # Per-user data: browsers may keep it but must check back before every reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return wrapper
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """
+    django.views.decorators.http.condition for async views (Django 4.2's is
+    sync-only). The validator functions query the database, so they run in
+    a worker thread.
+    """
+    def validators(request, *args, **kwargs):
+        etag = etag_func(request, *args, **kwargs) if etag_func else None
+        last_modified = last_modified_func(request, *args, **kwargs) if last_modified_func else None
+        return (
+            quote_etag(etag) if etag is not None else None,
+            int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(validators)(request, *args, **kwargs)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return wrapper
+    return decorator
+
+
+def equipment_conditional_page(view_func):
+    """304 for dashboards when neither the equipment data nor the viewer changed (ETag only)"""
+    return _revalidate(condition(etag_func=page_etag)(view_func))
+
+
+def equipment_conditional_api(view_func):
+    """ETag and Last-Modified for JSON that depends only on the equipment data"""
+    conditional = async_condition if iscoroutinefunction(view_func) else condition
+    return _revalidate(conditional(etag_func=equipment_etag, last_modified_func=equipment_last_modified)(view_func))
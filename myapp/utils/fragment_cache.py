@@ -0,0 +1,76 @@
+"""
+Cached dashboard sections, keyed on the equipment data version.
+
+The filter form, the overdue cards, the search results and the static
+panels of the dashboards depend only on the equipment data, the query
+string and the viewer's role, not on the user. They sit in {% cache %}
+blocks (a call block in the Jinja2 templates) whose key includes
+fragment_version:
+
+    {% cache fragment_timeout admin_overdue fragment_version search machine_type %}
+
+The data version is a token in the shared cache that every Equipment save
+and delete replaces, once its transaction commits (receivers connected in
+apps.py). Old sections are never deleted - their keys just stop being
+asked for and they expire. Due and overdue statuses roll over at midnight,
+so the date is part of the key as well. Anything holding a CSRF token or
+the user's name stays outside the cached blocks. Writes that send no
+signals (QuerySet.update, bulk_create) must call bump_data_version().
+
+What only the cached blocks show goes into the context through
+deferred_context(), so a page whose sections all come from the cache
+never classifies the equipment behind them.
+"""
+import operator
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+VERSION_KEY = 'equipment-data-version'
+DEFAULT_TIMEOUT = 60 * 60  # seconds a section is kept if the data doesn't change first
+
+
+def data_version():
+    """The current equipment data version"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # First use, or the token was evicted: start from a value no cached section can have
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def equipment_data_changed(sender, raw=False, using=None, **kwargs):
+    """post_save/post_delete receiver for Equipment"""
+    if raw:
+        return
+    # A section re-rendered before the commit would otherwise be cached under the new version
+    transaction.on_commit(bump_data_version, using=using)
+
+
+def fragment_cache_context(request):
+    """fragment_timeout and fragment_version for a dashboard's cached sections"""
+    return {
+        'fragment_timeout': getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', DEFAULT_TIMEOUT),
+        'fragment_version': f'{data_version()}-{timezone.localdate().isoformat()}-{request.role}',
+    }
+
+
+def deferred_context(build, *names):
+    """
+    Context entries names, taken from the dict build() returns. build() runs
+    the first time a template reads one of them - never, when every section
+    that uses them is served from the cache. Templates can print, test,
+    iterate and index the values, but not do arithmetic on them.
+    """
+    values = SimpleLazyObject(build)
+    return {name: SimpleLazyObject(partial(operator.getitem, values, name)) for name in names}
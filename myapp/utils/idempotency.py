@@ -0,0 +1,129 @@
+import random
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from ..models import IdempotencyKey
+
+# How long a stored response is replayed for (seconds)
+DEFAULT_TTL = 60 * 60 * 24
+# How long an unfinished claim blocks retries before it is taken as abandoned (seconds) -
+# longer than any request may run, so only claims of crashed or killed workers expire
+DEFAULT_LEASE = 120
+# Fraction of stored responses that also prune expired keys
+PRUNE_PROBABILITY = 0.01
+
+
+def new_idempotency_key():
+    """Generate a key for a form's hidden idempotency_key field"""
+    return uuid.uuid4().hex
+
+
+def get_ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', DEFAULT_TTL))
+
+
+def get_lease():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_CLAIM_LEASE', DEFAULT_LEASE))
+
+
+def prune_expired_keys():
+    """Delete stored keys older than the TTL. Returns the number removed"""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - get_ttl()).delete()
+    return deleted
+
+
+def _get_key(request):
+    key = request.headers.get('Idempotency-Key') or request.POST.get('idempotency_key', '')
+    return key.strip()[:64]
+
+
+def _should_store(request, response):
+    """
+    Store redirects, empty results and JSON. HTML is stored for callers that send
+    the Idempotency-Key header (the dashboard's row fragments); an HTML page
+    answering a form's idempotency_key is a re-rendered form and must stay retryable.
+    """
+    if response.streaming or response.status_code >= 500:
+        return False
+    if 300 <= response.status_code < 400 or response.status_code == 204:
+        return True
+    return 'Idempotency-Key' in request.headers or not response.get('Content-Type', '').startswith('text/html')
+
+
+def _replay(record):
+    if record.response_location:
+        response = HttpResponse(status=record.response_status)
+        response['Location'] = record.response_location
+    else:
+        response = HttpResponse(
+            record.response_body,
+            status=record.response_status,
+            content_type=record.response_content_type or None,
+        )
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_func):
+    """
+    Decorator for POST views: a retried request carrying the same Idempotency-Key
+    (header or idempotency_key form field) gets the original response back
+    without running the view again.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = _get_key(request) if request.method == 'POST' else ''
+        if not key or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+
+        # The same key sent to another endpoint is a different request
+        scope = {'user': request.user, 'path': request.path[:255], 'key': key}
+        now = timezone.now()
+        IdempotencyKey.objects.filter(**scope).filter(
+            Q(created_at__lt=now - get_ttl()) |
+            Q(response_status__isnull=True, created_at__lt=now - get_lease())
+        ).delete()
+
+        # Claim the key first so two in-flight retries cannot both run the view
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(**scope)
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(**scope).first()
+            if record is None or record.response_status is None:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'A request with this idempotency key is still being processed'
+                }, status=409)
+            return _replay(record)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if not _should_store(request, response):
+            record.delete()
+            return response
+
+        record.response_status = response.status_code
+        record.response_content_type = response.get('Content-Type', '')
+        record.response_location = response.get('Location', '')[:500]
+        if not record.response_location:
+            record.response_body = response.content.decode(response.charset or 'utf-8', errors='replace')
+        record.save(update_fields=[
+            'response_status', 'response_content_type', 'response_location', 'response_body'
+        ])
+
+        if random.random() < PRUNE_PROBABILITY:
+            prune_expired_keys()
+        return response
+    return wrapper
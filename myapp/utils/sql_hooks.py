@@ -0,0 +1,33 @@
+"""
+Execute wrappers for the request instrumentation (metrics, tracing, query budgets).
+
+connection.execute_wrapper() only covers the connection object of the thread
+that enters it. Under ASGI the middleware runs on the event loop while the
+ORM runs in sync_to_async worker threads, each with its own connections, so
+a wrapper entered by the middleware never sees a query. Instead every hook is
+installed once on each connection when it is opened, and acts only when the
+context variables it reads - which sync_to_async copies into the worker
+thread - show a request being measured.
+"""
+from django.db import connections
+
+_hooks = []
+
+
+def _install(connection):
+    for hook in _hooks:
+        if hook not in connection.execute_wrappers:
+            connection.execute_wrappers.append(hook)
+
+
+def register(hook):
+    """Add hook(execute, sql, params, many, context) to every connection, open or future"""
+    if hook not in _hooks:
+        _hooks.append(hook)
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+
+
+def install_sql_hooks(sender, connection, **kwargs):
+    """connection_created receiver - puts the registered hooks on each new connection"""
+    _install(connection)
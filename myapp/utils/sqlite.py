@@ -0,0 +1,58 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Used when settings.SQLITE_PRAGMAS is not defined
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers no longer block behind a writer
+    'synchronous': 'NORMAL',      # safe with WAL, avoids an fsync per commit
+    'busy_timeout': 20000,        # ms to wait for the write lock
+    'mmap_size': 268435456,       # 256 MB memory-mapped reads
+    'cache_size': -64000,         # 64 MB page cache (negative = KiB)
+    'temp_store': 'MEMORY',
+}
+DEFAULT_OPTIMIZE_INTERVAL = 60 * 60  # seconds
+
+_optimize_lock = threading.Lock()
+_last_optimize = 0.0
+
+
+def get_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+
+
+def apply_pragmas(cursor, pragmas):
+    """Run PRAGMA statements on a DB-API cursor (Django or plain sqlite3)"""
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def _optimize_due():
+    """True at most once per SQLITE_OPTIMIZE_INTERVAL in this process"""
+    global _last_optimize
+    interval = getattr(settings, 'SQLITE_OPTIMIZE_INTERVAL', DEFAULT_OPTIMIZE_INTERVAL)
+    if interval is None:
+        return False
+    now = time.monotonic()
+    with _optimize_lock:
+        if _last_optimize and now - _last_optimize < interval:
+            return False
+        _last_optimize = now
+    return True
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver - tunes each new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, get_pragmas())
+        if _optimize_due():
+            # Cheap unless the query planner statistics are stale
+            cursor.execute('PRAGMA optimize')
+            logger.debug('Ran PRAGMA optimize on %s', connection.alias)
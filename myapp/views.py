@@ -4,15 +4,23 @@ from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Q
-from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.core.paginator import Paginator
 from .models import UserProfile, Equipment, MACHINE_TYPE_CHOICES  
 from .forms import CustomUserCreationForm, EquipmentForm, EquipmentFilterForm, QuickUpdateForm, ProcedureCompleteForm
 from datetime import datetime, timedelta
+from functools import partial
 from .utils.charts import create_upcoming_tasks_chart
+from .utils.columnar import encode_columns
+from .utils.conditional import equipment_conditional_api, equipment_conditional_page
+from .utils.fragment_cache import deferred_context, fragment_cache_context
+from .utils.idempotency import idempotent, new_idempotency_key
+from .query_inspector import query_budget
+from .roles import login_required, role_required
+from . import profiler
+from .tracing import span
 from .models import Equipment
 import logging
 import json
@@ -20,25 +28,6 @@ import json
 # Add logging 
 logger = logging.getLogger(__name__)
 
-#  DECORATORS 
-def role_required(allowed_roles):
-    """Decorator to check if user has required role"""
-    def decorator(view_func):
-        def wrapper(request, *args, **kwargs):
-            if not request.user.is_authenticated:
-                return redirect('login')
-            
-            try:
-                user_role = request.user.profile.role
-                if user_role in allowed_roles:
-                    return view_func(request, *args, **kwargs)
-                else:
-                    return HttpResponseForbidden("You don't have permission to access this page.")
-            except UserProfile.DoesNotExist:
-                return HttpResponseForbidden("Profile not found.")
-        return wrapper
-    return decorator
-
 # HOME Page
 def home(request):
     """
@@ -106,20 +95,13 @@ def default_dashboard(request):
 @login_required
 def dashboard(request):
     """Main dashboard that redirects based on user role"""
-    try:
-        user_profile = request.user.profile
-        user_role = request.user.profile.role
-        
-        if user_role == 'administrator':
-            return redirect('admin_dashboard')
-        elif user_role == 'maintenance':
-            return redirect('maintenance_dashboard')
-        elif user_role == 'quality':
-            return redirect('quality_dashboard')
-        else:
-            return redirect('default_dashboard')
-    except UserProfile.DoesNotExist:
-        messages.error(request, "Profile not found. Please contact administrator.")
+    if request.role == 'administrator':
+        return redirect('admin_dashboard')
+    elif request.role == 'maintenance':
+        return redirect('maintenance_dashboard')
+    elif request.role == 'quality':
+        return redirect('quality_dashboard')
+    else:
         return redirect('default_dashboard')
 
 # ROLE-SPECIFIC DASHBOARDS
@@ -182,6 +164,10 @@ def dashboard(request):
     
    # return render(request, 'myapp/equipment_confirm_delete.html', context)
 
+@query_budget(7)
+@login_required
+@role_required(['administrator'])
+@equipment_conditional_page
 def admin_dashboard(request):
     # Handle search functionality
     search = request.GET.get('search', '').strip()
@@ -198,13 +184,47 @@ def admin_dashboard(request):
             Q(machine_name__icontains=search) |
             Q(machine_location__icontains=search)
         )
-        print(f"Admin Dashboard - Search term: '{search}'")  # Debug line
-        print(f"Admin Dashboard - Results found: {equipment_queryset.count()}")  # Debug line
+        logger.debug('Admin dashboard search: %r', search)
     
     # Apply machine type filter
     if machine_type:
         equipment_queryset = equipment_queryset.filter(machine_type=machine_type)
     
+    # Create filter form instance
+    from .forms import EquipmentFilterForm
+    filter_form = EquipmentFilterForm(initial={
+        'search': search,
+        'machine_type': machine_type,
+        'status': status
+    })
+    
+    context = {
+        'user_role': 'Administrator',
+        'page_title': 'Administrator Dashboard',
+        'page_subtitle': 'Complete system administration and management',
+        'welcome_message': 'You have full administrative access to the system.',
+        'total_users': UserProfile.objects.count(),
+        'total_equipment': Equipment.objects.count(),
+        # Search-related context
+        'search': search,
+        'machine_type': machine_type,
+        'status': status,
+        'filter_form': filter_form,
+        'has_filters': bool(search or machine_type or status != 'all'),
+        # Keys for the cached sections
+        **fragment_cache_context(request),
+        # Only the cached sections show these - classified when one of them is rendered
+        **deferred_context(
+            partial(_admin_status_context, equipment_queryset, status),
+            'filtered_equipment', 'filtered_equipment_count', 'overdue_count', 'overdue_maintenance_count',
+            'overdue_calibration_count', 'due_soon_count', 'overdue_maintenance', 'overdue_calibration', 'due_soon',
+        ),
+    }
+    return render(request, 'myapp/admin_dashboard.html', context)
+
+
+def _admin_status_context(equipment_queryset, status):
+    """The admin dashboard's status lists and counts"""
     # Calculate status-based equipment lists
     today = timezone.now().date()
     two_weeks = today + timedelta(days=14)
@@ -214,27 +234,25 @@ def admin_dashboard(request):
     due_soon = []
     filtered_equipment = []
     
-    for equipment in equipment_queryset:
-        # Add to filtered list for display
-        filtered_equipment.append(equipment)
-        
-        # Check maintenance status
-        if equipment.is_maintenance_overdue:
-            overdue_maintenance.append(equipment)
-        
-        # Check calibration status    
-        if equipment.is_calibration_overdue:
-            overdue_calibration.append(equipment)
+    with span('admin_dashboard.classify_equipment'):
+        for equipment in equipment_queryset:
+            # Add to filtered list for display
+            filtered_equipment.append(equipment)
             
-        # Check if due soon
-        maintenance_due = equipment.next_maintenance_date
-        calibration_due = equipment.next_calibration_date
-        
-        if maintenance_due and today <= maintenance_due <= two_weeks:
-            if equipment not in due_soon:
-                due_soon.append(equipment)
-        if calibration_due and today <= calibration_due <= two_weeks:
-            if equipment not in due_soon:
+            # Check maintenance status
+            if equipment.is_maintenance_overdue:
+                overdue_maintenance.append(equipment)
+            
+            # Check calibration status    
+            if equipment.is_calibration_overdue:
+                overdue_calibration.append(equipment)
+                
+            # Check if due soon
+            maintenance_due = equipment.next_maintenance_date
+            calibration_due = equipment.next_calibration_date
+            
+            if ((maintenance_due and today <= maintenance_due <= two_weeks) or
+                    (calibration_due and today <= calibration_due <= two_weeks)):
                 due_soon.append(equipment)
     
     # Apply status filter
@@ -245,108 +263,88 @@ def admin_dashboard(request):
     elif status == 'due_soon':
         filtered_equipment = due_soon
     
-    # Create filter form instance
-    from .forms import EquipmentFilterForm
-    filter_form = EquipmentFilterForm(initial={
-        'search': search,
-        'machine_type': machine_type,
-        'status': status
-    })
-    
-    context = {
-        'user_role': 'Administrator',
-        'page_title': 'Administrator Dashboard',
-        'page_subtitle': 'Complete system administration and management',
-        'welcome_message': 'You have full administrative access to the system.',
-        'total_users': UserProfile.objects.count(),
-        'total_equipment': Equipment.objects.count(),
+    return {
+        'filtered_equipment': filtered_equipment,
         'filtered_equipment_count': len(filtered_equipment),
+        'overdue_count': len(overdue_maintenance) + len(overdue_calibration),
         'overdue_maintenance_count': len(overdue_maintenance),
         'overdue_calibration_count': len(overdue_calibration),
         'due_soon_count': len(due_soon),
         'overdue_maintenance': overdue_maintenance[:3],  # Show first 3
         'overdue_calibration': overdue_calibration[:3],  # Show first 3
         'due_soon': due_soon[:3],  # Show first 3
-        # Search-related context
-        'search': search,
-        'filter_form': filter_form,
-        'filtered_equipment': filtered_equipment,
-        'has_filters': bool(search or machine_type or status != 'all'),
     }
-    return render(request, 'myapp/admin_dashboard.html', context)
 
 
-@login_required
-def maintenance_dashboard(request):
+# Fields the overdue/due-soon properties read
+_STATUS_FIELDS = (
+    'machine_id', 'last_maintenance_date', 'maintenance_interval_days',
+    'last_calibration_date', 'calibration_interval_days',
+)
 
-     # Check if user has maintenance role
-    if not hasattr(request.user, 'profile') or request.user.profile.role != 'maintenance':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
-     # Handle search functionality  
-    search = request.GET.get('search', '').strip()
-    machine_type = request.GET.get('machine_type', '')
-    status = request.GET.get('status', 'all')
 
-    # Start with all equipment
-    equipment_queryset = Equipment.objects.all()
-    
-    # Apply search filter if provided
+def _search_equipment(equipment_queryset, search, machine_type):
+    """The maintenance dashboard's search box and machine type filter"""
     if search:
         equipment_queryset = equipment_queryset.filter(
             Q(machine_id__icontains=search) |
             Q(machine_name__icontains=search) |
             Q(machine_location__icontains=search)
         )
-        print(f"Maintenance Dashboard - Search term: '{search}'")  # Debug line
-        print(f"Maintenance Dashboard - Results found: {equipment_queryset.count()}")  # Debug line
-    
-    # Apply machine type filter
     if machine_type:
         equipment_queryset = equipment_queryset.filter(machine_type=machine_type)
-    
-    # Calculate status-based equipment lists
-    today = timezone.now().date()
+    return equipment_queryset
+
+
+def _maintenance_status_lists(equipment_list, today):
+    """Overdue and due-within-two-weeks equipment per procedure, as the maintenance dashboard counts them"""
     two_weeks = today + timedelta(days=14)
-    all_equipment = Equipment.objects.all()
-    due_calibration = []
-    due_maintenance = []
-    
-    overdue_maintenance = []
-    due_soon_maintenance = []
-    overdue_calibration = []
-    due_soon_calibration = []
-    filtered_equipment = []
-    
-    for equipment in equipment_queryset:
-        # Add to filtered list for display
-        filtered_equipment.append(equipment)
-        
+    lists = {
+        'overdue_maintenance': [],
+        'due_soon_maintenance': [],
+        'overdue_calibration': [],
+        'due_soon_calibration': [],
+    }
+    for equipment in equipment_list:
         # Check maintenance status
         if equipment.is_maintenance_overdue:
-            overdue_maintenance.append(equipment)
+            lists['overdue_maintenance'].append(equipment)
         else:
             maintenance_due = equipment.next_maintenance_date
             if maintenance_due and today <= maintenance_due <= two_weeks:
-                due_soon_maintenance.append(equipment)
+                lists['due_soon_maintenance'].append(equipment)
         
         # Check calibration status
         if equipment.is_calibration_overdue:
-            overdue_calibration.append(equipment)
+            lists['overdue_calibration'].append(equipment)
         else:
             calibration_due = equipment.next_calibration_date
             if calibration_due and today <= calibration_due <= two_weeks:
-                due_soon_calibration.append(equipment)
+                lists['due_soon_calibration'].append(equipment)
+    return lists
+
+
+@query_budget(7)
+@login_required
+@role_required(['maintenance'])
+@equipment_conditional_page
+def maintenance_dashboard(request):
+
+     # Handle search functionality  
+    search = request.GET.get('search', '').strip()
+    machine_type = request.GET.get('machine_type', '')
+    status = request.GET.get('status', 'all')
+
+    equipment_queryset = _search_equipment(Equipment.objects.all(), search, machine_type)
+    if search:
+        logger.debug('Maintenance dashboard search: %r', search)
     
-    # Apply status filter
-    if status == 'overdue_maintenance':
-        filtered_equipment = overdue_maintenance
-    elif status == 'overdue_calibration':
-        filtered_equipment = overdue_calibration
-    elif status == 'due_soon':
-        # Combine both due soon lists
-        filtered_equipment = list(set(due_soon_maintenance + due_soon_calibration))
+    # Calculate status-based equipment lists
+    today = timezone.now().date()
+    two_weeks = today + timedelta(days=14)
+    all_equipment = Equipment.objects.all()
+    due_calibration = []
+    due_maintenance = []
     
     # Create filter form instance
     from .forms import EquipmentFilterForm
@@ -356,16 +354,17 @@ def maintenance_dashboard(request):
         'status': status     
     })
 
-    for equipment in all_equipment:
-        # Check calibration
-        next_cal = equipment.next_calibration_date
-        if next_cal and next_cal <= two_weeks:
-            due_calibration.append(equipment)
-        
-        # Check maintenance
-        next_maint = equipment.next_maintenance_date
-        if next_maint and next_maint <= two_weeks:
-            due_maintenance.append(equipment)
+    with span('maintenance_dashboard.due_lists'):
+        for equipment in all_equipment:
+            # Check calibration
+            next_cal = equipment.next_calibration_date
+            if next_cal and next_cal <= two_weeks:
+                due_calibration.append(equipment)
+            
+            # Check maintenance
+            next_maint = equipment.next_maintenance_date
+            if next_maint and next_maint <= two_weeks:
+                due_maintenance.append(equipment)
     
     context = {
         'user_role': 'Maintenance/Calibration User',
@@ -373,29 +372,60 @@ def maintenance_dashboard(request):
         'page_subtitle': 'Track and complete maintenance and calibration tasks',
         'welcome_message': 'Review your assigned tasks and equipment due for maintenance.',
         'total_equipment': Equipment.objects.count(),
-        'filtered_equipment_count': len(filtered_equipment),
-        'overdue_maintenance': overdue_maintenance,
-        'due_soon_maintenance': due_soon_maintenance,
-        'overdue_calibration': overdue_calibration,
-        'due_soon_calibration': due_soon_calibration,
-        'overdue_maintenance_count': len(overdue_maintenance),
-        'overdue_calibration_count': len(overdue_calibration),
-        'due_soon_maintenance_count': len(due_soon_maintenance),
-        'due_soon_calibration_count': len(due_soon_calibration),
         # Search-related context
         'search': search,
+        'machine_type': machine_type,
+        'status': status,
         'filter_form': filter_form,
-        'filtered_equipment': filtered_equipment,
         'has_filters': bool(search or machine_type or status != 'all'),
         'due_calibration': due_calibration,
         'due_maintenance': due_maintenance,
-        'total_equipment': all_equipment.count(),
         'today': today,
+        # Keys for the cached sections
+        **fragment_cache_context(request),
+        # Only the cached sections show these - classified when one of them is rendered
+        **deferred_context(
+            partial(_maintenance_status_context, equipment_queryset, status, today),
+            'filtered_equipment', 'filtered_equipment_count',
+            'overdue_maintenance', 'due_soon_maintenance', 'overdue_calibration', 'due_soon_calibration',
+            'overdue_maintenance_count', 'overdue_calibration_count',
+            'due_soon_maintenance_count', 'due_soon_calibration_count', 'due_soon_count',
+        ),
     }
     return render(request, 'myapp/maintenance_dashboard.html', context)
+
+
+def _maintenance_status_context(equipment_queryset, status, today):
+    """The maintenance dashboard's status lists and counts"""
+    with span('maintenance_dashboard.classify_equipment'):
+        filtered_equipment = list(equipment_queryset)
+        status_lists = _maintenance_status_lists(filtered_equipment, today)
+    
+    # Apply status filter
+    if status in ('overdue_maintenance', 'overdue_calibration'):
+        filtered_equipment = status_lists[status]
+    elif status == 'due_soon':
+        # Combine both due soon lists
+        filtered_equipment = list(set(status_lists['due_soon_maintenance'] + status_lists['due_soon_calibration']))
+    
+    return {
+        **status_lists,
+        **_status_counts(status_lists),
+        'filtered_equipment': filtered_equipment,
+        'filtered_equipment_count': len(filtered_equipment),
+    }
+
+
+def _status_counts(status_lists):
+    """The counter cards' figures (fragments/maintenance_counts.html) for _maintenance_status_lists()"""
+    counts = {f'{name}_count': len(items) for name, items in status_lists.items()}
+    counts['due_soon_count'] = counts['due_soon_maintenance_count'] + counts['due_soon_calibration_count']
+    return counts
     
+@query_budget(7)
 @login_required
 @role_required(['quality'])
+@equipment_conditional_page
 def quality_dashboard(request):
     """Quality Engineer Dashboard - With Visualizations, Monitor compliance and generate reports"""
     
@@ -414,13 +444,54 @@ def quality_dashboard(request):
             Q(machine_name__icontains=search) |
             Q(machine_location__icontains=search)
         )
-        print(f"Quality Dashboard - Search term: '{search}'")  # Debug line
-        print(f"Quality Dashboard - Results found: {equipment_queryset.count()}")  # Debug line
+        logger.debug('Quality dashboard search: %r', search)
     
     # Apply machine type filter
     if machine_type:
         equipment_queryset = equipment_queryset.filter(machine_type=machine_type)
     
+    total_equipment = Equipment.objects.count()
+    
+    # Create filter form instance
+    from .forms import EquipmentFilterForm
+    filter_form = EquipmentFilterForm(initial={
+        'search': search,
+        'machine_type': machine_type,
+        'status': status
+    })
+
+   # Get all equipment
+    equipment_list = Equipment.objects.all()
+
+    context = {
+        'user_role': 'Quality Engineer',
+        'page_title': 'Quality Dashboard',
+        'page_subtitle': 'Monitor compliance and ensure all procedures are up to date',
+        'welcome_message': 'Review equipment compliance and generate quality reports.',
+        'total_equipment': total_equipment,
+        # Search-related context
+        'search': search,
+        'machine_type': machine_type,
+        'filter_form': filter_form,
+        'has_filters': bool(search or machine_type or status != 'all'),
+        'equipment_list': equipment_list,
+        # Keys for the cached sections
+        **fragment_cache_context(request),
+        # Only the cached sections show these - classified when one of them is rendered
+        **deferred_context(
+            partial(_quality_status_context, equipment_queryset, status, total_equipment),
+            'filtered_equipment', 'filtered_equipment_count', 'overdue_maintenance_count',
+            'overdue_calibration_count', 'due_soon_count', 'compliant_count', 'compliance_percentage',
+            'overdue_maintenance', 'overdue_calibration', 'due_soon',
+        ),
+        #Context for charts - drawn only when the chart section isn't cached
+        **deferred_context(lambda: {'chart': create_upcoming_tasks_chart(equipment_list)}, 'chart'),
+    }
+    return render(request, 'myapp/quality_dashboard.html', context)
+
+
+def _quality_status_context(equipment_queryset, status, total_equipment):
+    """The quality dashboard's status lists, counts and compliance figure"""
     # Calculate status-based equipment lists
     today = timezone.now().date()
     two_weeks = today + timedelta(days=14)
@@ -431,36 +502,37 @@ def quality_dashboard(request):
     compliant_equipment = []
     filtered_equipment = []
     
-    for equipment in equipment_queryset:
-        # Add to filtered list for display
-        filtered_equipment.append(equipment)
-        
-        is_overdue = False
-        
-        # Check maintenance status
-        if equipment.is_maintenance_overdue:
-            overdue_maintenance.append(equipment)
-            is_overdue = True
-        
-        # Check calibration status    
-        if equipment.is_calibration_overdue:
-            overdue_calibration.append(equipment)
-            is_overdue = True
+    with span('quality_dashboard.classify_equipment'):
+        for equipment in equipment_queryset:
+            # Add to filtered list for display
+            filtered_equipment.append(equipment)
             
-        # Check if due soon
-        maintenance_due = equipment.next_maintenance_date
-        calibration_due = equipment.next_calibration_date
-        
-        if maintenance_due and today <= maintenance_due <= two_weeks:
-            if equipment not in due_soon:
-                due_soon.append(equipment)
-        if calibration_due and today <= calibration_due <= two_weeks:
-            if equipment not in due_soon:
+            is_overdue = False
+            
+            # Check maintenance status
+            if equipment.is_maintenance_overdue:
+                overdue_maintenance.append(equipment)
+                is_overdue = True
+            
+            # Check calibration status    
+            if equipment.is_calibration_overdue:
+                overdue_calibration.append(equipment)
+                is_overdue = True
+                
+            # Check if due soon
+            maintenance_due = equipment.next_maintenance_date
+            calibration_due = equipment.next_calibration_date
+            
+            is_due_soon = bool(
+                (maintenance_due and today <= maintenance_due <= two_weeks) or
+                (calibration_due and today <= calibration_due <= two_weeks)
+            )
+            if is_due_soon:
                 due_soon.append(equipment)
-        
-        # Track compliant equipment (not overdue and not due soon)
-        if not is_overdue and equipment not in due_soon:
-            compliant_equipment.append(equipment)
+            
+            # Track compliant equipment (not overdue and not due soon)
+            if not is_overdue and not is_due_soon:
+                compliant_equipment.append(equipment)
     
     # Apply status filter
     if status == 'overdue_maintenance':
@@ -473,30 +545,11 @@ def quality_dashboard(request):
         filtered_equipment = compliant_equipment
     
     # Calculate compliance percentage
-    total_equipment = Equipment.objects.count()
     compliant_count = len(compliant_equipment)
     compliance_percentage = (compliant_count / total_equipment * 100) if total_equipment > 0 else 0
     
-    # Create filter form instance
-    from .forms import EquipmentFilterForm
-    filter_form = EquipmentFilterForm(initial={
-        'search': search,
-        'machine_type': machine_type,
-        'status': status
-    })
-
-   # Get all equipment
-    equipment_list = Equipment.objects.all()
-    
-    # Generate chart
-    chart = create_upcoming_tasks_chart(equipment_list)
-
-    context = {
-        'user_role': 'Quality Engineer',
-        'page_title': 'Quality Dashboard',
-        'page_subtitle': 'Monitor compliance and ensure all procedures are up to date',
-        'welcome_message': 'Review equipment compliance and generate quality reports.',
-        'total_equipment': total_equipment,
+    return {
+        'filtered_equipment': filtered_equipment,
         'filtered_equipment_count': len(filtered_equipment),
         'overdue_maintenance_count': len(overdue_maintenance),
         'overdue_calibration_count': len(overdue_calibration),
@@ -506,18 +559,10 @@ def quality_dashboard(request):
         'overdue_maintenance': overdue_maintenance[:5],  # Show first 5
         'overdue_calibration': overdue_calibration[:5],  # Show first 5
         'due_soon': due_soon[:5],  # Show first 5
-        # Search-related context
-        'search': search,
-        'filter_form': filter_form,
-        'filtered_equipment': filtered_equipment,
-        'has_filters': bool(search or machine_type or status != 'all'),
-        #Context for charts
-        'chart': chart,
-        'equipment_list': equipment_list,
     }
-    return render(request, 'myapp/quality_dashboard.html', context)
 
 #Equipment List View
+@query_budget(4)
 @login_required
 def equipment_list(request):
     """Display list of all equipment with search and filter capabilities"""
@@ -548,33 +593,34 @@ def equipment_list(request):
     
     filtered_equipment = []
     
-    for equipment in equipment_queryset:
-        # Determine equipment status
-        equipment.status_display = 'Compliant'
-        equipment.status_class = 'compliant'
-        
-        if equipment.is_maintenance_overdue or equipment.is_calibration_overdue:
-            equipment.status_display = 'Overdue'
-            equipment.status_class = 'overdue'
-        else:
-            # Check if due soon
-            maintenance_due = equipment.next_maintenance_date
-            calibration_due = equipment.next_calibration_date
+    with span('equipment_list.classify_equipment'):
+        for equipment in equipment_queryset:
+            # Determine equipment status
+            equipment.status_display = 'Compliant'
+            equipment.status_class = 'compliant'
             
-            if (maintenance_due and today <= maintenance_due <= two_weeks) or \
-               (calibration_due and today <= calibration_due <= two_weeks):
-                equipment.status_display = 'Due Soon'
-                equipment.status_class = 'due-soon'
-        
-        # Apply status filter
-        if status == 'all':
-            filtered_equipment.append(equipment)
-        elif status == 'overdue' and equipment.status_class == 'overdue':
-            filtered_equipment.append(equipment)
-        elif status == 'due_soon' and equipment.status_class == 'due-soon':
-            filtered_equipment.append(equipment)
-        elif status == 'compliant' and equipment.status_class == 'compliant':
-            filtered_equipment.append(equipment)
+            if equipment.is_maintenance_overdue or equipment.is_calibration_overdue:
+                equipment.status_display = 'Overdue'
+                equipment.status_class = 'overdue'
+            else:
+                # Check if due soon
+                maintenance_due = equipment.next_maintenance_date
+                calibration_due = equipment.next_calibration_date
+                
+                if (maintenance_due and today <= maintenance_due <= two_weeks) or \
+                   (calibration_due and today <= calibration_due <= two_weeks):
+                    equipment.status_display = 'Due Soon'
+                    equipment.status_class = 'due-soon'
+            
+            # Apply status filter
+            if status == 'all':
+                filtered_equipment.append(equipment)
+            elif status == 'overdue' and equipment.status_class == 'overdue':
+                filtered_equipment.append(equipment)
+            elif status == 'due_soon' and equipment.status_class == 'due-soon':
+                filtered_equipment.append(equipment)
+            elif status == 'compliant' and equipment.status_class == 'compliant':
+                filtered_equipment.append(equipment)
     
     # Pagination
     paginator = Paginator(filtered_equipment, 10)  # Show 10 equipment per page
@@ -602,6 +648,7 @@ def equipment_list(request):
     
     return render(request, 'myapp/equipment/equipment_list.html', context)
 
+@query_budget(4)
 @login_required
 @login_required
 def equipment_detail(request, machine_id):
@@ -644,9 +691,10 @@ def equipment_detail(request, machine_id):
 
 @login_required
 @role_required(['administrator', 'maintenance'])
-def mark_task_complete(request, pk):
+@idempotent
+def mark_task_complete(request, machine_id):
     """Mark maintenance or calibration task as complete and update dates"""
-    equipment = get_object_or_404(Equipment, pk=pk)
+    equipment = get_object_or_404(Equipment, machine_id=machine_id)
     
     if request.method == 'POST':
         task_type = request.POST.get('task_type')
@@ -663,36 +711,34 @@ def mark_task_complete(request, pk):
         if task_type == 'maintenance':
             equipment.last_maintenance_date = completion_date_obj
             task_name = 'Maintenance'
-            messages.success(
-                request, 
-                f'Maintenance task completed for "{equipment.machine_name}". Next maintenance due: {equipment.next_maintenance_date}'
-            )
+            success_message = f'Maintenance task completed for "{equipment.machine_name}". Next maintenance due: {equipment.next_maintenance_date}'
         elif task_type == 'calibration':
             equipment.last_calibration_date = completion_date_obj
             task_name = 'Calibration'
-            messages.success(
-                request, 
-                f'Calibration task completed for "{equipment.machine_name}". Next calibration due: {equipment.next_calibration_date}'
-            )
+            success_message = f'Calibration task completed for "{equipment.machine_name}". Next calibration due: {equipment.next_calibration_date}'
         else:
             messages.error(request, 'Invalid task type.')
-            return redirect('equipment_detail', pk=pk)
+            return redirect('equipment_detail', machine_id=machine_id)
         
-        equipment.save()
+        if not equipment.save_versioned([f'last_{task_type}_date']):
+            messages.error(request, f'"{equipment.machine_name}" was updated by another user. Please try again.')
+            return redirect('equipment_detail', machine_id=machine_id)
+        messages.success(request, success_message)
         
         # Log the completion (optional - for audit trail)
         logger.info(
-            f"{task_name} completed for {equipment.machine_name} (ID: {equipment.machine_id}) "
-            f"by {request.user.username} on {completion_date_obj}. "
-            f"Scheduled: {is_scheduled}. Notes: {notes}"
+            '%s completed for %s (ID: %s) by %s on %s. Scheduled: %s. Notes: %s',
+            task_name, equipment.machine_name, equipment.machine_id,
+            request.user.username, completion_date_obj, is_scheduled, notes,
         )
         
-        return redirect('equipment_detail', pk=pk)
+        return redirect('equipment_detail', machine_id=machine_id)
     
     # GET request - show the form
     context = {
         'equipment': equipment,
         'today': timezone.now().date(),
+        'idempotency_key': new_idempotency_key(),
     }
     
     return render(request, 'myapp/mark_task_complete.html', context)
@@ -700,9 +746,14 @@ def mark_task_complete(request, pk):
 @login_required
 @role_required(['administrator', 'maintenance'])
 @require_POST
-def quick_task_complete(request, pk):
-    """Quick task completion via AJAX or POST"""
-    equipment = get_object_or_404(Equipment, pk=pk)
+@idempotent
+def quick_task_complete(request, machine_id):
+    """
+    Complete a task today. AJAX callers asking for text/html get the updated
+    dashboard row (or 204 when it no longer belongs in the due table),
+    other AJAX callers JSON, and plain form posts a redirect back.
+    """
+    equipment = get_object_or_404(Equipment, machine_id=machine_id)
     task_type = request.POST.get('task_type')
     
     today = timezone.now().date()
@@ -719,16 +770,22 @@ def quick_task_complete(request, pk):
         messages.error(request, 'Invalid task type.')
         return redirect(request.META.get('HTTP_REFERER', 'dashboard'))
     
-    equipment.save()
+    if not equipment.save_versioned([f'last_{task_type}_date']):
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'success': False, 'error': 'Equipment was updated by another user'}, status=409)
+        messages.error(request, f'"{equipment.machine_name}" was updated by another user. Please try again.')
+        return redirect(request.META.get('HTTP_REFERER', 'dashboard'))
     
     # Log the completion
     logger.info(
-        f"{task_name} quick-completed for {equipment.machine_name} "
-        f"by {request.user.username}"
+        '%s quick-completed for %s by %s',
+        task_name, equipment.machine_name, request.user.username,
     )
     
     # Handle AJAX requests
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        if 'text/html' in request.headers.get('Accept', ''):
+            return _due_row_response(request, equipment, task_type)
         return JsonResponse({
             'success': True,
             'message': f'{task_name} completed successfully',
@@ -738,11 +795,52 @@ def quick_task_complete(request, pk):
     messages.success(request, f'{task_name} completed for "{equipment.machine_name}"')
     return redirect(request.META.get('HTTP_REFERER', 'dashboard'))
 
+
+# FRAGMENTS - pieces of the maintenance dashboard re-rendered in place after a completion
+TASK_TYPES = ('maintenance', 'calibration')
+
+
+def _due_row_response(request, equipment, task_type):
+    """One row of a "due in the next 14 days" table, or 204 once the equipment has left it"""
+    next_due = equipment.next_maintenance_date if task_type == 'maintenance' else equipment.next_calibration_date
+    if not next_due or next_due > timezone.now().date() + timedelta(days=14):
+        return HttpResponse(status=204)
+    return render(request, 'myapp/fragments/due_row.html', {'equipment': equipment, 'task_type': task_type})
+
+
+@query_budget(3)
 @login_required
-def equipment_api_status(request, pk):
+@role_required(['maintenance'])
+def equipment_row_fragment(request, machine_id):
+    """GET ?task_type=maintenance|calibration - the equipment's row in that due table"""
+    task_type = request.GET.get('task_type')
+    if task_type not in TASK_TYPES:
+        return HttpResponseBadRequest('task_type must be maintenance or calibration')
+    equipment = get_object_or_404(Equipment, machine_id=machine_id)
+    return _due_row_response(request, equipment, task_type)
+
+
+@query_budget(3)
+@login_required
+@role_required(['maintenance'])
+def maintenance_counts_fragment(request):
+    """The maintenance dashboard's counter cards, for the same search/machine_type filters"""
+    equipment_queryset = _search_equipment(
+        Equipment.objects.only(*_STATUS_FIELDS).order_by(),
+        request.GET.get('search', '').strip(),
+        request.GET.get('machine_type', ''),
+    )
+    status_lists = _maintenance_status_lists(equipment_queryset, timezone.now().date())
+    context = {'total_equipment': Equipment.objects.count(), **_status_counts(status_lists)}
+    return render(request, 'myapp/fragments/maintenance_counts.html', context)
+
+
+# API VIEWS - async, so under ASGI a poller waiting on the database holds no thread
+@login_required
+async def equipment_api_status(request, pk):
     """API endpoint to get equipment status in JSON format"""
     try:
-        equipment = get_object_or_404(Equipment, pk=pk)
+        equipment = await Equipment.objects.aget(pk=pk)
         
         today = timezone.now().date()
         two_weeks = today + timedelta(days=14)
@@ -791,15 +889,17 @@ def equipment_api_status(request, pk):
             'error': 'Equipment not found'
         }, status=404)
     except Exception as e:
-        logger.error(f"Error in equipment_api_status: {str(e)}")
+        logger.error('Error in equipment_api_status: %s', e)
         return JsonResponse({
             'success': False,
             'error': 'An error occurred'
         }, status=500)
     
 
+@query_budget(4)
 @login_required
-def equipment_api_stats(request):
+@equipment_conditional_api
+async def equipment_api_stats(request):
     """API endpoint to get overall equipment statistics"""
     try:
         equipment_list = Equipment.objects.all()
@@ -807,37 +907,43 @@ def equipment_api_stats(request):
         two_weeks = today + timedelta(days=14)
         
         stats = {
-            'total_equipment': equipment_list.count(),
+            'total_equipment': await equipment_list.acount(),
             'overdue_maintenance': 0,
             'overdue_calibration': 0,
             'due_soon_maintenance': 0,
             'due_soon_calibration': 0,
+            'due_soon_equipment': 0,  # distinct machines, as on the admin dashboard
             'compliant': 0,
         }
         
-        for equipment in equipment_list:
-            is_overdue = False
-            is_due_soon = False
-            
-            # Check maintenance
-            if equipment.is_maintenance_overdue:
-                stats['overdue_maintenance'] += 1
-                is_overdue = True
-            elif equipment.next_maintenance_date and today <= equipment.next_maintenance_date <= two_weeks:
-                stats['due_soon_maintenance'] += 1
-                is_due_soon = True
-            
-            # Check calibration
-            if equipment.is_calibration_overdue:
-                stats['overdue_calibration'] += 1
-                is_overdue = True
-            elif equipment.next_calibration_date and today <= equipment.next_calibration_date <= two_weeks:
-                stats['due_soon_calibration'] += 1
-                is_due_soon = True
-            
-            # Count compliant equipment
-            if not is_overdue and not is_due_soon:
-                stats['compliant'] += 1
+        with span('equipment_api_stats.classify_equipment'):
+            async for equipment in equipment_list:
+                is_overdue = False
+                is_due_soon = False
+                
+                # Check maintenance
+                if equipment.is_maintenance_overdue:
+                    stats['overdue_maintenance'] += 1
+                    is_overdue = True
+                elif equipment.next_maintenance_date and today <= equipment.next_maintenance_date <= two_weeks:
+                    stats['due_soon_maintenance'] += 1
+                    is_due_soon = True
+                
+                # Check calibration
+                if equipment.is_calibration_overdue:
+                    stats['overdue_calibration'] += 1
+                    is_overdue = True
+                elif equipment.next_calibration_date and today <= equipment.next_calibration_date <= two_weeks:
+                    stats['due_soon_calibration'] += 1
+                    is_due_soon = True
+                
+                if any(due and today <= due <= two_weeks
+                       for due in (equipment.next_maintenance_date, equipment.next_calibration_date)):
+                    stats['due_soon_equipment'] += 1
+                
+                # Count compliant equipment
+                if not is_overdue and not is_due_soon:
+                    stats['compliant'] += 1
         
         # Calculate compliance percentage
         stats['compliance_percentage'] = round(
@@ -851,130 +957,68 @@ def equipment_api_stats(request):
         })
         
     except Exception as e:
-        logger.error(f"Error in equipment_api_stats: {str(e)}")
-        return JsonResponse({
-            'success': False,
-            'error': 'An error occurred'
-        }, status=500)
-    
-    """API endpoint to get equipment status"""
-    try:
-        equipment = get_object_or_404(Equipment, machine_id=machine_id)
-        
-        data = {
-            'machine_id': equipment.machine_id,
-            'machine_name': equipment.machine_name,
-            'maintenance_status': equipment.maintenance_status,
-            'calibration_status': equipment.calibration_status,
-            'is_maintenance_overdue': equipment.is_maintenance_overdue,
-            'is_calibration_overdue': equipment.is_calibration_overdue,
-            'next_maintenance_date': equipment.next_maintenance_date.isoformat() if equipment.next_maintenance_date else None,
-            'next_calibration_date': equipment.next_calibration_date.isoformat() if equipment.next_calibration_date else None,
-        }
-        
-        return JsonResponse(data)
-        
-    except Equipment.DoesNotExist:
-        return JsonResponse({
-            'status': 'error',
-            'message': 'Equipment not found'
-        }, status=404)
-    
-    # API VIEWS
-@login_required
-def equipment_api_status(request, pk):
-    """API endpoint to get equipment status in JSON format"""
-    try:
-        equipment = get_object_or_404(Equipment, pk=pk)
-        
-        today = timezone.now().date()
-        two_weeks = today + timedelta(days=14)
-        
-        # Calculate maintenance status
-        maintenance_status = 'compliant'
-        if equipment.is_maintenance_overdue:
-            maintenance_status = 'overdue'
-        elif equipment.next_maintenance_date and today <= equipment.next_maintenance_date <= two_weeks:
-            maintenance_status = 'due_soon'
-        
-        # Calculate calibration status
-        calibration_status = 'compliant'
-        if equipment.is_calibration_overdue:
-            calibration_status = 'overdue'
-        elif equipment.next_calibration_date and today <= equipment.next_calibration_date <= two_weeks:
-            calibration_status = 'due_soon'
-        
-        # Prepare response data
-        data = {
-            'success': True,
-            'equipment': {
-                'id': equipment.pk,
-                'machine_id': equipment.machine_id,
-                'machine_name': equipment.machine_name,
-                'machine_type': equipment.machine_type,
-                'machine_location': equipment.machine_location,
-                'last_maintenance_date': equipment.last_maintenance_date.strftime('%Y-%m-%d') if equipment.last_maintenance_date else None,
-                'next_maintenance_date': equipment.next_maintenance_date.strftime('%Y-%m-%d') if equipment.next_maintenance_date else None,
-                'last_calibration_date': equipment.last_calibration_date.strftime('%Y-%m-%d') if equipment.last_calibration_date else None,
-                'next_calibration_date': equipment.next_calibration_date.strftime('%Y-%m-%d') if equipment.next_calibration_date else None,
-                'maintenance_interval_days': equipment.maintenance_interval_days,
-                'calibration_interval_days': equipment.calibration_interval_days,
-                'maintenance_status': maintenance_status,
-                'calibration_status': calibration_status,
-                'is_maintenance_overdue': equipment.is_maintenance_overdue,
-                'is_calibration_overdue': equipment.is_calibration_overdue,
-            }
-        }
-        
-        return JsonResponse(data)
-        
-    except Equipment.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': 'Equipment not found'
-        }, status=404)
-    except Exception as e:
-        logger.error(f"Error in equipment_api_status: {str(e)}")
+        logger.error('Error in equipment_api_stats: %s', e)
         return JsonResponse({
             'success': False,
             'error': 'An error occurred'
         }, status=500)
 
 
+# Columns of the list API that columnar responses dictionary-encode or send as day offsets
+LIST_DICTIONARY_FIELDS = ('machine_type', 'machine_location', 'maintenance_status', 'calibration_status')
+LIST_DATE_FIELDS = ('next_maintenance_date', 'next_calibration_date')
+
+
+@query_budget(3)
 @login_required
-def equipment_api_list(request):
-    """API endpoint to get list of all equipment with their status"""
+@equipment_conditional_api
+async def equipment_api_list(request):
+    """
+    API endpoint to get list of all equipment with their status.
+    ?format=columnar returns the same data column by column (see
+    utils/columnar.py), several times smaller for a large fleet.
+    """
     try:
         equipment_list = Equipment.objects.all()
         today = timezone.now().date()
         two_weeks = today + timedelta(days=14)
         
         data = []
-        for equipment in equipment_list:
-            # Calculate statuses
-            maintenance_status = 'compliant'
-            if equipment.is_maintenance_overdue:
-                maintenance_status = 'overdue'
-            elif equipment.next_maintenance_date and today <= equipment.next_maintenance_date <= two_weeks:
-                maintenance_status = 'due_soon'
-            
-            calibration_status = 'compliant'
-            if equipment.is_calibration_overdue:
-                calibration_status = 'overdue'
-            elif equipment.next_calibration_date and today <= equipment.next_calibration_date <= two_weeks:
-                calibration_status = 'due_soon'
-            
-            data.append({
-                'id': equipment.pk,
-                'machine_id': equipment.machine_id,
-                'machine_name': equipment.machine_name,
-                'machine_type': equipment.machine_type,
-                'machine_location': equipment.machine_location,
-                'maintenance_status': maintenance_status,
-                'calibration_status': calibration_status,
-                'next_maintenance_date': equipment.next_maintenance_date.strftime('%Y-%m-%d') if equipment.next_maintenance_date else None,
-                'next_calibration_date': equipment.next_calibration_date.strftime('%Y-%m-%d') if equipment.next_calibration_date else None,
-            })
+        with span('equipment_api_list.classify_equipment'):
+            async for equipment in equipment_list:
+                # Calculate statuses
+                maintenance_status = 'compliant'
+                if equipment.is_maintenance_overdue:
+                    maintenance_status = 'overdue'
+                elif equipment.next_maintenance_date and today <= equipment.next_maintenance_date <= two_weeks:
+                    maintenance_status = 'due_soon'
+                
+                calibration_status = 'compliant'
+                if equipment.is_calibration_overdue:
+                    calibration_status = 'overdue'
+                elif equipment.next_calibration_date and today <= equipment.next_calibration_date <= two_weeks:
+                    calibration_status = 'due_soon'
+                
+                data.append({
+                    'id': equipment.pk,
+                    'machine_id': equipment.machine_id,
+                    'machine_name': equipment.machine_name,
+                    'machine_type': equipment.machine_type,
+                    'machine_location': equipment.machine_location,
+                    'maintenance_status': maintenance_status,
+                    'calibration_status': calibration_status,
+                    # date objects - JSON-encoded as YYYY-MM-DD, or day offsets in columnar form
+                    'next_maintenance_date': equipment.next_maintenance_date,
+                    'next_calibration_date': equipment.next_calibration_date,
+                })
+        
+        if request.GET.get('format') == 'columnar':
+            with span('equipment_api_list.encode_columns'):
+                body = encode_columns(data, LIST_DICTIONARY_FIELDS, LIST_DATE_FIELDS, epoch=today)
+            return JsonResponse(
+                {'success': True, 'count': len(data), 'format': 'columnar', **body},
+                json_dumps_params={'separators': (',', ':')},
+            )
         
         return JsonResponse({
             'success': True,
@@ -983,21 +1027,123 @@ def equipment_api_list(request):
         })
         
     except Exception as e:
-        logger.error(f"Error in equipment_api_list: {str(e)}")
+        logger.error('Error in equipment_api_list: %s', e)
         return JsonResponse({
             'success': False,
             'error': 'An error occurred'
         }, status=500)
+
+
+def _task_status(is_overdue, next_due, today):
+    if is_overdue:
+        return 'overdue'
+    if next_due and today <= next_due <= today + timedelta(days=14):
+        return 'due_soon'
+    return 'compliant'
+
+
+def _api_date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+_MAINTENANCE_FIELDS = ('last_maintenance_date', 'maintenance_interval_days')
+_CALIBRATION_FIELDS = ('last_calibration_date', 'calibration_interval_days')
+
+# fields= name -> (model fields it reads, value for one machine)
+STATUS_API_FIELDS = {
+    'machine_name': (('machine_name',), lambda e, today: e.machine_name),
+    'machine_type': (('machine_type',), lambda e, today: e.machine_type),
+    'machine_location': (('machine_location',), lambda e, today: e.machine_location),
+    'last_maintenance_date': (('last_maintenance_date',), lambda e, today: _api_date(e.last_maintenance_date)),
+    'next_maintenance_date': (_MAINTENANCE_FIELDS, lambda e, today: _api_date(e.next_maintenance_date)),
+    'last_calibration_date': (('last_calibration_date',), lambda e, today: _api_date(e.last_calibration_date)),
+    'next_calibration_date': (_CALIBRATION_FIELDS, lambda e, today: _api_date(e.next_calibration_date)),
+    'maintenance_interval_days': (('maintenance_interval_days',), lambda e, today: e.maintenance_interval_days),
+    'calibration_interval_days': (('calibration_interval_days',), lambda e, today: e.calibration_interval_days),
+    'maintenance_status': (_MAINTENANCE_FIELDS, lambda e, today: _task_status(
+        e.is_maintenance_overdue, e.next_maintenance_date, today)),
+    'calibration_status': (_CALIBRATION_FIELDS, lambda e, today: _task_status(
+        e.is_calibration_overdue, e.next_calibration_date, today)),
+    'is_maintenance_overdue': (_MAINTENANCE_FIELDS, lambda e, today: e.is_maintenance_overdue),
+    'is_calibration_overdue': (_CALIBRATION_FIELDS, lambda e, today: e.is_calibration_overdue),
+}
+DEFAULT_BATCH_FIELDS = ('maintenance_status', 'calibration_status', 'next_maintenance_date', 'next_calibration_date')
+# SQLite's max_query_params - in_bulk splits longer id lists into one query per 999 ids
+MAX_BATCH_IDS = 999
+
+
+def _batch_params(request):
+    """(machine ids, fields) from the query string or the POST body; ValueError when they're unusable"""
+    if request.method == 'POST' and request.content_type == 'application/json':
+        try:
+            body = json.loads(request.body)
+        except ValueError:
+            raise ValueError('Request body is not valid JSON')
+        if not isinstance(body, dict) or not isinstance(body.get('ids', []), list):
+            raise ValueError('Expected {"ids": [...], "fields": [...]}')
+        ids = body.get('ids', [])
+        fields = body.get('fields') or []
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            raise ValueError('"fields" must be a list of field names')
+        if not all(isinstance(machine_id, (str, int, float)) and not isinstance(machine_id, bool) for machine_id in ids):
+            raise ValueError('"ids" must be a list of machine ids')
+    else:
+        params = request.POST if request.method == 'POST' else request.GET
+        ids = params.getlist('id')
+        fields = params.get('fields', '').split(',')
+
+    ids = list(dict.fromkeys(str(machine_id) for machine_id in ids))
+    if not ids:
+        raise ValueError('No machine ids given')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'At most {MAX_BATCH_IDS} machine ids per request')
+
+    fields = [field.strip() for field in fields if field.strip()] or list(DEFAULT_BATCH_FIELDS)
+    unknown = [field for field in fields if field not in STATUS_API_FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return ids, fields
+
+
+@query_budget(3)
+@login_required
+async def equipment_api_status_batch(request):
+    """
+    Statuses for many machines in one in_bulk lookup. Machine ids come as
+    repeated id parameters (query string or form POST, which Django caps at
+    DATA_UPLOAD_MAX_NUMBER_FIELDS) or, for large batches, as a JSON POST body
+    {"ids": [...], "fields": [...]}. fields= (comma separated) picks the
+    keys returned per machine.
+    """
+    if request.method not in ('GET', 'POST'):
+        return HttpResponseNotAllowed(['GET', 'POST'])
+    try:
+        ids, fields = _batch_params(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    columns = {column for field in fields for column in STATUS_API_FIELDS[field][0]}
+    found = await Equipment.objects.only(*columns).ain_bulk(ids)
+    today = timezone.now().date()
+    getters = [(field, STATUS_API_FIELDS[field][1]) for field in fields]
+    return JsonResponse({
+        'success': True,
+        'fields': fields,
+        'equipment': {
+            machine_id: {field: get(equipment, today) for field, get in getters}
+            for machine_id, equipment in found.items()
+        },
+        'missing': [machine_id for machine_id in ids if machine_id not in found],
+    })
+
     
 @login_required
+@role_required(['maintenance'])
 def maintenance_add_equipment(request):
     """Allow maintenance users to add new equipment"""
     
-    # Check permissions
-    if not hasattr(request.user, 'profile') or request.user.profile.role != 'maintenance':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     if request.method == 'POST':
         form = EquipmentForm(request.POST)
         if form.is_valid():
@@ -1010,14 +1156,10 @@ def maintenance_add_equipment(request):
     return render(request, 'myapp/maintenance_add_equipment.html', {'form': form})   
 
 @login_required
+@role_required(['maintenance'])
 def maintenance_delete_equipment(request, machine_id):
     """Allow maintenance users to delete equipment"""
     
-    # Check permissions
-    if not hasattr(request.user, 'profile') or request.user.profile.role != 'maintenance':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     equipment = get_object_or_404(Equipment, machine_id=machine_id)
     
     if request.method == 'POST':
@@ -1028,58 +1170,70 @@ def maintenance_delete_equipment(request, machine_id):
     
     return render(request, 'myapp/maintenance_confirm_delete.html', {'equipment': equipment})
 
+def _apply_procedure(equipment, form):
+    """Set the date a valid ProcedureCompleteForm completes; returns (changed field, success message)"""
+    completion_date = form.cleaned_data['completion_date']
+    if form.cleaned_data['procedure_type'] == 'calibration':
+        equipment.last_calibration_date = completion_date
+        return 'last_calibration_date', f"Calibration completed for {equipment.machine_name}"
+    equipment.last_maintenance_date = completion_date
+    return 'last_maintenance_date', f"Maintenance completed for {equipment.machine_name}"
+
+
+def _version_conflict(request, machine_id, form_class, activity, advice, bind_instance=False):
+    """
+    A versioned write lost to someone else's save: warn the user and rebind their
+    input to the stored row's version, so submitting again overwrites it knowingly.
+    Returns (stored equipment, rebound form).
+    """
+    equipment = get_object_or_404(Equipment, machine_id=machine_id)
+    messages.warning(
+        request,
+        f"{equipment.machine_name} was updated by another user while you were {activity}. {advice}"
+    )
+    data = request.POST.copy()
+    data['version'] = equipment.version
+    form = form_class(data, instance=equipment) if bind_instance else form_class(data)
+    return equipment, form
+
+
 @login_required
+@role_required(['maintenance'])
+@idempotent
 def maintenance_complete_procedure(request, machine_id):
     """Mark a calibration or maintenance procedure as complete"""
     
-    # Check permissions
-    if not hasattr(request.user, 'profile') or request.user.profile.role != 'maintenance':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     equipment = get_object_or_404(Equipment, machine_id=machine_id)
     
     if request.method == 'POST':
         form = ProcedureCompleteForm(request.POST)
         if form.is_valid():
-            procedure_type = form.cleaned_data['procedure_type']
-            completion_date = form.cleaned_data['completion_date']
+            expected_version = form.cleaned_data['version'] or equipment.version
+            changed_field, message = _apply_procedure(equipment, form)
             
-            # Update the appropriate date field
-            if procedure_type == 'calibration':
-                equipment.last_calibration_date = completion_date
-                message = f"Calibration completed for {equipment.machine_name}"
-            else:  # maintenance
-                equipment.last_maintenance_date = completion_date
-                message = f"Maintenance completed for {equipment.machine_name}"
+            if equipment.save_versioned([changed_field], expected_version):
+                messages.success(request, message)
+                return redirect('maintenance_dashboard')
             
-            equipment.save()
-            messages.success(request, message)
-            return redirect('maintenance_dashboard')
+            # Someone else saved this equipment first - show the current dates and ask to resubmit
+            equipment, form = _version_conflict(
+                request, machine_id, ProcedureCompleteForm, 'working', 'Check the current status below and submit again.'
+            )
     else:
-        form = ProcedureCompleteForm()
+        form = ProcedureCompleteForm(initial={'version': equipment.version})
     
     context = {
         'form': form,
         'equipment': equipment,
+        'idempotency_key': new_idempotency_key(),
     }
     
     return render(request, 'myapp/maintenance_complete_procedure.html', context)
 @login_required
+@role_required(['administrator'])
 def admin_add_equipment(request):
     """Allow administrators to add new equipment"""
     
-    # Universal profile check
-    user_profile = None
-    if hasattr(request.user, 'profile'):
-        user_profile = request.user.profile
-    elif hasattr(request.user, 'userprofile'):
-        user_profile = request.user.userprofile
-    
-    if not user_profile or user_profile.role != 'administrator':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     if request.method == 'POST':
         form = EquipmentForm(request.POST)
         if form.is_valid():
@@ -1098,20 +1252,10 @@ def admin_add_equipment(request):
 
 
 @login_required
+@role_required(['administrator'])
 def admin_delete_equipment(request, machine_id):
     """Allow administrators to delete equipment"""
     
-    # Universal profile check
-    user_profile = None
-    if hasattr(request.user, 'profile'):
-        user_profile = request.user.profile
-    elif hasattr(request.user, 'userprofile'):
-        user_profile = request.user.userprofile
-    
-    if not user_profile or user_profile.role != 'administrator':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     equipment = get_object_or_404(Equipment, machine_id=machine_id)
     
     if request.method == 'POST':
@@ -1128,34 +1272,49 @@ def admin_delete_equipment(request, machine_id):
 
 
 @login_required
+@role_required(['administrator'])
+@idempotent
 def admin_edit_equipment(request, machine_id):
     """Allow administrators to edit equipment"""
     
-    # Universal profile check
-    user_profile = None
-    if hasattr(request.user, 'profile'):
-        user_profile = request.user.profile
-    elif hasattr(request.user, 'userprofile'):
-        user_profile = request.user.userprofile
-    
-    if not user_profile or user_profile.role != 'administrator':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     equipment = get_object_or_404(Equipment, machine_id=machine_id)
     
+    conflicts = []
+    
     if request.method == 'POST':
         form = EquipmentForm(request.POST, instance=equipment)
         if form.is_valid():
-            equipment = form.save()
-            messages.success(request, f"Equipment {equipment.machine_name} updated successfully!")
-            return redirect('admin_dashboard')
+            expected_version = form.cleaned_data['version'] or equipment.version
+            # Only write the columns the user actually changed (the machine ID is fixed once created)
+            editable_fields = [field for field in form._meta.fields if field != 'machine_id']
+            changed_fields = [field for field in form.changed_data if field in editable_fields]
+            equipment = form.save(commit=False)
+            
+            if not changed_fields or equipment.save_versioned(changed_fields, expected_version):
+                messages.success(request, f"Equipment {equipment.machine_name} updated successfully!")
+                return redirect('admin_dashboard')
+            
+            # Someone else saved first - keep the user's input and show what differs from the saved row
+            submitted = form.cleaned_data
+            equipment, form = _version_conflict(
+                request, machine_id, EquipmentForm, 'editing',
+                'Review the differences below and save again to keep your values.', bind_instance=True,
+            )
+            for field in editable_fields:
+                if field in submitted and submitted[field] != getattr(equipment, field):
+                    conflicts.append({
+                        'label': form.fields[field].label or Equipment._meta.get_field(field).verbose_name,
+                        'current': getattr(equipment, field),
+                        'submitted': submitted[field],
+                    })
     else:
-        form = EquipmentForm(instance=equipment)
+        form = EquipmentForm(instance=equipment, initial={'version': equipment.version})
     
     context = {
         'form': form,
         'equipment': equipment,
+        'conflicts': conflicts,
+        'idempotency_key': new_idempotency_key(),
         'page_title': f'Edit Equipment: {equipment.machine_name}',
         'user_role': 'Administrator',
     }
@@ -1163,45 +1322,58 @@ def admin_edit_equipment(request, machine_id):
 
 
 @login_required
+@role_required(['administrator'])
+@idempotent
 def admin_complete_procedure(request, machine_id):
     """Allow administrators to mark procedures complete"""
     
-    # Universal profile check
-    user_profile = None
-    if hasattr(request.user, 'profile'):
-        user_profile = request.user.profile
-    elif hasattr(request.user, 'userprofile'):
-        user_profile = request.user.userprofile
-    
-    if not user_profile or user_profile.role != 'administrator':
-        messages.error(request, "You don't have permission to access this page.")
-        return redirect('home')
-    
     equipment = get_object_or_404(Equipment, machine_id=machine_id)
     
     if request.method == 'POST':
         form = ProcedureCompleteForm(request.POST)
         if form.is_valid():
-            procedure_type = form.cleaned_data['procedure_type']
-            completion_date = form.cleaned_data['completion_date']
+            expected_version = form.cleaned_data['version'] or equipment.version
+            changed_field, message = _apply_procedure(equipment, form)
             
-            # Update the appropriate date field
-            if procedure_type == 'calibration':
-                equipment.last_calibration_date = completion_date
-                message = f"Calibration completed for {equipment.machine_name}"
-            else:  # maintenance
-                equipment.last_maintenance_date = completion_date
-                message = f"Maintenance completed for {equipment.machine_name}"
+            if equipment.save_versioned([changed_field], expected_version):
+                messages.success(request, message)
+                return redirect('admin_dashboard')
             
-            equipment.save()
-            messages.success(request, message)
-            return redirect('admin_dashboard')
+            # Someone else saved this equipment first - show the current dates and ask to resubmit
+            equipment, form = _version_conflict(
+                request, machine_id, ProcedureCompleteForm, 'working', 'Check the current status below and submit again.'
+            )
     else:
-        form = ProcedureCompleteForm()
+        form = ProcedureCompleteForm(initial={'version': equipment.version})
     
     context = {
         'form': form,
         'equipment': equipment,
         'user_role': 'Administrator',
+        'idempotency_key': new_idempotency_key(),
+    }
+    return render(request, 'myapp/admin_complete_procedure.html', context)
+
+
+@login_required
+@role_required(['administrator'])
+def admin_profiles(request):
+    """List sampled request profiles and the hottest functions across them"""
+    sort = request.GET.get('sort', 'tottime')
+    if sort not in ('tottime', 'cumtime', 'calls'):
+        sort = 'tottime'
+    view_filter = request.GET.get('view', '')
+    
+    profiles = profiler.list_profiles()
+    if view_filter:
+        profiles = [p for p in profiles if p['view'] == view_filter]
+    
+    context = {
+        'user_role': 'Administrator',
+        'page_title': 'Request Profiles',
+        'profiles': profiles,
+        'hot_functions': profiler.hot_functions([p['path'] for p in profiles], sort=sort),
+        'sort': sort,
+        'view_filter': view_filter,
     }
-    return render(request, 'myapp/admin_complete_procedure.html', context)
\ No newline at end of file
+    return render(request, 'myapp/admin_profiles.html', context)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,14 +45,21 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.metrics.MetricsMiddleware',
+    'myapp.tracing.TracingMiddleware',
+    'myapp.compression.CompressionMiddleware',  # gzip/brotli; above everything that reads the body
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'myapp.staticfiles.WhiteNoiseMiddleware',  # async-capable WhiteNoise
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    'myapp.routers.ReplicaPinningMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'myapp.roles.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'myapp.profiler.SamplingProfilerMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'myapp.query_inspector.QueryBudgetMiddleware',  # inactive unless QUERY_INSPECTOR_ENABLED
 ]
 
 ROOT_URLCONF = 'S00044234_Maint_Calib_Db.urls'
@@ -72,18 +81,111 @@ TEMPLATES = [
     },
 ]
 
+# TEMPLATE_ENGINE=jinja2 renders the dashboards with Jinja2 (needs jinja2 installed). Its backend goes
+# first and only has the hot templates (myapp/jinja2/); everything else falls through to Django's.
+TEMPLATE_ENGINE = os.environ.get('TEMPLATE_ENGINE', 'django')
+JINJA2_TEMPLATES = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'NAME': 'jinja2',
+    'DIRS': [],
+    'APP_DIRS': True,
+    'OPTIONS': {
+        'environment': 'myapp.templating.environment',
+        'context_processors': [*TEMPLATES[0]['OPTIONS']['context_processors'], 'myapp.templating.csrf'],
+    },
+}
+if TEMPLATE_ENGINE == 'jinja2':
+    TEMPLATES = [JINJA2_TEMPLATES, *TEMPLATES]
+# Compiled template bytecode shared by workers; empty = a per-user directory under the system temp dir
+JINJA2_BYTECODE_CACHE_DIR = os.environ.get('JINJA2_BYTECODE_CACHE_DIR', '')
+
 WSGI_APPLICATION = 'S00044234_Maint_Calib_Db.wsgi.application'
+# Same app under an ASGI server (uvicorn): the JSON API and event stream are async views
+ASGI_APPLICATION = 'S00044234_Maint_Calib_Db.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql selects the PostgreSQL deployment profile (needs psycopg installed);
+# anything else keeps the single-file SQLite database
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+# Keep in step with gunicorn.conf.py - each worker thread holds at most one connection
+GUNICORN_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 3))
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 1))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'maint_calib'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Reuse connections across requests and check them before reuse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
+    }
+    if os.environ.get('GUNICORN_ASGI'):
+        # Under ASGI the ORM runs in sync_to_async threads, where Django never closes
+        # persistent connections at the end of a request - open one per request instead
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    if django.VERSION >= (5, 1):
+        # Native psycopg pool - one pool per worker process, sized to its threads.
+        # Total connections = GUNICORN_WORKERS * GUNICORN_THREADS, keep it under max_connections.
+        DATABASES['default']['CONN_MAX_AGE'] = 0  # persistent connections and the pool are exclusive
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': 1,
+            'max_size': GUNICORN_THREADS,
+            'timeout': 10,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / os.environ.get('DB_NAME', 'db.sqlite3'),  # absolute paths are kept as-is
+            'OPTIONS': {
+                'timeout': 20,  # seconds to wait for the write lock before "database is locked"
+            },
+        }
+    }
+
+# Optional read replica for dashboards and the JSON API (myapp/routers.py).
+# Locally: DB_REPLICA_NAME=replica.sqlite3 and refresh it with manage.py sync_replica
+if DB_ENGINE == 'postgresql' and os.environ.get('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('POSTGRES_REPLICA_DB', DATABASES['default']['NAME']),
+        'HOST': os.environ['POSTGRES_REPLICA_HOST'],
+        'PORT': os.environ.get('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif DB_ENGINE != 'postgresql' and os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / os.environ['DB_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['myapp.routers.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = 10  # read-your-writes window after a user's POST
+
+# SQLite tuning applied to every new connection (myapp/utils/sqlite.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 268435456,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
 }
+SQLITE_OPTIMIZE_INTERVAL = 60 * 60  # seconds between PRAGMA optimize runs per process
 
 
 # Password validation
@@ -127,7 +229,9 @@ STATICFILES_DIRS = [
 ]
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') # for production
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage' 
+# collectstatic writes content-hashed copies (served with a one-year immutable Cache-Control by
+# WhiteNoise) and .gz/.br variants; templates link the bundles in myapp/static/myapp/{css,js}
+STATICFILES_STORAGE = os.environ.get('STATICFILES_STORAGE', 'whitenoise.storage.CompressedManifestStaticFilesStorage')
 
 
 # Default primary key field type
@@ -135,7 +239,41 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache shared by every worker process on this host (sessions, and anything else that
+# must agree across workers). Set REDIS_URL to share it between hosts instead.
+# Without Redis it lives in CACHE_DIR: by default django_cache/ next to this file (git-ignored);
+# point it at a directory only the app's user can write, as entries are unpickled on read.
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'django_cache'))
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
+# Dashboard sections cached until the equipment data changes (myapp/utils/fragment_cache.py)
+FRAGMENT_CACHE_TIMEOUT = 60 * 60  # seconds
+
+# Sessions: SESSION_STORE=cached_db (default) reads sessions from the cache above and only
+# touches the database to write them; signed_cookies keeps them entirely in the browser
+# (signed, not encrypted, and logging out can't revoke a copied cookie); db is Django's default.
+SESSION_STORE = os.environ.get('SESSION_STORE', 'cached_db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+# Flash messages ride in a cookie and only spill into the session when they outgrow it (2 KB)
+MESSAGE_STORAGE = 'django.contrib.messages.storage.fallback.FallbackStorage'
+
 # Authentication settings
+# Loads the user's profile in the same query, so request.role (myapp/roles.py) is free
+AUTHENTICATION_BACKENDS = ['myapp.roles.ProfileBackend']
 LOGIN_REDIRECT_URL = '/'  # Where to redirect after successful login
 LOGOUT_REDIRECT_URL = '/'  # Where to redirect after logout
 LOGIN_URL = '/login/'  # The login page URL
@@ -148,4 +286,85 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 # Media files configuration (for uploaded documents)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Idempotency keys for completion/edit POSTs - retries within this window replay the stored response
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24  # seconds
+IDEMPOTENCY_CLAIM_LEASE = 120  # seconds before an unfinished request's claim no longer blocks retries
+
+# Server-Sent Events of equipment changes at /events/equipment/ (myapp/events.py).
+# Streams stay open only under ASGI; under WSGI each request returns what is pending.
+EVENTS_POLL_INTERVAL = 1.0  # seconds between checks of the event table, per ASGI process
+EVENTS_HEARTBEAT = 15.0  # seconds of silence before a keep-alive comment
+EVENTS_RETENTION = 60 * 60  # seconds of events kept for reconnecting streams
+EVENTS_STREAM_MAX_AGE = 10 * 60  # seconds before a stream is closed and the client reconnects
+
+# Response compression (myapp/compression.py) - gzip, or brotli when the brotli package is installed.
+# Event streams and images are never compressed.
+COMPRESSION_MIN_SIZE = 1024  # bytes
+COMPRESSION_TYPES = (
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript', 'application/javascript',
+    'application/json', 'application/xml', 'image/svg+xml',
+)
+
+# Prometheus metrics at /metrics (myapp/metrics.py). Set METRICS_DIR to a directory shared
+# by all gunicorn workers so a scrape of any worker reports totals for all of them.
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = 1.0  # seconds between per-worker snapshots
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # optional bearer token for scrapes
+
+# N+1 / query budget detection (myapp/query_inspector.py) - development only
+QUERY_INSPECTOR_ENABLED = os.environ.get('QUERY_INSPECTOR') == '1'
+QUERY_BUDGET_STRICT = False  # raise instead of logging a warning
+QUERY_N_PLUS_ONE_THRESHOLD = 5  # identical query shapes per request before flagging
+
+# Sampling profiler (myapp/profiler.py) - administrators can also add ?_profile=1 to any page
+PROFILER_SAMPLE_EVERY = int(os.environ.get('PROFILER_SAMPLE_EVERY', 0))  # profile 1 in N requests, 0 = off
+# By default profiles/ next to this file (git-ignored), like CACHE_DIR
+PROFILER_DIR = os.environ.get('PROFILER_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROFILER_MAX_FILES = 50  # ring buffer size
+
+# Request tracing (myapp/tracing.py) - spans are batched to a local OTLP/JSON lines file
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED') == '1'
+TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', 1.0))
+# By default traces.jsonl next to this file (git-ignored), like CACHE_DIR
+TRACING_EXPORT_PATH = os.environ.get(
+    'TRACING_EXPORT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces.jsonl')
+)
+TRACING_SERVICE_NAME = 'maint-calib'
+
+# Logging (myapp/log.py) - request threads only enqueue records; a background thread writes JSON lines
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FILE = os.environ.get('LOG_FILE', '')  # empty = stderr
+LOG_DEBUG_SAMPLE_EVERY = int(os.environ.get('LOG_DEBUG_SAMPLE_EVERY', 100))  # keep 1 in N debug records per call site
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sample_debug': {
+            '()': 'myapp.log.DebugSampleFilter',
+            'every': LOG_DEBUG_SAMPLE_EVERY,
+        },
+    },
+    'handlers': {
+        'queue': {
+            'class': 'myapp.log.AsyncQueueHandler',
+            'filters': ['sample_debug'],
+            'filename': LOG_FILE or None,
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'myapp': {
+            'level': LOG_LEVEL,
+        },
+        # 4xx responses are routine; 5xx are still logged at ERROR
+        'django.request': {
+            'level': 'ERROR',
+        },
+    },
+}